@@ -1,22 +1,41 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Request, Query, Response, Header
+from starlette.datastructures import UploadFile as StarletteUploadFile
 from fastapi.responses import StreamingResponse, JSONResponse
-import base64
-import io
-from PIL import Image
-from app.services.sbox_generator import find_valid_sbox
+import asyncio
+import json
+from typing import Optional
+from app.services.sbox_generator import (
+    find_valid_sbox, generate_sbox_batch, iter_sbox_batch_ndjson, unpack_rows_batch, sbox_batch_table,
+    MAX_BULK_SBOXES, MAX_BULK_JSON_SBOXES,
+)
 from app.services.validation import check_sbox
-from app.schemas.sbox import SBoxResponse, SBoxCheckRequest, SBoxCheckResponse, SBoxUploadResponse, SBoxDownloadRequest, ExportFormat
-from app.schemas.analysis import AnalysisResponse
-from app.utils.crypto_metrics import (
-    calculate_nl, calculate_sac, calculate_bic,
-    calculate_lap, calculate_du, calculate_ad,
-    calculate_to, calculate_ci
+from app.schemas.sbox import BulkFormat, SBoxResponse, SBoxCheckRequest, SBoxCheckResponse, SBoxUploadResponse, SBoxDownloadRequest, ExportFormat
+from app.schemas.analysis import (
+    AnalysisResponse, SBoxAnalysisRequest, SBoxScreenRequest, SBoxScreenResponse,
+    SBoxTableRequest, TableKind, TableFormat, SBoxBatchRequest,
+)
+from app.services.batch_analysis import stream_batch_analysis, MAX_BATCH_ITEMS
+from app.services.analysis_cache import get_analysis_cache, sbox_digest, analyze_cached
+from app.utils.screening import screen_sbox, normalize_bounds
+from app.utils.rng import resolve_seed
+from app.services import swap_sessions
+from app.schemas.search import (
+    SwapRequest, SwapSessionResponse, ExploreAffineRequest, ExploreAffineResponse, SBoxSearchRequest,
 )
+from app.services.sbox_search import stream_search, check_invariant_bounds
+from app.services.affine_explorer import explore_affine
+from app.services.image_cipher import encrypt_image, decrypt_image, format_dedup_header, check_image_input
+from app.services import jobs
+from app.services.compute import dispatch, dispatch_iter, compute_stats, ComputeBusy
+from app.services.jobs import JobQueueFull
+from app.schemas.jobs import JobResponse
+from app.services.sbox_library import get_sbox_library
+from app.schemas.library import LibraryInsertRequest, LibraryQueryRequest, LibraryEntry, LibraryPage, LibraryOrder
 from app.services.aes_wrapper import (
     aes_encrypt_custom,
     aes_decrypt_custom,
-    aes_encrypt_bytes_no_pad,
-    aes_decrypt_bytes_no_pad,
+    engine_cache_stats,
+    AESStreamCipher,
 )
 from app.schemas.cipher import (
     EncryptRequest,
@@ -25,9 +44,15 @@ from app.schemas.cipher import (
     EncryptImageRequest,
     DecryptImageRequest,
     ImageCipherResponse,
+    CipherMode,
+)
+from app.utils.file_handlers import (
+    parse_sbox_file, parse_sbox_param, format_sbox_as_csv, format_sbox_as_txt, format_sbox_as_xlsx,
+    table_as_int16, format_table_as_raw, format_table_as_npy, parse_sbox_pack,
 )
-from app.utils.file_handlers import parse_uploaded_sbox, format_sbox_as_csv, format_sbox_as_txt, format_sbox_as_xlsx
-from app.core.constants import AES_CONSTANT
+from app.utils.sbox_profile import SBoxProfile
+from app.core.constants import AES_CONSTANT, AES_IRREDUCIBLE_POLY
+from app.utils.gf256 import is_irreducible
 
 
 AES_STANDARD_SBOX = [
@@ -51,14 +76,8 @@ AES_STANDARD_SBOX = [
 
 router = APIRouter()
 
-def normalize_image_mode(image: Image.Image) -> Image.Image:
-    if image.mode in ("RGBA", "LA"):
-        return image.convert("RGBA")
-    if image.mode == "P" and "transparency" in image.info:
-        return image.convert("RGBA")
-    if image.mode in ("L", "RGB"):
-        return image
-    return image.convert("RGB")
+# Ukuran chunk saat membaca file multipart pada endpoint streaming
+STREAM_CHUNK_SIZE = 1 << 20
 
 def get_affine_constant_vector():
     """Vector affine default AES (8 bit)."""
@@ -75,13 +94,96 @@ async def get_aes_standard_sbox():
 async def status():
     return {"status": "API is running"}
 
+@router.get("/admin/engine-cache")
+async def engine_cache_stats_endpoint():
+    """
+    Statistik cache engine AES (hit/miss, ukuran, eviction).
+    """
+    return engine_cache_stats()
+
 @router.get("/generate-sbox", response_model=SBoxResponse)
-async def generate_single_sbox_endpoint():
+async def generate_single_sbox_endpoint(poly: Optional[str] = None,
+                                        seed: Optional[int] = Query(None, ge=0),
+                                        stream: int = Query(0, ge=0),
+                                        save: bool = False,
+                                        count: int = Query(1, ge=1, le=MAX_BULK_SBOXES),
+                                        offset: int = Query(0, ge=0),
+                                        format: BulkFormat = BulkFormat.JSON):
     """
     Endpoint untuk meng-generate 1 S-box unik yang valid.
+    poly (opsional): polinomial irreducible derajat 8, mis. "0x11B" atau "283".
+    seed, stream (opsional): generator PCG64 per stream; (seed, stream) yang sama memberi
+    S-box yang sama. Tanpa seed dipakai entropy baru yang dikembalikan di field seed.
+    save=true: simpan ke library S-box (hash dikembalikan di sbox_hash).
+    count > 1 (atau format selain json): generate bulk dengan NumPy, output JSON,
+    NDJSON (streaming), atau array uint8 (count, 264) raw/npy; vektor affine selalu default AES.
+    format=json dibatasi MAX_BULK_JSON_SBOXES; jumlah lebih besar pakai ndjson/raw/npy.
+    Bulk memuat S-box indeks offset .. offset + count - 1 dari (seed, stream); indeks yang sama
+    selalu memberi S-box yang sama, jadi rentang bisa dibagi ke beberapa client/proses.
     """
-    result = find_valid_sbox()
-    return {**result, "affine_vector": get_affine_constant_vector()}
+    irreducible_poly = AES_IRREDUCIBLE_POLY
+    if poly:
+        try:
+            irreducible_poly = int(poly, 0)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Format polinomial tidak valid.")
+        if not 0x100 <= irreducible_poly <= 0x1FF or not is_irreducible(irreducible_poly):
+            raise HTTPException(status_code=400, detail="Polinomial harus irreducible berderajat 8.")
+    if count > 1 or offset > 0 or format != BulkFormat.JSON:
+        if save:
+            raise HTTPException(status_code=400, detail="save=true hanya untuk count=1; gunakan POST /library.")
+        if format == BulkFormat.JSON and count > MAX_BULK_JSON_SBOXES:
+            raise HTTPException(status_code=400,
+                                detail=f"format=json maksimal {MAX_BULK_JSON_SBOXES} S-box; gunakan ndjson, raw, atau npy.")
+        return await _bulk_sbox_response(count, irreducible_poly, resolve_seed(seed), stream, offset, format)
+    result = await _compute("generate", find_valid_sbox, irreducible_poly, seed, stream)
+    result["affine_vector"] = get_affine_constant_vector()
+    if save:
+        entry = await _save_to_library(result["sbox"], result["affine_matrix"], result["affine_vector"],
+                                       irreducible_poly, "generate")
+        result["sbox_hash"] = entry["sbox_hash"]
+    return result
+
+async def _bulk_sbox_response(count: int, poly: int, seed: int, stream: int, offset: int,
+                              format: BulkFormat) -> Response:
+    # Seed/stream/offset juga di header agar output raw/npy/NDJSON bisa direproduksi
+    headers = {"X-SBox-Seed": str(seed), "X-SBox-Stream": str(stream), "X-SBox-Offset": str(offset)}
+    if format == BulkFormat.NDJSON:
+        # Potongan dibangkitkan di executor compute sambil dikirim, memegang satu slot "generate"
+        lines = _compute_stream("generate", iter_sbox_batch_ndjson(count, poly, seed, stream, offset))
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers=headers)
+
+    body = await _compute("generate", _bulk_sbox_body, count, poly, seed, stream, offset, format)
+    if format == BulkFormat.JSON:
+        return Response(content=body, media_type="application/json", headers=headers)
+    headers.update({
+        "X-Table-Shape": f"{count},264",
+        "X-Table-Dtype": "|u1",
+        # Kolom 0-7: baris matriks (bit ke-col = matrix[row][col]); kolom 8-263: S-box
+        "X-SBox-Layout": "affine_rows:0-7,sbox:8-263",
+    })
+    filename = "sboxes.npy" if format == BulkFormat.NPY else "sboxes.bin"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return Response(content=body, media_type="application/octet-stream", headers=headers)
+
+def _bulk_sbox_body(count: int, poly: int, seed: int, stream: int, offset: int, format: BulkFormat) -> bytes:
+    # Generate sekaligus serialisasi di executor compute (bukan di event loop)
+    batch = generate_sbox_batch(count, poly, seed, stream, offset)
+    if format == BulkFormat.JSON:
+        return json.dumps({
+            "count": count,
+            "irreducible_poly": poly,
+            "seed": seed,
+            "stream": stream,
+            "offset": offset,
+            "affine_vector": get_affine_constant_vector(),
+            "affine_matrices": unpack_rows_batch(batch["rows"]),
+            "sboxes": batch["sboxes"].tolist(),
+        }).encode()
+    table = sbox_batch_table(batch)
+    if format == BulkFormat.NPY:
+        return format_table_as_npy(table).getvalue()
+    return format_table_as_raw(table)
 
 @router.post("/check-sbox", response_model=SBoxCheckResponse)
 async def check_sbox_endpoint(payload: SBoxCheckRequest):
@@ -95,62 +197,445 @@ async def check_sbox_endpoint(payload: SBoxCheckRequest):
     
     return result
 
+def _analysis_poly(poly: Optional[int]) -> int:
+    poly = poly or AES_IRREDUCIBLE_POLY
+    if not 0x100 <= poly <= 0x1FF or not is_irreducible(poly):
+        raise HTTPException(status_code=400, detail="Polinomial harus irreducible berderajat 8.")
+    return poly
+
+async def _compute(group: str, fn, *args, process: bool = False):
+    """Jalankan pekerjaan CPU-bound di luar event loop (lihat app.services.compute); 429 bila antrian penuh."""
+    try:
+        return await dispatch(group, fn, *args, process=process)
+    except ComputeBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def _compute_stream(group: str, iterator):
+    """Stream yang memegang satu slot kelompok selama dikirim (dispatch_iter); 429 bila antrian penuh."""
+    try:
+        return dispatch_iter(group, iterator)
+    except ComputeBusy as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
 @router.post("/analyze-sbox", response_model=AnalysisResponse)
-async def analyze_sbox_endpoint(payload: SBoxCheckRequest):
+async def analyze_sbox_endpoint(payload: SBoxAnalysisRequest, tables: bool = False):
     """
     Menganalisa kekuatan kriptografi S-box.
     Menghitung NL, SAC, BIC, LAP, dan DAP sesuai standar Paper.
-    Proses ini mungkin memakan waktu beberapa milidetik.
+    S-box berbentuk A * x^-1 XOR c (hasil generator) memakai metrik invarian yang
+    sudah dihitung; affine_matrix/affine_vector opsional dan selalu diverifikasi.
+    Hasil di-cache berdasarkan hash S-box (memori + SQLite); tables=true ikut
+    menyimpan DDT/LAT mentah di cache disk.
     """
-    sbox = payload.sbox
-    
-    # 1. Hitung NL [cite: 1294]
-    nl_val = calculate_nl(sbox)
-    
-    # 2. Hitung SAC 
-    sac_val = calculate_sac(sbox)
-    
-    # 3. Hitung BIC (BIC-NL dan BIC-SAC) [cite: 1323, 1329]
-    bic_res = calculate_bic(sbox)
-    
-    # 4. Hitung LAP 
-    lap_val = calculate_lap(sbox)
-    
-    # 5. Hitung DU & DAP
-    du_val = calculate_du(sbox)
-    dap_val = du_val / 256.0
+    poly = _analysis_poly(payload.irreducible_poly)
+    result = await _compute("analysis", analyze_cached, payload.sbox, payload.affine_matrix,
+                            payload.affine_vector, poly, tables)
+    return AnalysisResponse(**result, sbox_hash=sbox_digest(payload.sbox))
 
-    # 6. Hitung AD
-    ad_val = calculate_ad(sbox)
+def _batch_response(items: list, poly: int) -> StreamingResponse:
+    if len(items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BATCH_ITEMS} S-box per batch.")
+    return StreamingResponse(_compute_stream("batch", stream_batch_analysis(items, poly)),
+                             media_type="application/x-ndjson")
 
-    # 7. Hitung TO
-    to_val = calculate_to(sbox)
+@router.post("/analyze-sbox/batch")
+async def analyze_sbox_batch_endpoint(payload: SBoxBatchRequest):
+    """
+    Analisis banyak S-box sekaligus di process pool.
+    Output NDJSON urut sesuai input, dikirim begitu hasilnya siap; item yang tidak valid
+    menghasilkan baris {"index", "error"} tanpa menghentikan batch.
+    """
+    return _batch_response(payload.sboxes, _analysis_poly(payload.irreducible_poly))
 
-    # 8. Hitung CI
-    ci_val = calculate_ci(sbox)
-    
-    return AnalysisResponse(
-        nl=nl_val,
-        sac=sac_val,
-        bic_nl=bic_res['bic_nl'],
-        bic_sac=bic_res['bic_sac'],
-        lap=lap_val,
-        dap=dap_val,
-        du=du_val,
-        ad=ad_val,
-        to=to_val,
-        ci=ci_val
+@router.post("/analyze-sbox/batch/upload")
+async def analyze_sbox_batch_upload_endpoint(file: UploadFile = File(...), poly: Optional[int] = None):
+    """
+    Seperti /analyze-sbox/batch, dengan input pack file (.bin, .json, .ndjson/.jsonl, .txt).
+    """
+    content = await file.read()
+    items = await _compute("files", parse_sbox_pack, file.filename, content)
+    return _batch_response(items, _analysis_poly(poly))
+
+@router.post("/screen-sbox", response_model=SBoxScreenResponse)
+async def screen_sbox_endpoint(payload: SBoxScreenRequest):
+    """
+    Menyaring S-box terhadap batas metrik (min/max per metrik).
+    Metrik termurah dievaluasi dulu dan proses berhenti di batas pertama yang gagal.
+    """
+    bounds = {name: (b.min, b.max) for name, b in payload.bounds.items()}
+    try:
+        return await _compute("analysis", screen_sbox, payload.sbox, bounds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _sbox_table(sbox: list, kind: TableKind):
+    # DDT/LAT mungkin sudah tersimpan di cache analisis (analyze-sbox?tables=true)
+    if kind in (TableKind.DDT, TableKind.LAT):
+        table = get_analysis_cache().get_tables(sbox_digest(sbox))[kind.value]
+        if table is not None:
+            return table_as_int16(table)
+    profile = SBoxProfile(sbox)
+    return table_as_int16({
+        TableKind.DDT: lambda: profile.ddt,
+        TableKind.LAT: lambda: profile.lat,
+        TableKind.BCT: lambda: profile.bct,
+        TableKind.ACT: lambda: profile.autocorrelation,
+    }[kind]())
+
+@router.post("/sbox-table")
+async def sbox_table_endpoint(payload: SBoxTableRequest):
+    """
+    Tabel lengkap S-box (DDT, LAT, BCT, atau tabel autokorelasi) 256x256.
+    Format raw/npy: int16 little-endian, shape dan dtype di header
+    X-Table-Shape dan X-Table-Dtype (np.frombuffer(body, dtype).reshape(shape)).
+    """
+    try:
+        table = await _compute("table", _sbox_table, payload.sbox, payload.table)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    name = payload.table.value
+    shape = ",".join(str(dim) for dim in table.shape)
+    headers = {"X-Table-Shape": shape, "X-Table-Dtype": table.dtype.str}
+
+    if payload.format == TableFormat.JSON:
+        return JSONResponse(content={
+            "table": name,
+            "shape": list(table.shape),
+            "dtype": table.dtype.str,
+            "data": table.tolist(),
+        }, headers=headers)
+
+    if payload.format == TableFormat.NPY:
+        headers["Content-Disposition"] = f'attachment; filename="sbox_{name}.npy"'
+        return StreamingResponse(format_table_as_npy(table), media_type="application/octet-stream", headers=headers)
+
+    headers["Content-Disposition"] = f'attachment; filename="sbox_{name}.bin"'
+    return Response(content=format_table_as_raw(table), media_type="application/octet-stream", headers=headers)
+
+def _require_swap_session(session_id: str) -> swap_sessions.SwapSession:
+    session = swap_sessions.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Sesi tidak ditemukan atau sudah kadaluarsa.")
+    return session
+
+@router.post("/swap-sessions", response_model=SwapSessionResponse)
+async def create_swap_session_endpoint(payload: SBoxCheckRequest):
+    """
+    Membuat sesi local search: DDT, spektrum Walsh, dan counter SAC disimpan di server
+    sehingga setiap swap hanya memperbarui entri yang terdampak.
+    Riwayat undo menyimpan SWAP_HISTORY_LIMIT swap terakhir (default 1024, env
+    AESSBOX_SWAP_HISTORY); swap yang lebih lama tidak bisa dibatalkan.
+    """
+    return await _compute("swap", swap_sessions.open_session, payload.sbox)
+
+@router.get("/swap-sessions/{session_id}", response_model=SwapSessionResponse)
+async def get_swap_session_endpoint(session_id: str):
+    return await _compute("swap", swap_sessions.read_session, _require_swap_session(session_id))
+
+@router.post("/swap-sessions/{session_id}/swap", response_model=SwapSessionResponse)
+async def swap_entries_endpoint(session_id: str, payload: SwapRequest):
+    """
+    Menukar S(x1) dan S(x2) lalu mengembalikan metrik terbaru (NL, BIC-NL, DU, DAP, SAC, BIC-SAC).
+    """
+    session = _require_swap_session(session_id)
+    try:
+        return await _compute("swap", swap_sessions.swap_entries, session, payload.x1, payload.x2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/swap-sessions/{session_id}/undo", response_model=SwapSessionResponse)
+async def undo_swap_endpoint(session_id: str):
+    """
+    Membatalkan swap terakhir. Hanya SWAP_HISTORY_LIMIT swap terakhir yang bisa dibatalkan;
+    400 bila riwayat sudah habis.
+    """
+    session = _require_swap_session(session_id)
+    try:
+        return await _compute("swap", swap_sessions.undo_swap, session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.delete("/swap-sessions/{session_id}")
+async def delete_swap_session_endpoint(session_id: str):
+    if not swap_sessions.delete_session(session_id):
+        raise HTTPException(status_code=404, detail="Sesi tidak ditemukan atau sudah kadaluarsa.")
+    return {"deleted": session_id}
+
+@router.post("/explore-affine", response_model=ExploreAffineResponse)
+async def explore_affine_endpoint(payload: ExploreAffineRequest):
+    """
+    Pencarian tetangga matriks affine (flip satu bit per langkah) untuk
+    mengoptimalkan SAC, BIC-SAC, atau TO. Tetangga singular dilewati.
+    """
+    poly = _analysis_poly(payload.irreducible_poly)
+    try:
+        return await _compute(
+            "explore",
+            explore_affine,
+            payload.objective.value,
+            payload.max_steps,
+            payload.affine_matrix,
+            payload.affine_vector,
+            poly,
+            payload.seed,
+            process=True,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _search_bounds(payload: SBoxSearchRequest, poly: int) -> dict:
+    try:
+        bounds = normalize_bounds({name: (b.min, b.max) for name, b in payload.bounds.items()})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    impossible = check_invariant_bounds(bounds, poly)
+    if impossible:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batas {impossible} tidak mungkin dipenuhi: nilainya sama untuk semua S-box affine dari x^-1.",
+        )
+    return bounds
+
+@router.post("/search-sbox")
+async def search_sbox_endpoint(payload: SBoxSearchRequest):
+    """
+    Mencari S-box affine yang memenuhi batas metrik secara paralel (process pool).
+    Output NDJSON: baris "match" (matriks, vektor, S-box, metrik) segera setelah ditemukan,
+    baris "progress" (jumlah kandidat, kandidat/detik), dan baris "done" di akhir.
+    """
+    poly = _analysis_poly(payload.irreducible_poly)
+    bounds = _search_bounds(payload, poly)
+    return StreamingResponse(
+        _compute_stream("search", stream_search(bounds, payload.max_seconds, payload.max_candidates,
+                                                payload.max_results, payload.seed, poly)),
+        media_type="application/x-ndjson",
     )
 
+@router.get("/admin/analysis-cache")
+async def analysis_cache_stats_endpoint():
+    """
+    Statistik cache analisis S-box (tier memori dan SQLite).
+    """
+    return get_analysis_cache().stats()
+
+@router.get("/admin/analysis-cache/{sbox_hash}", response_model=AnalysisResponse)
+async def analysis_cache_entry_endpoint(sbox_hash: str):
+    """
+    Hasil analisis yang tersimpan untuk hash S-box tertentu.
+    """
+    result = get_analysis_cache().get(sbox_hash.lower())
+    if result is None:
+        raise HTTPException(status_code=404, detail="Hash S-box tidak ada di cache.")
+    return AnalysisResponse(**result, sbox_hash=sbox_hash.lower())
+
+@router.delete("/admin/analysis-cache/{sbox_hash}")
+async def invalidate_analysis_cache_endpoint(sbox_hash: str):
+    """
+    Hapus hasil analisis satu S-box dari cache (memori dan SQLite).
+    """
+    if not get_analysis_cache().invalidate(sbox_hash.lower()):
+        raise HTTPException(status_code=404, detail="Hash S-box tidak ada di cache.")
+    return {"invalidated": sbox_hash.lower()}
+
+@router.delete("/admin/analysis-cache")
+async def clear_analysis_cache_endpoint():
+    """
+    Kosongkan seluruh cache analisis.
+    """
+    return {"cleared": get_analysis_cache().clear()}
+
+# --- Job background (eksplorasi, batch analisis, enkripsi gambar besar) ---
+
+def _submit_job(factory, *args) -> dict:
+    try:
+        return factory(*args).snapshot()
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+def _require_job(job_id: str) -> jobs.Job:
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan atau sudah kadaluarsa.")
+    return job
+
+@router.post("/jobs/explore-affine", response_model=JobResponse, status_code=202)
+async def explore_affine_job_endpoint(payload: ExploreAffineRequest):
+    """
+    Seperti /explore-affine, dijalankan sebagai job background (process pool).
+    Hasil diambil lewat GET /jobs/{job_id}/result.
+    """
+    poly = _analysis_poly(payload.irreducible_poly)
+    return _submit_job(jobs.submit_explore_job, payload.objective.value, payload.max_steps,
+                   payload.affine_matrix, payload.affine_vector, poly, payload.seed)
+
+@router.post("/jobs/search-sbox", response_model=JobResponse, status_code=202)
+async def search_sbox_job_endpoint(payload: SBoxSearchRequest):
+    """
+    Seperti /search-sbox sebagai job; hasilnya semua match plus ringkasan "done".
+    Progress = jumlah kandidat yang sudah disaring.
+    """
+    poly = _analysis_poly(payload.irreducible_poly)
+    bounds = _search_bounds(payload, poly)
+    return _submit_job(jobs.submit_search_job, bounds, payload.max_seconds, payload.max_candidates,
+                   payload.max_results, payload.seed, poly)
+
+@router.post("/jobs/analyze-sbox/batch", response_model=JobResponse, status_code=202)
+async def analyze_sbox_batch_job_endpoint(payload: SBoxBatchRequest):
+    """
+    Seperti /analyze-sbox/batch sebagai job; hasilnya list baris per item (urut input).
+    """
+    if len(payload.sboxes) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BATCH_ITEMS} S-box per batch.")
+    return _submit_job(jobs.submit_batch_job, payload.sboxes, _analysis_poly(payload.irreducible_poly))
+
+@router.post("/jobs/encrypt-image", response_model=JobResponse, status_code=202)
+async def encrypt_image_job_endpoint(payload: EncryptImageRequest):
+    """
+    Seperti /encrypt-image sebagai job (gambar besar); hasil berisi field ImageCipherResponse
+    plus "dedup" (statistik blok ECB).
+    """
+    if len(payload.sbox) != 256:
+        raise HTTPException(status_code=400, detail="S-box harus 256 elemen.")
+    try:
+        await _compute("image", check_image_input, payload.image_base64, payload.mode.value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _submit_job(jobs.submit_image_job, False, payload.image_base64, payload.key,
+                   payload.sbox, payload.mode.value, payload.filename)
+
+@router.post("/jobs/decrypt-image", response_model=JobResponse, status_code=202)
+async def decrypt_image_job_endpoint(payload: DecryptImageRequest):
+    if len(payload.sbox) != 256:
+        raise HTTPException(status_code=400, detail="S-box harus 256 elemen.")
+    try:
+        await _compute("image", check_image_input, payload.ciphertext_base64, payload.mode.value,
+                       True, payload.nonce)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _submit_job(jobs.submit_image_job, True, payload.ciphertext_base64, payload.key,
+                   payload.sbox, payload.mode.value, None, payload.nonce)
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job_endpoint(job_id: str):
+    """
+    Status dan progress job (queued, running, done, failed, cancelled).
+    """
+    return _require_job(job_id).snapshot()
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result_endpoint(job_id: str):
+    """
+    Hasil job yang sudah selesai; 409 bila job masih berjalan, gagal, atau dibatalkan.
+    """
+    job = _require_job(job_id)
+    if job.status == jobs.JOB_FAILED:
+        raise HTTPException(status_code=409, detail=f"Job gagal: {job.error}")
+    if job.status != jobs.JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"Job belum selesai (status: {job.status}).")
+    return job.result
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job_endpoint(job_id: str):
+    """
+    Membatalkan job yang masih antri/berjalan, atau menghapus job yang sudah selesai.
+    Status langsung menjadi cancelled dan tidak ada task baru yang dijadwalkan, tetapi
+    potongan yang sudah berjalan di process pool/thread tetap diselesaikan (hasilnya dibuang).
+    """
+    job = await jobs.cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job tidak ditemukan atau sudah kadaluarsa.")
+    return job.snapshot()
+
+# --- Library S-box (SQLite) ---
+
+async def _save_to_library(sbox: list, affine_matrix, affine_vector, poly: int, source: str) -> dict:
+    try:
+        entry, created = await _compute("library", get_sbox_library().add,
+                                        sbox, affine_matrix, affine_vector, poly, source)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**entry, "created": created}
+
+async def _library_page(bounds: dict, order_by: LibraryOrder, descending: bool, limit: int,
+                        cursor: Optional[str]) -> dict:
+    try:
+        return await _compute("library", get_sbox_library().query,
+                              bounds, order_by.value, descending, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/library", response_model=LibraryEntry)
+async def library_insert_endpoint(payload: LibraryInsertRequest):
+    """
+    Simpan S-box ke library beserta metriknya (dedup berdasarkan hash S-box).
+    affine_matrix/affine_vector opsional, disimpan hanya bila cocok dengan S-box.
+    """
+    poly = _analysis_poly(payload.irreducible_poly)
+    return await _save_to_library(payload.sbox, payload.affine_matrix, payload.affine_vector, poly, payload.source)
+
+@router.get("/library", response_model=LibraryPage)
+async def library_list_endpoint(order_by: LibraryOrder = LibraryOrder.ID, descending: bool = False,
+                                limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None):
+    """
+    Daftar S-box di library, per halaman (keyset pagination lewat next_cursor).
+    """
+    return await _library_page({}, order_by, descending, limit, cursor)
+
+@router.post("/library/query", response_model=LibraryPage)
+async def library_query_endpoint(payload: LibraryQueryRequest):
+    """
+    Query rentang metrik, mis. bounds {"nl": {"min": 112}, "sac": {"min": 0.49, "max": 0.51}}
+    dengan order_by "to". Semua kolom metrik ber-index; halaman berikutnya lewat cursor.
+    """
+    bounds = {name: (b.min, b.max) for name, b in payload.bounds.items()}
+    return await _library_page(bounds, payload.order_by, payload.descending, payload.limit, payload.cursor)
+
+@router.get("/library/{sbox_hash}", response_model=LibraryEntry)
+async def library_entry_endpoint(sbox_hash: str):
+    entry = await _compute("library", get_sbox_library().get, sbox_hash.lower())
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Hash S-box tidak ada di library.")
+    return entry
+
+@router.delete("/library/{sbox_hash}")
+async def library_delete_endpoint(sbox_hash: str):
+    if not await _compute("library", get_sbox_library().delete, sbox_hash.lower()):
+        raise HTTPException(status_code=404, detail="Hash S-box tidak ada di library.")
+    return {"deleted": sbox_hash.lower()}
+
+@router.get("/admin/library")
+async def library_stats_endpoint():
+    """
+    Lokasi file dan jumlah S-box di library.
+    """
+    return await _compute("library", get_sbox_library().stats)
+
+@router.get("/admin/compute")
+async def compute_stats_endpoint():
+    """
+    Statistik admission control per kelompok endpoint CPU-bound
+    (berjalan, antri, ditolak, waktu tunggu antrian, durasi rata-rata).
+    """
+    return compute_stats()
+
+@router.get("/admin/jobs")
+async def job_stats_endpoint():
+    """
+    Jumlah job antri/berjalan dan statistik penyimpanan hasil job.
+    """
+    return jobs.job_stats()
+
 @router.post("/encrypt", response_model=CipherResponse)
 async def encrypt_aes_endpoint(payload: EncryptRequest):
     """
-    Melakukan Enkripsi AES-128 (ECB + PKCS7) menggunakan S-box Custom.
+    Melakukan Enkripsi AES-128 (ECB + PKCS7 atau CTR) menggunakan S-box Custom.
+    Mode CTR mengembalikan hex nonce || ciphertext.
     """
     if len(payload.sbox) != 256:
         raise HTTPException(status_code=400, detail="S-box harus 256 elemen.")
         
-    result_hex = aes_encrypt_custom(payload.plaintext, payload.key, payload.sbox)
+    result_hex = await _compute("cipher", aes_encrypt_custom, payload.plaintext, payload.key, payload.sbox, payload.mode)
     return CipherResponse(result=result_hex)
 
 @router.post("/decrypt", response_model=CipherResponse)
@@ -161,80 +646,184 @@ async def decrypt_aes_endpoint(payload: DecryptRequest):
     if len(payload.sbox) != 256:
         raise HTTPException(status_code=400, detail="S-box harus 256 elemen.")
         
-    result_text = aes_decrypt_custom(payload.ciphertext, payload.key, payload.sbox)
+    result_text = await _compute("cipher", aes_decrypt_custom, payload.ciphertext, payload.key, payload.sbox, payload.mode)
     return CipherResponse(result=result_text)
 
 @router.post("/encrypt-image", response_model=ImageCipherResponse)
-async def encrypt_image_endpoint(payload: EncryptImageRequest):
+async def encrypt_image_endpoint(payload: EncryptImageRequest, response: Response):
     """
     Enkripsi AES-128 untuk data gambar dalam bentuk Base64.
+    Mode ECB: blok piksel identik dienkripsi sekali; statistiknya di header X-ECB-Dedup.
     """
     if len(payload.sbox) != 256:
         raise HTTPException(status_code=400, detail="S-box harus 256 elemen.")
-
-    try:
-        image_bytes = base64.b64decode(payload.image_base64, validate=True)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Base64 gambar tidak valid.")
-
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-    except Exception:
-        raise HTTPException(status_code=400, detail="Gambar tidak bisa dibaca.")
-
-    image = normalize_image_mode(image)
-    pixel_bytes = image.tobytes()
-    encrypted_pixels = aes_encrypt_bytes_no_pad(pixel_bytes, payload.key, payload.sbox)
-    encrypted_image = Image.frombytes(image.mode, image.size, encrypted_pixels)
-    buffer = io.BytesIO()
-    encrypted_image.save(buffer, format="PNG")
-    encrypted_b64 = base64.b64encode(buffer.getvalue()).decode("ascii")
-    return ImageCipherResponse(
-        result=encrypted_b64,
-        mime_type="image/png",
-        filename=payload.filename,
-    )
+        result = await _compute("image", encrypt_image, payload.image_base64, payload.key, payload.sbox,
+                                payload.mode, payload.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    dedup_stats = result.pop("dedup")
+    if dedup_stats:
+        response.headers["X-ECB-Dedup"] = format_dedup_header(dedup_stats)
+    return ImageCipherResponse(**result)
 
 @router.post("/decrypt-image", response_model=ImageCipherResponse)
-async def decrypt_image_endpoint(payload: DecryptImageRequest):
+async def decrypt_image_endpoint(payload: DecryptImageRequest, response: Response):
     """
     Dekripsi AES-128 untuk data gambar dalam bentuk Base64.
     """
     if len(payload.sbox) != 256:
         raise HTTPException(status_code=400, detail="S-box harus 256 elemen.")
-
     try:
-        ciphertext_bytes = base64.b64decode(payload.ciphertext_base64, validate=True)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Base64 ciphertext tidak valid.")
+        result = await _compute("image", decrypt_image, payload.ciphertext_base64, payload.key, payload.sbox,
+                                payload.mode, payload.nonce)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    dedup_stats = result.pop("dedup")
+    if dedup_stats:
+        response.headers["X-ECB-Dedup"] = format_dedup_header(dedup_stats)
+    return ImageCipherResponse(**result)
 
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse yang outputnya dihasilkan sambil membaca body request.
+    Tidak menjalankan listener disconnect bawaan Starlette karena listener itu ikut
+    memanggil receive() dan akan "mencuri" chunk body; disconnect tetap terdeteksi
+    lewat request.stream() (ClientDisconnect).
+    """
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+async def _open_stream_body(request: Request):
+    """
+    Sumber data untuk endpoint streaming: body mentah (application/octet-stream)
+    atau file pertama pada multipart/form-data. Mengembalikan (iterator chunk, filename, penutup).
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = next((v for v in form.values() if isinstance(v, StarletteUploadFile)), None)
+        if upload is None:
+            await form.close()
+            raise HTTPException(status_code=400, detail="File tidak ditemukan pada form.")
+
+        async def read_file():
+            while True:
+                chunk = await upload.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+
+        return read_file(), upload.filename, form.close
+
+    async def noop():
+        return None
+
+    return request.stream(), None, noop
+
+async def _stream_cipher_response(request: Request, cipher: AESStreamCipher, suffix: str) -> BodyStreamingResponse:
+    chunks, filename, close = await _open_stream_body(request)
+    chunks = chunks.__aiter__()
+    loop = asyncio.get_running_loop()
+
+    # Enkripsi per chunk (NumPy ECB / CTR lewat process pool) dijalankan di thread executor
+    # agar stream besar tidak menahan request lain di event loop
+    async def update(chunk: bytes) -> bytes:
+        return await loop.run_in_executor(None, cipher.update, chunk)
+
+    async def finalize() -> bytes:
+        return await loop.run_in_executor(None, cipher.finalize)
+
+    # Baca body sampai output pertama tersedia (mis. nonce CTR sudah lengkap) sebelum
+    # response dimulai, agar input yang tidak valid menjadi 400 dan bukan 200 terpotong
+    first = b""
+    finished = False
     try:
-        encrypted_image = Image.open(io.BytesIO(ciphertext_bytes))
-    except Exception:
-        raise HTTPException(status_code=400, detail="Ciphertext bukan gambar yang valid.")
-
-    encrypted_image = normalize_image_mode(encrypted_image)
-    encrypted_pixels = encrypted_image.tobytes()
-    decrypted_pixels = aes_decrypt_bytes_no_pad(encrypted_pixels, payload.key, payload.sbox)
-    decrypted_image = Image.frombytes(encrypted_image.mode, encrypted_image.size, decrypted_pixels)
-    buffer = io.BytesIO()
-    decrypted_image.save(buffer, format="PNG")
-    decrypted_b64 = base64.b64encode(buffer.getvalue()).decode("ascii")
-    return ImageCipherResponse(
-        result=decrypted_b64,
-        mime_type="image/png",
+        while not first:
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = await finalize()
+                finished = True
+                break
+            first = await update(chunk)
+    except ValueError as e:
+        await close()
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        await close()
+        raise
+
+    async def generate():
+        try:
+            if first:
+                yield first
+            if finished:
+                return
+            async for chunk in chunks:
+                out = await update(chunk)
+                if out:
+                    yield out
+            out = await finalize()
+            if out:
+                yield out
+        finally:
+            await close()
+
+    out_name = f"{filename}{suffix}" if filename else f"data{suffix}"
+    return BodyStreamingResponse(
+        generate(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{out_name}"'}
     )
 
+@router.post("/encrypt-stream")
+async def encrypt_stream_endpoint(
+    request: Request,
+    x_aes_key: str = Header(..., description="Kunci AES (di header agar tidak tercatat di URL/log akses)"),
+    sbox: str = Query(..., description="S-box 256 byte dalam 512 digit hex"),
+    mode: CipherMode = CipherMode.ECB,
+):
+    """
+    Enkripsi file besar secara streaming (memori konstan).
+    Body: data biner mentah atau multipart/form-data berisi file; kunci di header X-AES-Key.
+    ECB: padding PKCS#7 di chunk terakhir. CTR: output diawali nonce 8 byte.
+    """
+    cipher = AESStreamCipher(x_aes_key, parse_sbox_param(sbox), mode)
+    return await _stream_cipher_response(request, cipher, ".enc")
+
+@router.post("/decrypt-stream")
+async def decrypt_stream_endpoint(
+    request: Request,
+    x_aes_key: str = Header(..., description="Kunci AES (di header agar tidak tercatat di URL/log akses)"),
+    sbox: str = Query(..., description="S-box 256 byte dalam 512 digit hex"),
+    mode: CipherMode = CipherMode.ECB,
+):
+    """
+    Dekripsi file besar secara streaming, kebalikan dari /encrypt-stream.
+    """
+    cipher = AESStreamCipher(x_aes_key, parse_sbox_param(sbox), mode, decrypt=True)
+    return await _stream_cipher_response(request, cipher, ".dec")
+
 @router.post("/upload-sbox", response_model=SBoxUploadResponse)
-async def upload_sbox_endpoint(file: UploadFile = File(...)):
+async def upload_sbox_endpoint(file: UploadFile = File(...), save: bool = False):
     """
     Endpoint Upload S-box.
     Menerima file (JSON/CSV/TXT/XLSX), memparsing menjadi array, dan mengembalikan JSON.
     Gunakan response dari endpoint ini untuk menampilkan Tabel S-box di UI.
+    save=true: simpan juga ke library S-box (hash dikembalikan di sbox_hash).
     """
     # 1. Parsing File
-    parsed = await parse_uploaded_sbox(file)
+    content = await file.read()
+    parsed = await _compute("files", parse_sbox_file, file.filename, content)
     sbox_array = parsed["sbox"]
+    sbox_hash = None
+    if save:
+        entry = await _save_to_library(sbox_array, parsed["affine_matrix"], parsed["affine_vector"],
+                                       AES_IRREDUCIBLE_POLY, "upload")
+        sbox_hash = entry["sbox_hash"]
     
     # 2. Return JSON ke Frontend
     return SBoxUploadResponse(
@@ -242,7 +831,8 @@ async def upload_sbox_endpoint(file: UploadFile = File(...)):
         sbox=sbox_array,
         affine_matrix=parsed["affine_matrix"],
         affine_vector=parsed["affine_vector"],
-        message="S-box berhasil dimuat. Silakan cek tabel preview."
+        message="S-box berhasil dimuat. Silakan cek tabel preview.",
+        sbox_hash=sbox_hash,
     )
 
 @router.post("/download")
@@ -267,7 +857,7 @@ async def download_sbox_endpoint(payload: SBoxDownloadRequest):
 
     # --- KASUS 2: Format CSV (Hex Grid 16x16) ---
     elif payload.format == ExportFormat.CSV:
-        csv_buffer = format_sbox_as_csv(payload.sbox)
+        csv_buffer = await _compute("files", format_sbox_as_csv, payload.sbox)
         return StreamingResponse(
             csv_buffer,
             media_type="text/csv",
@@ -276,7 +866,7 @@ async def download_sbox_endpoint(payload: SBoxDownloadRequest):
 
     # --- KASUS 3: Format TXT (Hex Grid 16x16) ---
     elif payload.format == ExportFormat.TXT:
-        txt_buffer = format_sbox_as_txt(payload.sbox)
+        txt_buffer = await _compute("files", format_sbox_as_txt, payload.sbox)
         return StreamingResponse(
             txt_buffer,
             media_type="text/plain",
@@ -285,7 +875,7 @@ async def download_sbox_endpoint(payload: SBoxDownloadRequest):
 
     # --- KASUS 4: Format XLSX (Hex Grid 16x16) ---
     elif payload.format == ExportFormat.XLSX:
-        xlsx_buffer = format_sbox_as_xlsx(payload.sbox)
+        xlsx_buffer = await _compute("files", format_sbox_as_xlsx, payload.sbox)
         return StreamingResponse(
             xlsx_buffer,
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -1,4 +1,3 @@
-import uvicorn
 from fastapi import FastAPI
 # PERBAIKAN DI SINI: Tambahkan 'app.' di depan
 from app.api.routes import router as api_router 
@@ -39,4 +38,5 @@ def hello():
 
 # Bagian ini tidak dieksekusi oleh Vercel (hanya untuk local run), tapi tidak bikin error.
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
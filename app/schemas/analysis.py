@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+from enum import Enum
+from typing import Any, Dict, List, Optional, Union
+from app.schemas.sbox import SBoxCheckRequest
 
 class AnalysisResponse(BaseModel):
     nl: int             # Nonlinearity (Target: 112)
@@ -11,3 +14,60 @@ class AnalysisResponse(BaseModel):
     ad: int             # Algebraic Degree (Target: 7)
     to: float           # Transparency Order (Target: rendah)
     ci: int             # Correlation Immunity (Target: tinggi)
+    sbox_hash: Optional[str] = None  # Hash BLAKE2b-256 S-box (kunci cache analisis)
+    affine_family: Optional[bool] = None  # True bila terverifikasi berbentuk A * x^-1 XOR c
+
+class SBoxAnalysisRequest(SBoxCheckRequest):
+    # Opsional: matriks/vektor affine dari SBoxResponse atau SBoxUploadResponse.
+    # Selalu diverifikasi ulang terhadap S-box sebelum jalur cepat dipakai.
+    affine_matrix: Optional[List[List[int]]] = None
+    affine_vector: Optional[List[int]] = None
+    irreducible_poly: Optional[int] = None
+
+    @field_validator('affine_matrix')
+    def check_matrix(cls, v):
+        if v is not None and (len(v) != 8 or any(len(row) != 8 for row in v)):
+            raise ValueError('Matriks affine harus berukuran 8x8.')
+        return v
+
+    @field_validator('affine_vector')
+    def check_vector(cls, v):
+        if v is not None and len(v) != 8:
+            raise ValueError('Vektor affine harus memiliki 8 bit.')
+        return v
+
+class MetricBound(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class SBoxScreenRequest(SBoxCheckRequest):
+    # Contoh: {"nl": {"min": 112}, "du": {"max": 4}, "sac": {"min": 0.49, "max": 0.51}}
+    bounds: Dict[str, MetricBound]
+
+class SBoxScreenResponse(BaseModel):
+    passed: bool
+    rejected_by: Optional[str] = None          # Metrik pertama yang gagal
+    value: Optional[Union[int, float]] = None  # Nilai saat ditolak (bisa parsial untuk DU/DAP/LAP/TO)
+    bound: Optional[MetricBound] = None        # Batas yang dilanggar
+    metrics: Dict[str, Union[int, float]]      # Metrik yang sudah dihitung penuh
+
+class TableKind(str, Enum):
+    DDT = "ddt"   # Difference Distribution Table
+    LAT = "lat"   # Linear Approximation Table (#cocok - 128)
+    BCT = "bct"   # Boomerang Connectivity Table (S-box harus bijektif)
+    ACT = "act"   # Autocorrelation Table
+
+class TableFormat(str, Enum):
+    RAW = "raw"   # Little-endian mentah, shape/dtype di header
+    NPY = "npy"   # File .npy (np.load)
+    JSON = "json"
+
+class SBoxTableRequest(SBoxCheckRequest):
+    table: TableKind = TableKind.DDT
+    format: TableFormat = TableFormat.RAW
+
+class SBoxBatchRequest(BaseModel):
+    # Item: array 256 angka, string hex 512 digit, atau object {"sbox", "affine_matrix", "affine_vector"}.
+    # Item tidak divalidasi di sini agar item yang rusak dilaporkan per item, bukan 422 untuk seluruh batch.
+    sboxes: List[Any]
+    irreducible_poly: Optional[int] = None
@@ -1,11 +1,18 @@
 from pydantic import BaseModel, field_validator
 from typing import List, Optional
+from enum import Enum
+
+# --- Mode Operasi Block Cipher ---
+class CipherMode(str, Enum):
+    ECB = "ecb"
+    CTR = "ctr"   # Counter mode: nonce 8 byte + counter 64-bit, tanpa padding
 
 # --- Model untuk Request Enkripsi ---
 class EncryptRequest(BaseModel):
     sbox: List[int]      # Array S-box custom (harus 256 angka)
     plaintext: str       # Teks biasa yang ingin dienkripsi
     key: str             # Kunci rahasia (akan dipadding/truncate otomatis jadi 16 byte)
+    mode: CipherMode = CipherMode.ECB
 
     # Validator: Memastikan panjang S-box tepat 256
     @field_validator('sbox')
@@ -19,6 +26,7 @@ class DecryptRequest(BaseModel):
     sbox: List[int]      # S-box yang SAMA saat enkripsi
     ciphertext: str      # String Hexadesimal hasil enkripsi
     key: str             # Kunci yang SAMA
+    mode: CipherMode = CipherMode.ECB   # CTR: 8 byte pertama ciphertext adalah nonce
 
     @field_validator('sbox')
     def check_sbox_length(cls, v):
@@ -35,6 +43,7 @@ class EncryptImageRequest(BaseModel):
     sbox: List[int]
     image_base64: str
     key: str
+    mode: CipherMode = CipherMode.ECB
     mime_type: Optional[str] = None
     filename: Optional[str] = None
 
@@ -49,6 +58,8 @@ class DecryptImageRequest(BaseModel):
     sbox: List[int]
     ciphertext_base64: str
     key: str
+    mode: CipherMode = CipherMode.ECB
+    nonce: Optional[str] = None   # Hex nonce dari response enkripsi (wajib untuk CTR)
     mime_type: Optional[str] = None
 
     @field_validator('sbox')
@@ -61,3 +72,5 @@ class ImageCipherResponse(BaseModel):
     result: str
     mime_type: Optional[str] = None
     filename: Optional[str] = None
+    mode: Optional[CipherMode] = None
+    nonce: Optional[str] = None   # Hex nonce (hanya untuk mode CTR)
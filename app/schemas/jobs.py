@@ -0,0 +1,23 @@
+# app/schemas/jobs.py
+from pydantic import BaseModel
+from typing import Optional
+from enum import Enum
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str                               # explore_affine, search_sbox, analyze_batch, encrypt_image, decrypt_image
+    status: JobStatus
+    done: int                               # Unit kerja selesai (item, kandidat, ...)
+    total: Optional[int] = None             # None bila tidak diketahui di awal
+    progress: Optional[float] = None        # done / total (0-1)
+    created_at: float                       # Unix timestamp
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
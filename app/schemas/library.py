@@ -0,0 +1,52 @@
+# app/schemas/library.py
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional, Union
+from enum import Enum
+from app.schemas.analysis import SBoxAnalysisRequest, MetricBound
+
+class LibraryInsertRequest(SBoxAnalysisRequest):
+    source: str = "manual"                  # Asal S-box: generate, upload, manual, ...
+
+class LibraryOrder(str, Enum):
+    ID = "id"                               # Urutan penyimpanan
+    NL = "nl"
+    SAC = "sac"
+    BIC_NL = "bic_nl"
+    BIC_SAC = "bic_sac"
+    LAP = "lap"
+    DAP = "dap"
+    DU = "du"
+    AD = "ad"
+    TO = "to"
+    CI = "ci"
+
+class LibraryQueryRequest(BaseModel):
+    # Contoh: {"nl": {"min": 112}, "sac": {"min": 0.49, "max": 0.51}} dengan order_by "to"
+    bounds: Dict[str, MetricBound] = {}
+    order_by: LibraryOrder = LibraryOrder.ID
+    descending: bool = False
+    limit: int = 50
+    cursor: Optional[str] = None            # next_cursor dari halaman sebelumnya
+
+    @field_validator('limit')
+    def check_limit(cls, v):
+        if not 1 <= v <= 500:
+            raise ValueError('limit harus 1-500.')
+        return v
+
+class LibraryEntry(BaseModel):
+    id: int
+    sbox_hash: str
+    sbox: List[int]
+    affine_matrix: Optional[List[List[int]]] = None
+    affine_vector: Optional[List[int]] = None
+    irreducible_poly: Optional[int] = None
+    affine_family: Optional[bool] = None
+    source: Optional[str] = None
+    metrics: Dict[str, Union[int, float]]
+    created_at: float
+    created: Optional[bool] = None          # Hanya pada insert: False bila S-box sudah ada
+
+class LibraryPage(BaseModel):
+    items: List[LibraryEntry]
+    next_cursor: Optional[str] = None       # None bila sudah halaman terakhir
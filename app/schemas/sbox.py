@@ -9,6 +9,16 @@ class SBoxResponse(BaseModel):
     sbox: List[int]
     is_bijective: bool
     is_balanced: bool
+    irreducible_poly: Optional[int] = None   # Polinomial field GF(2^8) yang dipakai
+    seed: Optional[int] = None               # Seed RNG yang dipakai (entropy baru bila tidak diminta)
+    stream: Optional[int] = None             # Indeks stream RNG; (seed, stream) mereproduksi S-box
+    sbox_hash: Optional[str] = None          # Hash di library S-box (bila save=true)
+
+class BulkFormat(str, Enum):
+    JSON = "json"       # {"affine_matrices": [...], "sboxes": [...]}
+    NDJSON = "ndjson"   # Satu baris {"index", "affine_matrix", "sbox"} per S-box (streaming)
+    RAW = "raw"         # uint8 (count, 264): 8 baris matriks bit-packed + 256 entri S-box
+    NPY = "npy"         # Array yang sama dalam format .npy
 
 class SBoxCheckRequest(BaseModel):
     sbox: List[int]
@@ -31,6 +41,7 @@ class SBoxUploadResponse(BaseModel):
     affine_matrix: Optional[List[List[int]]] = None
     affine_vector: Optional[List[int]] = None
     message: str
+    sbox_hash: Optional[str] = None          # Hash di library S-box (bila save=true)
 
 class ExportFormat(str, Enum):
     JSON = "json"
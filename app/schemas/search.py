@@ -0,0 +1,98 @@
+# app/schemas/search.py
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional, Union
+from enum import Enum
+from app.schemas.analysis import MetricBound
+
+class SwapRequest(BaseModel):
+    x1: int
+    x2: int
+
+    @field_validator('x1', 'x2')
+    def check_position(cls, v):
+        if not 0 <= v <= 255:
+            raise ValueError('Posisi swap harus 0-255.')
+        return v
+
+class SwapSessionResponse(BaseModel):
+    session_id: str
+    sbox: List[int]
+    steps: int                              # Jumlah swap yang bisa di-undo (maks. SWAP_HISTORY_LIMIT)
+    metrics: Dict[str, Union[int, float]]   # NL, BIC-NL, DU, DAP, SAC, BIC-SAC terkini
+
+class ExploreObjective(str, Enum):
+    SAC = "sac"           # |SAC - 0.5| minimum
+    BIC_SAC = "bic_sac"   # |BIC-SAC - 0.5| minimum
+    TO = "to"             # Transparency Order minimum
+
+class ExploreAffineRequest(BaseModel):
+    # Tanpa affine_matrix: titik awal acak dari generator (seed opsional)
+    affine_matrix: Optional[List[List[int]]] = None
+    affine_vector: Optional[List[int]] = None
+    irreducible_poly: Optional[int] = None
+    seed: Optional[int] = None
+    objective: ExploreObjective = ExploreObjective.SAC
+    max_steps: int = 50
+
+    @field_validator('affine_matrix')
+    def check_matrix(cls, v):
+        if v is not None and (len(v) != 8 or any(len(row) != 8 for row in v)):
+            raise ValueError('Matriks affine harus berukuran 8x8.')
+        return v
+
+    @field_validator('max_steps')
+    def check_steps(cls, v):
+        if not 0 <= v <= 1000:
+            raise ValueError('max_steps harus 0-1000.')
+        return v
+
+    @field_validator('seed')
+    def check_seed(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('seed harus bilangan bulat non-negatif.')
+        return v
+
+class ExploreAffineResponse(BaseModel):
+    objective: str
+    start_matrix: List[List[int]]
+    start_metrics: Dict[str, Union[int, float]]
+    affine_matrix: List[List[int]]
+    affine_vector: List[int]
+    sbox: List[int]
+    metrics: Dict[str, Union[int, float]]   # Semua metrik (invarian + non-invarian)
+    steps: int
+    path: List[Dict]                        # Urutan flip [i, j] dan skor setelahnya
+    irreducible_poly: int
+
+class SBoxSearchRequest(BaseModel):
+    # Contoh: {"sac": {"min": 0.499, "max": 0.501}, "bic_sac": {"max": 0.502}}
+    bounds: Dict[str, MetricBound]
+    max_seconds: float = 10.0              # Budget waktu
+    max_candidates: Optional[int] = None   # Budget jumlah kandidat (opsional)
+    max_results: int = 10
+    seed: Optional[int] = None             # Seed induk; tiap task memakai stream turunannya
+    irreducible_poly: Optional[int] = None
+
+    @field_validator('max_seconds')
+    def check_seconds(cls, v):
+        if not 0 < v <= 300:
+            raise ValueError('max_seconds harus antara 0 dan 300.')
+        return v
+
+    @field_validator('max_candidates')
+    def check_candidates(cls, v):
+        if v is not None and v < 1:
+            raise ValueError('max_candidates minimal 1.')
+        return v
+
+    @field_validator('max_results')
+    def check_results(cls, v):
+        if not 1 <= v <= 1000:
+            raise ValueError('max_results harus 1-1000.')
+        return v
+
+    @field_validator('seed')
+    def check_seed(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('seed harus bilangan bulat non-negatif.')
+        return v
@@ -1,6 +1,75 @@
 # app/services/aes_wrapper.py
-from app.utils.aes_engine import AESEngine
-from typing import List
+from app.utils.aes_engine import AESTTableEngine
+from app.utils.aes_batch import AESBatchEngine
+from app.utils.lru_cache import TTLLRUCache
+from app.services.process_pool import get_process_pool, pool_workers, reset_process_pool
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+import hashlib
+import os
+import numpy as np
+
+# Di bawah jumlah blok ini overhead NumPy lebih mahal daripada T-table per blok
+BATCH_MIN_BLOCKS = 16
+
+# Mode operasi yang didukung
+MODE_ECB = "ecb"
+MODE_CTR = "ctr"
+
+# CTR: blok counter = nonce (8 byte) || counter big-endian (8 byte)
+CTR_NONCE_SIZE = 8
+# Payload CTR sebesar ini ke atas dibagi ke process pool
+CTR_PARALLEL_MIN_BYTES = 1 << 20
+
+# Cache engine yang sudah di-expand, dikunci dengan digest (S-box, key)
+ENGINE_CACHE_SIZE = 64
+ENGINE_CACHE_TTL = 15 * 60
+_ENGINE_CACHE = TTLLRUCache(max_size=ENGINE_CACHE_SIZE, ttl=ENGINE_CACHE_TTL)
+
+
+class CachedEngines:
+    """
+    Kumpulan engine untuk satu pasangan (S-box, key).
+    Tiap engine (beserta tabel turunannya: inverse S-box, round key, T-table)
+    dibuat sekali saat pertama dipakai lalu disimpan di cache.
+    """
+    def __init__(self, key: bytes, sbox: List[int]):
+        self.key = key
+        self.sbox = list(sbox)
+        self._ttable: Optional[AESTTableEngine] = None
+        self._batch: Optional[AESBatchEngine] = None
+
+    @property
+    def ttable(self) -> AESTTableEngine:
+        if self._ttable is None:
+            self._ttable = AESTTableEngine(self.key, self.sbox)
+        return self._ttable
+
+    @property
+    def batch(self) -> AESBatchEngine:
+        if self._batch is None:
+            self._batch = AESBatchEngine(self.key, self.sbox)
+        return self._batch
+
+
+def _engine_cache_key(key: bytes, sbox: List[int]) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(bytes(sbox))
+    digest.update(key)
+    return digest.digest()
+
+def get_engines(key: bytes, sbox: List[int]) -> CachedEngines:
+    """Ambil engine dari cache (atau buat baru) untuk key 16 byte dan S-box tertentu."""
+    return _ENGINE_CACHE.get_or_create(
+        _engine_cache_key(key, sbox),
+        lambda: CachedEngines(key, sbox),
+    )
+
+def engine_cache_stats() -> Dict:
+    return _ENGINE_CACHE.stats()
+
+def clear_engine_cache() -> None:
+    _ENGINE_CACHE.clear()
 
 def _normalize_key(key_str: str) -> bytes:
     key_bytes = key_str.encode('utf-8')
@@ -13,82 +82,289 @@ def pad(data: bytes) -> bytes:
     length = 16 - (len(data) % 16)
     return data + bytes([length] * length)
 
+ECB_MISALIGNED_ERROR = "Panjang ciphertext ECB harus kelipatan 16 byte."
+
+def _check_ecb_ciphertext(length: int) -> None:
+    """Ciphertext ECB + PKCS#7 selalu kelipatan 16 byte; selain itu terpotong/rusak."""
+    if length % 16:
+        raise ValueError(ECB_MISALIGNED_ERROR)
+
 def unpad(data: bytes) -> bytes:
     """Remove PKCS#7 Padding"""
     length = data[-1]
     if length > 16: return data # Error safety
     return data[:-length]
 
-def aes_encrypt_custom(plaintext_str: str, key_str: str, sbox: List[int]) -> str:
-    # 1. Init Engine
-    engine = AESEngine(_normalize_key(key_str), sbox)
+# Konstanta ganjil untuk hash 64-bit blok saat deduplikasi ECB
+_DEDUP_K1 = np.uint64(0x9E3779B97F4A7C15)
+_DEDUP_K2 = np.uint64(0xC2B2AE3D27D4EB4F)
 
-    # 2. Prepare Plaintext (Padding)
-    pt_bytes = pad(plaintext_str.encode('utf-8'))
+def _dedup_blocks(blocks: np.ndarray):
+    """
+    Cari blok unik pada array (N, 16): mengembalikan (blok_unik, inverse) dengan
+    blocks == blok_unik[inverse]. Pengelompokan memakai hash 64-bit lalu diverifikasi;
+    bila ada tabrakan hash, fallback ke np.unique eksak atas 16 byte penuh.
+    """
+    words = np.ascontiguousarray(blocks).view(np.uint64).reshape(-1, 2)
+    hashed = (words[:, 0] * _DEDUP_K1) ^ (words[:, 1] * _DEDUP_K2)
+    _, first, inverse = np.unique(hashed, return_index=True, return_inverse=True)
+    unique = blocks[first]
+    if not np.array_equal(unique[inverse], blocks):
+        raw = np.ascontiguousarray(blocks).view(np.dtype((np.void, 16))).ravel()
+        _, first, inverse = np.unique(raw, return_index=True, return_inverse=True)
+        unique = blocks[first]
+    return unique, inverse.reshape(-1)
+
+def _fill_dedup_stats(stats: Optional[Dict], total: int, unique: int) -> None:
+    if stats is None:
+        return
+    stats["blocks"] = total
+    stats["unique_blocks"] = unique
+    stats["duplicate_ratio"] = (total - unique) / total if total else 0.0
+
+def _ecb_process(data: bytes, key: bytes, sbox: List[int], decrypt: bool = False,
+                 stats: Optional[Dict] = None) -> bytes:
+    """
+    ECB untuk data kelipatan 16 byte. Blok identik hanya diproses sekali lalu hasilnya
+    disebar kembali ke posisinya (output identik byte per byte dengan ECB biasa).
+    Data besar memakai batch NumPy, data kecil memakai T-table dengan memo dict.
+    Bila stats diberikan, diisi jumlah blok, blok unik, dan rasio duplikat.
+    """
+    engines = get_engines(key, sbox)
+    n_blocks = len(data) // 16
+
+    if n_blocks >= BATCH_MIN_BLOCKS:
+        engine = engines.batch
+        blocks = np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+        unique, inverse = _dedup_blocks(blocks)
+        _fill_dedup_stats(stats, n_blocks, len(unique))
+        out = engine.decrypt_blocks(unique) if decrypt else engine.encrypt_blocks(unique)
+        return out[inverse].tobytes()
+
+    engine = engines.ttable
+    fn = engine.decrypt_block if decrypt else engine.encrypt_block
+    memo = {}
+    out = []
+    for i in range(0, len(data), 16):
+        block = data[i:i+16]
+        result = memo.get(block)
+        if result is None:
+            result = memo[block] = fn(block)
+        out.append(result)
+    _fill_dedup_stats(stats, n_blocks, len(memo))
+    return b"".join(out)
+
+def _ecb_encrypt(data: bytes, key: bytes, sbox: List[int], stats: Optional[Dict] = None) -> bytes:
+    return _ecb_process(data, key, sbox, decrypt=False, stats=stats)
+
+def _ecb_decrypt(data: bytes, key: bytes, sbox: List[int], stats: Optional[Dict] = None) -> bytes:
+    return _ecb_process(data, key, sbox, decrypt=True, stats=stats)
+
+def new_ctr_nonce() -> bytes:
+    return os.urandom(CTR_NONCE_SIZE)
+
+def _ctr_xor_segment(data: bytes, key: bytes, sbox: List[int], nonce: bytes, start_block: int) -> bytes:
+    """
+    XOR data dengan keystream CTR mulai dari blok counter start_block.
+    Fungsi top-level agar bisa dijalankan di worker process pool.
+    """
+    n_blocks = -(-len(data) // 16)
+    if n_blocks == 0:
+        return b""
+    counters = np.empty((n_blocks, 16), dtype=np.uint8)
+    counters[:, :CTR_NONCE_SIZE] = np.frombuffer(nonce, dtype=np.uint8)
+    counters[:, CTR_NONCE_SIZE:] = (
+        np.arange(start_block, start_block + n_blocks, dtype=np.uint64)
+        .astype(">u8").view(np.uint8).reshape(n_blocks, 8)
+    )
+    engines = get_engines(key, sbox)
+    if n_blocks >= BATCH_MIN_BLOCKS:
+        keystream = engines.batch.encrypt_blocks(counters)
+    else:
+        engine = engines.ttable
+        keystream = np.frombuffer(
+            b"".join(engine.encrypt_block(block.tobytes()) for block in counters), dtype=np.uint8
+        )
+    keystream = keystream.reshape(-1)[:len(data)]
+    return np.bitwise_xor(np.frombuffer(data, dtype=np.uint8), keystream).tobytes()
 
-    # 3. Encrypt Block by Block (ECB Mode Simplification)
-    encrypted_blocks = []
-    for i in range(0, len(pt_bytes), 16):
-        block = pt_bytes[i:i+16]
-        encrypted_blocks.append(engine.encrypt_block(block))
+def _ctr_xor(data: bytes, key: bytes, sbox: List[int], nonce: bytes, start_block: int = 0) -> bytes:
+    """
+    CTR (enkripsi = dekripsi). Blok keystream saling independen, jadi payload besar
+    dibagi per rentang counter ke process pool; payload kecil diproses langsung.
+    """
+    if len(nonce) != CTR_NONCE_SIZE:
+        raise ValueError(f"Nonce CTR harus {CTR_NONCE_SIZE} byte.")
+    workers = pool_workers()
+    if len(data) < CTR_PARALLEL_MIN_BYTES or workers < 2:
+        return _ctr_xor_segment(data, key, sbox, nonce, start_block)
 
-    return b"".join(encrypted_blocks).hex()
+    pool = get_process_pool()
+    if pool is None:
+        return _ctr_xor_segment(data, key, sbox, nonce, start_block)
+
+    # Segmen harus kelipatan 16 byte agar counter tiap segmen tersambung
+    n_blocks = -(-len(data) // 16)
+    seg_blocks = -(-n_blocks // workers)
+    seg_bytes = seg_blocks * 16
+    try:
+        futures = [
+            pool.submit(_ctr_xor_segment, data[off:off + seg_bytes], key, list(sbox), nonce, start_block + off // 16)
+            for off in range(0, len(data), seg_bytes)
+        ]
+        return b"".join(f.result() for f in futures)
+    except BrokenProcessPool:
+        reset_process_pool()
+        return _ctr_xor_segment(data, key, sbox, nonce, start_block)
+
+def aes_encrypt_custom(plaintext_str: str, key_str: str, sbox: List[int], mode: str = MODE_ECB) -> str:
+    if mode == MODE_CTR:
+        # CTR: hasil hex = nonce || ciphertext (tanpa padding)
+        nonce = new_ctr_nonce()
+        ct = _ctr_xor(plaintext_str.encode('utf-8'), _normalize_key(key_str), sbox, nonce)
+        return (nonce + ct).hex()
+
+    # 1. Prepare Plaintext (Padding)
+    pt_bytes = pad(plaintext_str.encode('utf-8'))
 
-def aes_decrypt_custom(ciphertext_hex: str, key_str: str, sbox: List[int]) -> str:
-    # 1. Init Engine
-    engine = AESEngine(_normalize_key(key_str), sbox)
+    # 2. Encrypt (ECB Mode Simplification)
+    return _ecb_encrypt(pt_bytes, _normalize_key(key_str), sbox).hex()
 
-    # 2. Decode Hex
+def aes_decrypt_custom(ciphertext_hex: str, key_str: str, sbox: List[int], mode: str = MODE_ECB) -> str:
+    # 1. Decode Hex
     try:
         ct_bytes = bytes.fromhex(ciphertext_hex)
     except:
         return "Error: Invalid Hex"
 
-    # 3. Decrypt Block by Block
-    decrypted_blocks = []
-    for i in range(0, len(ct_bytes), 16):
-        block = ct_bytes[i:i+16]
-        decrypted_blocks.append(engine.decrypt_block(block))
+    if mode == MODE_CTR:
+        if len(ct_bytes) < CTR_NONCE_SIZE:
+            return "Error: Ciphertext CTR terlalu pendek"
+        nonce, body = ct_bytes[:CTR_NONCE_SIZE], ct_bytes[CTR_NONCE_SIZE:]
+        return _ctr_xor(body, _normalize_key(key_str), sbox, nonce).decode('utf-8', errors='ignore')
 
-    full_decrypted = b"".join(decrypted_blocks)
+    # 2. Decrypt (ciphertext harus kelipatan 16 byte)
+    if len(ct_bytes) % 16:
+        return f"Error: {ECB_MISALIGNED_ERROR}"
+    full_decrypted = _ecb_decrypt(ct_bytes, _normalize_key(key_str), sbox)
 
-    # 4. Unpad
+    # 3. Unpad
     return unpad(full_decrypted).decode('utf-8', errors='ignore')
 
-def aes_encrypt_bytes(data: bytes, key_str: str, sbox: List[int]) -> bytes:
-    engine = AESEngine(_normalize_key(key_str), sbox)
-    padded = pad(data)
-    encrypted_blocks = []
-    for i in range(0, len(padded), 16):
-        block = padded[i:i+16]
-        encrypted_blocks.append(engine.encrypt_block(block))
-    return b"".join(encrypted_blocks)
-
-def aes_decrypt_bytes(ciphertext: bytes, key_str: str, sbox: List[int]) -> bytes:
-    engine = AESEngine(_normalize_key(key_str), sbox)
-    decrypted_blocks = []
-    for i in range(0, len(ciphertext), 16):
-        block = ciphertext[i:i+16]
-        decrypted_blocks.append(engine.decrypt_block(block))
-    full_decrypted = b"".join(decrypted_blocks)
+def aes_encrypt_bytes(data: bytes, key_str: str, sbox: List[int], mode: str = MODE_ECB) -> bytes:
+    """ECB + PKCS#7, atau CTR dengan hasil nonce || ciphertext."""
+    if mode == MODE_CTR:
+        nonce = new_ctr_nonce()
+        return nonce + _ctr_xor(data, _normalize_key(key_str), sbox, nonce)
+    return _ecb_encrypt(pad(data), _normalize_key(key_str), sbox)
+
+def aes_decrypt_bytes(ciphertext: bytes, key_str: str, sbox: List[int], mode: str = MODE_ECB) -> bytes:
+    if mode == MODE_CTR:
+        if len(ciphertext) < CTR_NONCE_SIZE:
+            raise ValueError("Ciphertext CTR terlalu pendek.")
+        nonce = ciphertext[:CTR_NONCE_SIZE]
+        return _ctr_xor(ciphertext[CTR_NONCE_SIZE:], _normalize_key(key_str), sbox, nonce)
+    _check_ecb_ciphertext(len(ciphertext))
+    full_decrypted = _ecb_decrypt(ciphertext, _normalize_key(key_str), sbox)
     return unpad(full_decrypted)
 
-def aes_encrypt_bytes_no_pad(data: bytes, key_str: str, sbox: List[int]) -> bytes:
-    """Encrypt bytes without padding; tail bytes (len % 16) are left unchanged."""
-    engine = AESEngine(_normalize_key(key_str), sbox)
+def aes_encrypt_bytes_no_pad(data: bytes, key_str: str, sbox: List[int], mode: str = MODE_ECB,
+                             nonce: Optional[bytes] = None, stats: Optional[Dict] = None) -> bytes:
+    """
+    Encrypt bytes without padding; in ECB mode tail bytes (len % 16) are left unchanged.
+    In CTR mode every byte is encrypted and the nonce must be supplied (not prepended).
+    stats (ECB only) is filled with block deduplication statistics.
+    """
+    if mode == MODE_CTR:
+        if nonce is None:
+            raise ValueError("Mode CTR membutuhkan nonce.")
+        return _ctr_xor(data, _normalize_key(key_str), sbox, nonce)
     full_len = len(data) - (len(data) % 16)
-    encrypted_blocks = []
-    for i in range(0, full_len, 16):
-        block = data[i:i+16]
-        encrypted_blocks.append(engine.encrypt_block(block))
-    return b"".join(encrypted_blocks) + data[full_len:]
+    return _ecb_encrypt(data[:full_len], _normalize_key(key_str), sbox, stats) + data[full_len:]
 
-def aes_decrypt_bytes_no_pad(ciphertext: bytes, key_str: str, sbox: List[int]) -> bytes:
-    """Decrypt bytes without padding; tail bytes (len % 16) are left unchanged."""
-    engine = AESEngine(_normalize_key(key_str), sbox)
+def aes_decrypt_bytes_no_pad(ciphertext: bytes, key_str: str, sbox: List[int], mode: str = MODE_ECB,
+                             nonce: Optional[bytes] = None, stats: Optional[Dict] = None) -> bytes:
+    """Decrypt bytes without padding; kebalikan dari aes_encrypt_bytes_no_pad."""
+    if mode == MODE_CTR:
+        if nonce is None:
+            raise ValueError("Mode CTR membutuhkan nonce.")
+        return _ctr_xor(ciphertext, _normalize_key(key_str), sbox, nonce)
     full_len = len(ciphertext) - (len(ciphertext) % 16)
-    decrypted_blocks = []
-    for i in range(0, full_len, 16):
-        block = ciphertext[i:i+16]
-        decrypted_blocks.append(engine.decrypt_block(block))
-    return b"".join(decrypted_blocks) + ciphertext[full_len:]
+    return _ecb_decrypt(ciphertext[:full_len], _normalize_key(key_str), sbox, stats) + ciphertext[full_len:]
+
+class AESStreamCipher:
+    """
+    Enkripsi/dekripsi bertahap (chunk demi chunk) dengan memori konstan.
+    update(chunk) mengembalikan output yang sudah bisa dikirim, finalize() sisanya.
+    ECB: padding PKCS#7 hanya diterapkan pada chunk terakhir (saat enkripsi), dan
+    blok terakhir ditahan sampai finalize() agar bisa di-unpad (saat dekripsi).
+    CTR: output enkripsi diawali nonce; input dekripsi diawali nonce.
+    """
+    def __init__(self, key_str: str, sbox: List[int], mode: str = MODE_ECB, decrypt: bool = False):
+        self.key = _normalize_key(key_str)
+        self.sbox = list(sbox)
+        self.mode = mode
+        self.decrypt = decrypt
+        self._buffer = b""
+        self._nonce: Optional[bytes] = None
+        self._counter = 0
+        self._finalized = False
+
+    def _ctr_blocks(self, data: bytes) -> bytes:
+        out = _ctr_xor(data, self.key, self.sbox, self._nonce, self._counter)
+        self._counter += len(data) // 16
+        return out
+
+    def update(self, chunk: bytes) -> bytes:
+        if self._finalized:
+            raise ValueError("Stream sudah di-finalize.")
+        data = self._buffer + chunk
+        header = b""
+
+        if self.mode == MODE_CTR:
+            if self._nonce is None:
+                if self.decrypt:
+                    if len(data) < CTR_NONCE_SIZE:
+                        self._buffer = data
+                        return b""
+                    self._nonce, data = data[:CTR_NONCE_SIZE], data[CTR_NONCE_SIZE:]
+                else:
+                    self._nonce = new_ctr_nonce()
+                    header = self._nonce
+            # Hanya blok utuh yang diproses agar counter tetap sejajar antar chunk
+            full_len = len(data) - (len(data) % 16)
+            self._buffer = data[full_len:]
+            return header + self._ctr_blocks(data[:full_len])
+
+        full_len = len(data) - (len(data) % 16)
+        if self.decrypt and full_len == len(data) and full_len:
+            # Tahan blok terakhir: mungkin berisi padding
+            full_len -= 16
+        self._buffer = data[full_len:]
+        if not full_len:
+            return b""
+        if self.decrypt:
+            return _ecb_decrypt(data[:full_len], self.key, self.sbox)
+        return _ecb_encrypt(data[:full_len], self.key, self.sbox)
+
+    def finalize(self) -> bytes:
+        if self._finalized:
+            return b""
+        self._finalized = True
+        data, self._buffer = self._buffer, b""
+
+        if self.mode == MODE_CTR:
+            if self._nonce is None:
+                if self.decrypt:
+                    raise ValueError("Ciphertext CTR terlalu pendek.")
+                self._nonce = new_ctr_nonce()
+                return self._nonce + self._ctr_blocks(data)
+            return self._ctr_blocks(data)
+
+        if self.decrypt:
+            # Sisa tidak utuh 16 byte berarti ciphertext terpotong (sama seperti aes_decrypt_bytes)
+            _check_ecb_ciphertext(len(data))
+            if not data:
+                return b""
+            return unpad(_ecb_decrypt(data, self.key, self.sbox))
+        return _ecb_encrypt(pad(data), self.key, self.sbox)
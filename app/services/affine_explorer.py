@@ -0,0 +1,154 @@
+# app/services/affine_explorer.py
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.constants import AES_CONSTANT, AES_IRREDUCIBLE_POLY
+from app.services.sbox_generator import find_valid_sbox
+from app.utils.affine_family import base_profile, family_invariants
+from app.utils.math_gf2 import (
+    inverse_table,
+    invert_packed,
+    pack_matrix,
+    unpack_matrix,
+    packed_column_masks,
+    affine_lookup_table_packed,
+    build_affine_sbox_packed,
+)
+from app.utils.sbox_profile import POPCOUNT, _ci_order, _X, _UNIT
+
+_PAIR_BITS = [(j, k) for j in range(8) for k in range(j + 1, 8)]
+
+# Fungsi skor (lebih kecil = lebih baik) untuk tiap tujuan pencarian
+OBJECTIVES: Dict[str, Callable[[Dict], float]] = {
+    "sac": lambda m: abs(m["sac"] - 0.5),
+    "bic_sac": lambda m: abs(m["bic_sac"] - 0.5),
+    "to": lambda m: m["to"],
+}
+
+
+class AffineNeighbourhood:
+    """
+    State S(x) = A * x^-1 XOR c untuk pencarian tetangga flip satu bit matriks A.
+    Flip bit (i, j) meng-XOR bit output i dari S(x) tepat di x dengan bit j INV[x] = 1,
+    jadi S-box, selisih avalanche, dan metrik non-invarian (SAC, BIC-SAC, TO, CI)
+    diperbarui dalam O(256) tanpa membangun ulang S-box.
+    Invers A dijaga lewat update rank-1 (Sherman-Morrison di GF(2)): A + e_i e_j^T
+    invertible tepat jika (A^-1)[j][i] = 0, dan A'^-1 = A^-1 + (A^-1 e_i)(e_j^T A^-1).
+    """
+    def __init__(self, rows: List[int], constant: int = AES_CONSTANT,
+                 poly: int = AES_IRREDUCIBLE_POLY):
+        inverse = invert_packed(rows)
+        if inverse is None:
+            raise ValueError("Matriks affine harus invertible.")
+        self.rows = list(rows)
+        self.inverse = inverse
+        self.constant = constant
+        self.poly = poly
+        self.base = base_profile(poly)
+
+        inv = np.asarray(inverse_table(poly), dtype=np.int64)
+        # inv_bits[j][x] = bit j dari x^-1 (pola flip kolom j)
+        self.inv_bits = (inv[None, :] >> np.arange(8)[:, None]) & 1
+        self.s = np.asarray(build_affine_sbox_packed(self.rows, list(inv), constant), dtype=np.int64)
+        self.diffs = self.s[None, :] ^ self.s[_X[None, :] ^ _UNIT[:, None]]
+        # flip_diffs[j][k][x] = perubahan bit pada D[k][x] saat kolom j di-flip
+        self.flip_diffs = self.inv_bits[:, None, :] ^ self.inv_bits[:, _X[None, :] ^ _UNIT[:, None]]
+        # transposed[a] = A^T a (untuk TO dari tabel autokorelasi fungsi invers)
+        self.transposed = np.asarray(affine_lookup_table_packed(packed_column_masks(self.rows), 0))
+        self.ci_rows = [_ci_order(self.base.walsh[row]) for row in self.rows]
+
+    def can_flip(self, i: int, j: int) -> bool:
+        return not (self.inverse[j] >> i) & 1
+
+    def flip(self, i: int, j: int) -> None:
+        """Flip bit A[i][j] (pemanggil memastikan can_flip); flip dua kali mengembalikan state."""
+        self.rows[i] ^= 1 << j
+        pivot = self.inverse[j]
+        self.inverse = [row ^ pivot if (row >> i) & 1 else row for row in self.inverse]
+        self.s ^= self.inv_bits[j] << i
+        self.diffs ^= self.flip_diffs[j] << i
+        self.transposed ^= ((_X >> i) & 1) << j
+        self.ci_rows[i] = _ci_order(self.base.walsh[self.rows[i]])
+
+    def metrics(self) -> Dict:
+        """SAC, BIC-SAC, TO, CI dari state saat ini (identik dengan SBoxProfile)."""
+        diffs = self.diffs
+        bits = (diffs[..., None] >> np.arange(8)) & 1
+        sum_bic_sac = 0
+        for j, k in _PAIR_BITS:
+            sum_bic_sac += int((bits[..., j] ^ bits[..., k]).sum()) / (256 * 8)
+        a = _X[1:]
+        return {
+            "sac": int(POPCOUNT[diffs].sum()) / (8 * 256 * 8),
+            "bic_sac": sum_bic_sac / len(_PAIR_BITS),
+            "to": int(np.abs(self.base.autocorrelation[a, self.transposed[a]]).max()) / 256.0,
+            "ci": min(self.ci_rows),
+        }
+
+    def neighbours(self) -> List[Tuple[int, int, Dict]]:
+        """Semua tetangga flip satu bit yang invertible beserta metriknya."""
+        result = []
+        for i in range(8):
+            for j in range(8):
+                if not self.can_flip(i, j):
+                    continue
+                self.flip(i, j)
+                result.append((i, j, self.metrics()))
+                self.flip(i, j)
+        return result
+
+    @property
+    def sbox(self) -> List[int]:
+        return [int(v) for v in self.s]
+
+
+def _score(objective: str, metrics: Dict) -> Tuple:
+    # Tujuan utama dulu, lalu kriteria lain sebagai tie-breaker
+    return (OBJECTIVES[objective](metrics), metrics["to"],
+            abs(metrics["bic_sac"] - 0.5), abs(metrics["sac"] - 0.5), -metrics["ci"])
+
+
+def explore_affine(objective: str = "sac", max_steps: int = 50,
+                   affine_matrix: Optional[List[List[int]]] = None,
+                   affine_vector: Optional[List[int]] = None,
+                   poly: int = AES_IRREDUCIBLE_POLY,
+                   seed: Optional[int] = None) -> Dict:
+    """
+    Hill climbing (steepest descent) di ruang matriks affine lewat flip satu bit.
+    Mulai dari affine_matrix (bila ada) atau matriks acak find_valid_sbox(poly, seed);
+    berhenti bila tidak ada tetangga invertible yang memperbaiki skor atau max_steps tercapai.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Tujuan tidak dikenal: {objective}. Pilihan: {', '.join(OBJECTIVES)}.")
+    if affine_matrix is None:
+        start = find_valid_sbox(poly, seed)
+        affine_matrix, affine_vector = start["affine_matrix"], start["affine_vector"]
+    constant = AES_CONSTANT
+    if affine_vector is not None:
+        constant = sum((bit & 1) << i for i, bit in enumerate(affine_vector))
+
+    state = AffineNeighbourhood(pack_matrix(affine_matrix), constant, poly)
+    current = state.metrics()
+    start_metrics = dict(current)
+    path = []
+    for _ in range(max_steps):
+        best = min(state.neighbours(), key=lambda n: _score(objective, n[2]), default=None)
+        if best is None or _score(objective, best[2]) >= _score(objective, current):
+            break
+        i, j, current = best
+        state.flip(i, j)
+        path.append({"flip": [i, j], "score": OBJECTIVES[objective](current)})
+
+    metrics = dict(family_invariants(poly))
+    metrics.update(current)
+    return {
+        "objective": objective,
+        "start_matrix": affine_matrix,
+        "start_metrics": start_metrics,
+        "affine_matrix": unpack_matrix(state.rows),
+        "affine_vector": [(constant >> i) & 1 for i in range(8)],
+        "sbox": state.sbox,
+        "metrics": metrics,
+        "steps": len(path),
+        "path": path,
+        "irreducible_poly": poly,
+    }
@@ -0,0 +1,271 @@
+# app/services/analysis_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+from app.core.constants import AES_IRREDUCIBLE_POLY
+from app.utils.affine_family import analyze_sbox, find_affine_form
+from app.utils.lru_cache import TTLLRUCache
+from app.utils.sbox_profile import SBoxProfile
+
+# Tier memori: hasil analisis S-box yang paling sering diminta
+ANALYSIS_CACHE_SIZE = 1024
+
+# Tier disk: file SQLite, bisa diatur lewat env AESSBOX_ANALYSIS_DB
+# (string kosong menonaktifkan persistensi, mis. di filesystem read-only)
+DEFAULT_ANALYSIS_DB = os.path.join(tempfile.gettempdir(), "aessbox_analysis.sqlite3")
+
+# Versi isi tier disk (PRAGMA user_version). Naikkan setiap kali definisi metrik atau
+# format hasil analisis berubah: file lama dengan versi berbeda dikosongkan saat dibuka.
+ANALYSIS_SCHEMA_VERSION = 2
+
+# Field hasil analisis yang bergantung pada polinomial, bukan hanya pada S-box:
+# tidak disimpan di record cache (kunci cache = hash S-box saja)
+POLY_DEPENDENT_FIELDS = ("affine_family",)
+
+# DDT/LAT mentah (2 x 128 KB per S-box) hanya disimpan bila diminta
+TABLE_DTYPE = np.dtype("<i2")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    hash TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    ddt BLOB,
+    lat BLOB,
+    created_at REAL NOT NULL
+)
+"""
+
+
+def sbox_digest(sbox: List[int]) -> str:
+    """Alamat konten S-box: hex BLAKE2b-256 dari 256 byte S-box."""
+    return hashlib.blake2b(bytes(v & 0xFF for v in sbox), digest_size=32).hexdigest()
+
+
+def _cacheable(result: Dict) -> Dict:
+    return {k: v for k, v in result.items() if k not in POLY_DEPENDENT_FIELDS}
+
+
+def _table_to_blob(table: np.ndarray) -> bytes:
+    return np.ascontiguousarray(table, dtype=TABLE_DTYPE).tobytes()
+
+
+def _blob_to_table(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    if blob is None:
+        return None
+    return np.frombuffer(blob, dtype=TABLE_DTYPE).reshape(256, 256)
+
+
+class AnalysisCache:
+    """
+    Cache hasil /analyze-sbox berbasis alamat konten (hash S-box).
+    Dua tier: LRU di memori, lalu file SQLite agar hasil tetap ada setelah restart.
+    Bila file SQLite tidak bisa dibuka, cache tetap jalan dengan tier memori saja.
+    """
+    def __init__(self, db_path: Optional[str] = None, max_size: int = ANALYSIS_CACHE_SIZE):
+        self.memory = TTLLRUCache(max_size=max_size)
+        self.db_path = db_path or None
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.computed = 0
+        if self.db_path:
+            try:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._open_schema()
+            except sqlite3.Error:
+                self._conn = None
+
+    def _open_schema(self) -> None:
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != ANALYSIS_SCHEMA_VERSION:
+            # Hasil dari definisi metrik lama tidak boleh disajikan lagi
+            self._conn.execute("DROP TABLE IF EXISTS analysis")
+            self._conn.execute(f"PRAGMA user_version = {int(ANALYSIS_SCHEMA_VERSION)}")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    @property
+    def persistent(self) -> bool:
+        return self._conn is not None
+
+    def _disk_get(self, digest: str, columns: str = "result") -> Optional[Tuple]:
+        if self._conn is None:
+            return None
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {columns} FROM analysis WHERE hash = ?", (digest,)
+            ).fetchone()
+
+    def _disk_put(self, digest: str, result: Dict, ddt: Optional[bytes], lat: Optional[bytes]) -> None:
+        self._disk_put_many([(digest, result, ddt, lat)])
+
+    def _disk_put_many(self, rows: List[Tuple[str, Dict, Optional[bytes], Optional[bytes]]]) -> None:
+        """Simpan beberapa hasil dalam satu transaksi (satu commit)."""
+        if self._conn is None or not rows:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                # Tabel yang sudah tersimpan tidak ditimpa NULL
+                self._conn.executemany(
+                    "INSERT INTO analysis (hash, result, ddt, lat, created_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(hash) DO UPDATE SET result = excluded.result, "
+                    "ddt = COALESCE(excluded.ddt, analysis.ddt), "
+                    "lat = COALESCE(excluded.lat, analysis.lat)",
+                    [(digest, json.dumps(result), ddt, lat, now) for digest, result, ddt, lat in rows],
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+
+    def get(self, digest: str) -> Optional[Dict]:
+        """Hasil analisis untuk hash S-box, atau None bila belum pernah dihitung."""
+        result = self.memory.get(digest)
+        if result is not None:
+            return result
+        row = self._disk_get(digest)
+        if row is None:
+            self.disk_misses += 1
+            return None
+        self.disk_hits += 1
+        result = json.loads(row[0])
+        self.memory.set(digest, result)
+        return result
+
+    def get_or_compute(self, sbox: List[int], store_tables: bool = False,
+                       profile: Optional[SBoxProfile] = None,
+                       analyze: Optional[Callable[[], Dict]] = None) -> Dict:
+        """
+        Ambil hasil analisis dari cache, atau hitung lalu simpan.
+        analyze (opsional) menggantikan SBoxProfile.analysis() saat cache miss; field
+        POLY_DEPENDENT_FIELDS dari hasilnya ikut dikembalikan tapi tidak disimpan.
+        store_tables=True ikut menyimpan DDT dan LAT mentah ke tier disk.
+        """
+        digest = sbox_digest(sbox)
+        result = self.get(digest)
+        if result is not None and (not store_tables or not self.persistent or self.has_tables(digest)):
+            return result
+        if result is None:
+            if analyze is not None:
+                result = analyze()
+            else:
+                profile = profile or SBoxProfile(sbox)
+                result = profile.analysis()
+            self.computed += 1
+            self.memory.set(digest, _cacheable(result))
+        ddt = lat = None
+        if store_tables and self.persistent:
+            profile = profile or SBoxProfile(sbox)
+            ddt = _table_to_blob(profile.ddt)
+            lat = _table_to_blob(profile.lat)
+        self._disk_put(digest, _cacheable(result), ddt, lat)
+        return result
+
+    def put(self, digest: str, result: Dict) -> None:
+        """Simpan hasil yang dihitung di tempat lain (mis. worker process pool)."""
+        self.put_many([(digest, result)])
+
+    def put_many(self, items: List[Tuple[str, Dict]]) -> None:
+        """Versi batch put: semua hasil ditulis ke tier disk dalam satu transaksi."""
+        rows = []
+        for digest, result in items:
+            result = _cacheable(result)
+            self.memory.set(digest, result)
+            rows.append((digest, result, None, None))
+        self._disk_put_many(rows)
+
+    def has_tables(self, digest: str) -> bool:
+        row = self._disk_get(digest, "ddt IS NOT NULL AND lat IS NOT NULL")
+        return bool(row and row[0])
+
+    def get_tables(self, digest: str) -> Dict[str, Optional[np.ndarray]]:
+        """DDT/LAT mentah (int16, 256x256) dari tier disk; None bila tidak disimpan."""
+        row = self._disk_get(digest, "ddt, lat")
+        if row is None:
+            return {"ddt": None, "lat": None}
+        return {"ddt": _blob_to_table(row[0]), "lat": _blob_to_table(row[1])}
+
+    def invalidate(self, digest: str) -> bool:
+        """Hapus satu entry dari kedua tier; True bila entry ditemukan."""
+        found = self.memory.pop(digest)
+        if self._conn is not None:
+            with self._lock:
+                cursor = self._conn.execute("DELETE FROM analysis WHERE hash = ?", (digest,))
+                self._conn.commit()
+                found = found or cursor.rowcount > 0
+        return found
+
+    def clear(self) -> int:
+        """Kosongkan kedua tier, mengembalikan jumlah entry yang dihapus di disk."""
+        self.memory.clear()
+        if self._conn is None:
+            return 0
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM analysis")
+            self._conn.commit()
+            return cursor.rowcount
+
+    def _disk_count(self) -> int:
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.disk_hits
+        return {
+            "memory": memory,
+            "disk": {
+                "path": self.db_path if self.persistent else None,
+                "size": self._disk_count(),
+                "hits": self.disk_hits,
+                "misses": self.disk_misses,
+            },
+            "computed": self.computed,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+_CACHE: Optional[AnalysisCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Cache analisis bersama (dibuat saat pertama dipakai, bukan saat import)."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = AnalysisCache(os.environ.get("AESSBOX_ANALYSIS_DB", DEFAULT_ANALYSIS_DB))
+    return _CACHE
+
+
+def with_affine_family(result: Dict, sbox: List[int], affine_matrix=None, affine_vector=None,
+                       poly: int = AES_IRREDUCIBLE_POLY) -> Dict:
+    """Lengkapi hasil dari cache dengan affine_family untuk polinomial poly."""
+    if "affine_family" in result:
+        return result
+    family = find_affine_form(sbox, affine_matrix, affine_vector, poly) is not None
+    return {**result, "affine_family": family}
+
+
+def analyze_cached(sbox: List[int], affine_matrix=None, affine_vector=None,
+                   poly: int = AES_IRREDUCIBLE_POLY, store_tables: bool = False) -> Dict:
+    """
+    analyze_sbox lewat cache analisis bersama. Metrik di-cache per hash S-box,
+    sedangkan affine_family ditentukan ulang untuk poly pada setiap cache hit.
+    """
+    result = get_analysis_cache().get_or_compute(
+        sbox, store_tables=store_tables,
+        analyze=lambda: analyze_sbox(sbox, affine_matrix, affine_vector, poly),
+    )
+    return with_affine_family(result, sbox, affine_matrix, affine_vector, poly)
@@ -0,0 +1,149 @@
+# app/services/batch_analysis.py
+import asyncio
+import json
+from collections import deque
+from contextlib import aclosing
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from app.core.constants import AES_IRREDUCIBLE_POLY
+from app.services.analysis_cache import AnalysisCache, get_analysis_cache, sbox_digest, with_affine_family
+from app.services.process_pool import get_process_pool, pool_workers, reset_process_pool
+from app.utils.affine_family import analyze_sbox
+from app.utils.file_handlers import parse_batch_item
+
+# Jumlah S-box per task process pool (mengamortisasi biaya pickling/IPC per task)
+BATCH_TASK_ITEMS = 8
+# Batas jumlah item per batch
+MAX_BATCH_ITEMS = 10000
+
+Item = Tuple[List[int], Optional[List[List[int]]], Optional[List[int]]]
+
+
+def analyze_items(items: List[Item], poly: int = AES_IRREDUCIBLE_POLY) -> List[Tuple[bool, object]]:
+    """
+    Analisis beberapa S-box (dijalankan di worker process pool).
+    Error per item ditangkap: hasilnya (True, metrik) atau (False, pesan error).
+    """
+    results = []
+    for sbox, affine_matrix, affine_vector in items:
+        try:
+            results.append((True, analyze_sbox(sbox, affine_matrix, affine_vector, poly)))
+        except Exception as e:
+            results.append((False, str(e) or e.__class__.__name__))
+    return results
+
+
+def _submit(loop: asyncio.AbstractEventLoop, items: List[Item], poly: int) -> asyncio.Future:
+    pool = get_process_pool()
+    if pool is not None:
+        try:
+            return loop.run_in_executor(pool, analyze_items, items, poly)
+        except (BrokenProcessPool, RuntimeError):
+            reset_process_pool()
+    # Tanpa process pool: tetap keluar dari event loop lewat thread executor
+    return loop.run_in_executor(None, analyze_items, items, poly)
+
+
+async def _collect(future: asyncio.Future, items: List[Item], poly: int) -> List[Tuple[bool, object]]:
+    try:
+        return await future
+    except BrokenProcessPool:
+        reset_process_pool()
+        return await asyncio.to_thread(analyze_items, items, poly)
+
+
+def _prepare_chunk(cache: AnalysisCache, raw_chunk: list, poly: int) -> Tuple[List[tuple], List[Item]]:
+    """
+    Parse, hash, dan cek cache satu potongan input (dijalankan di thread executor).
+    entries[i]: ("error", pesan) | ("cached", digest, hasil) | ("task", digest, posisi di items).
+    """
+    entries: List[tuple] = []
+    items: List[Item] = []
+    for raw in raw_chunk:
+        try:
+            item = parse_batch_item(raw)
+        except (ValueError, TypeError) as e:
+            entries.append(("error", str(e)))
+            continue
+        digest = sbox_digest(item["sbox"])
+        cached = cache.get(digest)
+        if cached is not None:
+            # Record cache tanpa affine_family (bergantung pada poly), dilengkapi di sini
+            cached = with_affine_family(cached, item["sbox"], item["affine_matrix"], item["affine_vector"], poly)
+            entries.append(("cached", digest, cached))
+            continue
+        entries.append(("task", digest, len(items)))
+        items.append((item["sbox"], item["affine_matrix"], item["affine_vector"]))
+    return entries, items
+
+
+async def _analyze_chunk(cache: AnalysisCache, start: int, raw_chunk: list, poly: int) -> List[Dict]:
+    """Baris hasil untuk item start .. start + len(raw_chunk) - 1; cache disentuh di luar event loop."""
+    loop = asyncio.get_running_loop()
+    entries, items = await loop.run_in_executor(None, _prepare_chunk, cache, raw_chunk, poly)
+    results = await _collect(_submit(loop, items, poly), items, poly) if items else []
+
+    lines = []
+    fresh = []
+    for offset, entry in enumerate(entries):
+        index = start + offset
+        if entry[0] == "error":
+            lines.append({"index": index, "error": entry[1]})
+        elif entry[0] == "cached":
+            lines.append({"index": index, "sbox_hash": entry[1], "cached": True, "result": entry[2]})
+        else:
+            _, digest, position = entry
+            ok, value = results[position]
+            if ok:
+                fresh.append((digest, value))
+                lines.append({"index": index, "sbox_hash": digest, "cached": False, "result": value})
+            else:
+                lines.append({"index": index, "error": value})
+    if fresh:
+        # Satu transaksi SQLite per potongan
+        await loop.run_in_executor(None, cache.put_many, fresh)
+    return lines
+
+
+async def iter_batch_analysis(raw_items: list, poly: int = AES_IRREDUCIBLE_POLY) -> AsyncIterator[Dict]:
+    """
+    Hasil analisis per item, urut sesuai input:
+      {"index": i, "sbox_hash": ..., "cached": bool, "result": {...}}  atau  {"index": i, "error": "..."}
+    Input diproses per potongan BATCH_TASK_ITEMS item: parse + cek cache di thread executor,
+    sisanya ke process pool, lalu hasil baru disimpan ke cache dalam satu transaksi. Jumlah
+    potongan berjalan dibatasi (2 x worker) agar pool tetap bisa dipakai request lain, dan
+    baris dikirim begitu potongannya selesai.
+    """
+    cache = get_analysis_cache()
+    starts = range(0, len(raw_items), BATCH_TASK_ITEMS)
+    window = max(2, pool_workers() * 2)
+    pending: Deque[asyncio.Task] = deque()
+    next_chunk = 0
+
+    def schedule() -> None:
+        nonlocal next_chunk
+        while next_chunk < len(starts) and len(pending) < window:
+            start = starts[next_chunk]
+            pending.append(asyncio.ensure_future(
+                _analyze_chunk(cache, start, raw_items[start:start + BATCH_TASK_ITEMS], poly)
+            ))
+            next_chunk += 1
+
+    try:
+        schedule()
+        while pending:
+            lines = await pending.popleft()
+            schedule()
+            for line in lines:
+                yield line
+    finally:
+        # Klien putus di tengah jalan: batalkan potongan yang belum selesai
+        for task in pending:
+            task.cancel()
+
+
+async def stream_batch_analysis(raw_items: list, poly: int = AES_IRREDUCIBLE_POLY) -> AsyncIterator[str]:
+    """NDJSON dari iter_batch_analysis (satu baris per item)."""
+    async with aclosing(iter_batch_analysis(raw_items, poly)) as lines:
+        async for line in lines:
+            yield json.dumps(line) + "\n"
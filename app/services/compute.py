@@ -0,0 +1,207 @@
+# app/services/compute.py
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+from app.services.process_pool import pool_workers, run_cpu
+
+# Bobot rata-rata bergerak (EWMA) untuk durasi eksekusi, dipakai menaksir Retry-After
+SERVICE_TIME_ALPHA = 0.2
+
+
+def default_limits() -> Dict[str, Tuple[int, int]]:
+    """
+    Batas per kelompok endpoint: (eksekusi bersamaan, antrian maksimum).
+    Kelompok berat (tabel 256x256, gambar, file, eksplorasi) sengaja dibatasi lebih ketat.
+    """
+    workers = pool_workers()
+    return {
+        "analysis": (workers, 4 * workers),   # /analyze-sbox, /screen-sbox
+        "cipher": (workers, 4 * workers),     # /encrypt, /decrypt
+        "table": (2, 8),                      # /sbox-table
+        "image": (2, 8),                      # /encrypt-image, /decrypt-image
+        "files": (2, 16),                     # /upload-sbox, /download
+        "explore": (2, 8),                    # /explore-affine (process pool)
+        "generate": (2, 8),                   # /generate-sbox (count=1 dan bulk/NDJSON)
+        "batch": (2, 8),                      # /analyze-sbox/batch* (stream NDJSON, process pool)
+        "search": (2, 8),                     # /search-sbox (stream NDJSON, process pool)
+        "swap": (workers, 4 * workers),       # /swap-sessions*
+        "library": (workers, 4 * workers),    # /library (SQLite + analisis saat insert)
+    }
+
+
+class ComputeBusy(Exception):
+    """Antrian kelompok endpoint penuh; retry_after dalam detik."""
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"Server sibuk ({name}). Coba lagi dalam {retry_after} detik.")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class ComputeLimiter:
+    """
+    Admission control satu kelompok endpoint: paling banyak `concurrency` panggilan
+    berjalan, paling banyak `max_queue` menunggu; selebihnya ditolak (ComputeBusy).
+    Mencatat waktu tunggu antrian dan rata-rata durasi eksekusi.
+    """
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self._semaphore: Optional[tuple] = None
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.service_avg: Optional[float] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphore terikat ke event loop; buat ulang bila loop berganti
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self.concurrency))
+        return self._semaphore[1]
+
+    def retry_after(self) -> int:
+        """Taksiran detik sampai antrian saat ini habis (minimal 1)."""
+        service = self.service_avg or 1.0
+        return max(1, math.ceil(service * (self.waiting + 1) / self.concurrency))
+
+    def admit(self) -> None:
+        """ComputeBusy bila semua slot terpakai dan antrian sudah penuh."""
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise ComputeBusy(self.name, self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Pegang satu slot eksekusi kelompok ini (menunggu di antrian bila perlu)."""
+        semaphore = self._get_semaphore()
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        started = time.perf_counter()
+        wait = started - queued_at
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            semaphore.release()
+            elapsed = time.perf_counter() - started
+            self.service_avg = elapsed if self.service_avg is None else (
+                SERVICE_TIME_ALPHA * elapsed + (1 - SERVICE_TIME_ALPHA) * self.service_avg
+            )
+            self.completed += 1
+
+    async def run(self, fn: Callable, *args, process: bool = False) -> Any:
+        self.admit()
+        async with self.slot():
+            if process:
+                return await run_cpu(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        admitted = self.completed + self.running
+        return {
+            "concurrency": self.concurrency,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_avg_ms": round(1000 * self.wait_total / admitted, 3) if admitted else 0.0,
+            "wait_max_ms": round(1000 * self.wait_max, 3),
+            "service_avg_ms": round(1000 * self.service_avg, 3) if self.service_avg is not None else None,
+        }
+
+
+_LIMITERS: Dict[str, ComputeLimiter] = {}
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_LOCK = threading.Lock()
+
+
+def _init() -> None:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            limits = default_limits()
+            for name, (concurrency, max_queue) in limits.items():
+                _LIMITERS[name] = ComputeLimiter(name, concurrency, max_queue)
+            # Thread cukup untuk semua slot; tiap kelompok tetap dibatasi semaphore-nya
+            _EXECUTOR = ThreadPoolExecutor(
+                max_workers=sum(concurrency for concurrency, _ in limits.values()),
+                thread_name_prefix="compute",
+            )
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    if _EXECUTOR is None:
+        _init()
+    return _EXECUTOR
+
+
+def get_limiter(name: str) -> ComputeLimiter:
+    if _EXECUTOR is None:
+        _init()
+    return _LIMITERS[name]
+
+
+async def dispatch(name: str, fn: Callable, *args, process: bool = False) -> Any:
+    """
+    Jalankan fn(*args) di luar event loop lewat limiter kelompok `name`:
+    thread executor (default) atau process pool (process=True, fn harus top-level).
+    ComputeBusy bila antrian kelompok penuh.
+    """
+    return await get_limiter(name).run(fn, *args, process=process)
+
+
+_END = object()
+
+
+def dispatch_iter(name: str, iterator) -> AsyncIterator:
+    """
+    Versi streaming dispatch: memegang satu slot kelompok `name` selama iterasi.
+    Iterator biasa: setiap next(iterator) dijalankan di thread executor. Async iterator
+    (mis. stream NDJSON yang sudah membagi kerjanya ke process pool) diiterasi langsung.
+    Admission dicek saat dipanggil (ComputeBusy sebelum response dimulai), bukan di tengah stream.
+    """
+    limiter = get_limiter(name)
+    limiter.admit()
+
+    async def iterate():
+        async with limiter.slot():
+            loop = asyncio.get_running_loop()
+            while True:
+                item = await loop.run_in_executor(_get_executor(), next, iterator, _END)
+                if item is _END:
+                    return
+                yield item
+
+    async def iterate_async():
+        async with limiter.slot():
+            async with aclosing(iterator) as items:
+                async for item in items:
+                    yield item
+
+    if hasattr(iterator, "__anext__"):
+        return iterate_async()
+    return iterate()
+
+
+def compute_stats() -> Dict[str, Dict[str, Any]]:
+    if _EXECUTOR is None:
+        _init()
+    return {name: limiter.stats() for name, limiter in _LIMITERS.items()}
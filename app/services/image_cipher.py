@@ -0,0 +1,117 @@
+# app/services/image_cipher.py
+import base64
+import io
+from typing import Dict, List, Optional
+from PIL import Image
+from app.services.aes_wrapper import (
+    aes_encrypt_bytes_no_pad,
+    aes_decrypt_bytes_no_pad,
+    new_ctr_nonce,
+    CTR_NONCE_SIZE,
+    MODE_CTR,
+)
+
+
+def normalize_image_mode(image: Image.Image) -> Image.Image:
+    if image.mode in ("RGBA", "LA"):
+        return image.convert("RGBA")
+    if image.mode == "P" and "transparency" in image.info:
+        return image.convert("RGBA")
+    if image.mode in ("L", "RGB"):
+        return image
+    return image.convert("RGB")
+
+
+def format_dedup_header(stats: dict) -> str:
+    """Isi header X-ECB-Dedup dari statistik deduplikasi blok ECB."""
+    return "blocks={}; unique={}; duplicate_ratio={:.4f}".format(
+        stats["blocks"], stats["unique_blocks"], stats["duplicate_ratio"]
+    )
+
+
+def _to_png_base64(image: Image.Image) -> str:
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def _decode_base64(data: str, message: str) -> bytes:
+    try:
+        return base64.b64decode(data, validate=True)
+    except Exception:
+        raise ValueError(message)
+
+
+def _parse_nonce(mode: str, nonce_hex: Optional[str]) -> Optional[bytes]:
+    if mode != MODE_CTR:
+        return None
+    try:
+        nonce = bytes.fromhex(nonce_hex or "")
+    except ValueError:
+        nonce = b""
+    if len(nonce) != CTR_NONCE_SIZE:
+        raise ValueError(f"Nonce CTR harus {CTR_NONCE_SIZE} byte (hex).")
+    return nonce
+
+
+def _open_image(data: bytes, message: str) -> Image.Image:
+    try:
+        return Image.open(io.BytesIO(data))
+    except Exception:
+        raise ValueError(message)
+
+
+def check_image_input(data_base64: str, mode: str, decrypt: bool = False,
+                      nonce_hex: Optional[str] = None) -> None:
+    """
+    Validasi murah sebelum job gambar diantrikan: Base64, nonce CTR (dekripsi), dan
+    header gambar (Image.open hanya membaca header). ValueError bila tidak valid.
+    """
+    if decrypt:
+        data = _decode_base64(data_base64, "Base64 ciphertext tidak valid.")
+        _parse_nonce(mode, nonce_hex)
+        _open_image(data, "Ciphertext bukan gambar yang valid.")
+    else:
+        _open_image(_decode_base64(data_base64, "Base64 gambar tidak valid."), "Gambar tidak bisa dibaca.")
+
+
+def encrypt_image(image_base64: str, key: str, sbox: List[int], mode: str,
+                  filename: Optional[str] = None) -> Dict:
+    """
+    Enkripsi piksel gambar Base64 (hasil PNG Base64). ValueError bila input tidak valid.
+    Mengembalikan field ImageCipherResponse plus "dedup" (statistik blok ECB, bila ada).
+    """
+    image = _open_image(_decode_base64(image_base64, "Base64 gambar tidak valid."), "Gambar tidak bisa dibaca.")
+
+    nonce = new_ctr_nonce() if mode == MODE_CTR else None
+    image = normalize_image_mode(image)
+    dedup_stats = {}
+    encrypted_pixels = aes_encrypt_bytes_no_pad(image.tobytes(), key, sbox, mode, nonce, dedup_stats)
+    encrypted_image = Image.frombytes(image.mode, image.size, encrypted_pixels)
+    return {
+        "result": _to_png_base64(encrypted_image),
+        "mime_type": "image/png",
+        "filename": filename,
+        "mode": mode,
+        "nonce": nonce.hex() if nonce else None,
+        "dedup": dedup_stats or None,
+    }
+
+
+def decrypt_image(ciphertext_base64: str, key: str, sbox: List[int], mode: str,
+                  nonce_hex: Optional[str] = None) -> Dict:
+    """Kebalikan encrypt_image; mode CTR membutuhkan nonce hex dari hasil enkripsi."""
+    ciphertext_bytes = _decode_base64(ciphertext_base64, "Base64 ciphertext tidak valid.")
+    nonce = _parse_nonce(mode, nonce_hex)
+    encrypted_image = _open_image(ciphertext_bytes, "Ciphertext bukan gambar yang valid.")
+
+    encrypted_image = normalize_image_mode(encrypted_image)
+    dedup_stats = {}
+    decrypted_pixels = aes_decrypt_bytes_no_pad(encrypted_image.tobytes(), key, sbox, mode, nonce, dedup_stats)
+    decrypted_image = Image.frombytes(encrypted_image.mode, encrypted_image.size, decrypted_pixels)
+    return {
+        "result": _to_png_base64(decrypted_image),
+        "mime_type": "image/png",
+        "mode": mode,
+        "dedup": dedup_stats or None,
+    }
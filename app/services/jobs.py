@@ -0,0 +1,205 @@
+# app/services/jobs.py
+import asyncio
+import os
+import time
+import uuid
+from contextlib import aclosing
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.core.constants import AES_IRREDUCIBLE_POLY
+from app.services.affine_explorer import explore_affine
+from app.services.batch_analysis import iter_batch_analysis
+from app.services.image_cipher import encrypt_image, decrypt_image
+from app.services.process_pool import run_cpu
+from app.services.sbox_search import iter_search
+from app.utils.lru_cache import TTLLRUCache
+from app.utils.screening import Bounds
+
+# Status job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# Batas job aktif (antri + jalan); lebih dari ini submit ditolak
+MAX_ACTIVE_JOBS = 64
+# Job selesai disimpan di memori sampai JOB_TTL detik setelah selesai
+JOB_RESULT_LIMIT = 256
+JOB_TTL = float(os.environ.get("AESSBOX_JOB_TTL") or 60 * 60)
+
+_ACTIVE: Dict[str, "Job"] = {}
+_FINISHED = TTLLRUCache(max_size=JOB_RESULT_LIMIT, ttl=JOB_TTL)
+_SEMAPHORE: Optional[tuple] = None
+
+
+class JobQueueFull(Exception):
+    """Jumlah job aktif sudah mencapai MAX_ACTIVE_JOBS."""
+
+
+class Job:
+    """Satu pekerjaan background: status, progress (done/total), hasil atau error."""
+    def __init__(self, kind: str, total: Optional[int] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = JOB_QUEUED
+        self.done = 0
+        self.total = total
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "progress": min(1.0, self.done / self.total) if self.total else None,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+def job_concurrency() -> int:
+    """Jumlah job yang boleh jalan bersamaan: env AESSBOX_JOB_CONCURRENCY (default 2)."""
+    return max(1, int(os.environ.get("AESSBOX_JOB_CONCURRENCY") or 2))
+
+
+def _semaphore() -> asyncio.Semaphore:
+    # Semaphore terikat ke event loop; buat ulang bila loop berganti (mis. server di-restart in-process)
+    global _SEMAPHORE
+    loop = asyncio.get_running_loop()
+    if _SEMAPHORE is None or _SEMAPHORE[0] is not loop:
+        _SEMAPHORE = (loop, asyncio.Semaphore(job_concurrency()))
+    return _SEMAPHORE[1]
+
+
+async def _run(job: Job, runner: Callable[[Job], Awaitable[Any]]) -> None:
+    try:
+        async with _semaphore():
+            job.status = JOB_RUNNING
+            job.started_at = time.time()
+            job.result = await runner(job)
+        job.status = JOB_DONE
+    except asyncio.CancelledError:
+        job.status = JOB_CANCELLED
+    except Exception as e:
+        job.status = JOB_FAILED
+        job.error = str(e) or e.__class__.__name__
+    finally:
+        job.finished_at = time.time()
+        job.task = None
+        _ACTIVE.pop(job.id, None)
+        _FINISHED.set(job.id, job)
+
+
+def submit_job(kind: str, runner: Callable[[Job], Awaitable[Any]], total: Optional[int] = None) -> Job:
+    """
+    Daftarkan job baru dan jadwalkan di event loop yang sedang berjalan.
+    Paling banyak job_concurrency() job jalan bersamaan, sisanya antri (status queued).
+    """
+    if len(_ACTIVE) >= MAX_ACTIVE_JOBS:
+        raise JobQueueFull(f"Maksimal {MAX_ACTIVE_JOBS} job aktif.")
+    job = Job(kind, total)
+    _ACTIVE[job.id] = job
+    job.task = asyncio.get_running_loop().create_task(_run(job, runner))
+    return job
+
+
+def get_job(job_id: str) -> Optional[Job]:
+    return _ACTIVE.get(job_id) or _FINISHED.get(job_id)
+
+
+async def cancel_job(job_id: str) -> Optional[Job]:
+    """
+    Batalkan job yang masih antri/jalan, atau hapus job yang sudah selesai dari penyimpanan.
+    Yang dibatalkan adalah task asyncio job: task worker yang belum mulai ikut dibatalkan,
+    tetapi fungsi yang sudah berjalan di process pool (run_cpu) atau thread tidak bisa
+    dihentikan dan tetap jalan sampai selesai; hasilnya dibuang.
+    """
+    job = get_job(job_id)
+    if job is None:
+        return None
+    task = job.task
+    if task is not None:
+        task.cancel()
+        await asyncio.wait({task})
+    else:
+        _FINISHED.pop(job_id)
+    return job
+
+
+def job_stats() -> Dict:
+    active = list(_ACTIVE.values())
+    return {
+        "queued": sum(job.status == JOB_QUEUED for job in active),
+        "running": sum(job.status == JOB_RUNNING for job in active),
+        "concurrency": job_concurrency(),
+        "max_active": MAX_ACTIVE_JOBS,
+        "finished": _FINISHED.stats(),
+    }
+
+
+# --- Jenis job ---
+
+def submit_explore_job(objective: str, max_steps: int,
+                       affine_matrix: Optional[List[List[int]]] = None,
+                       affine_vector: Optional[List[int]] = None,
+                       poly: int = AES_IRREDUCIBLE_POLY,
+                       seed: Optional[int] = None) -> Job:
+    async def run(job: Job) -> Dict:
+        result = await run_cpu(explore_affine, objective, max_steps, affine_matrix, affine_vector, poly, seed)
+        job.done = 1
+        return result
+    return submit_job("explore_affine", run, total=1)
+
+
+def submit_batch_job(raw_items: list, poly: int = AES_IRREDUCIBLE_POLY) -> Job:
+    async def run(job: Job) -> List[Dict]:
+        results = []
+        async with aclosing(iter_batch_analysis(raw_items, poly)) as lines:
+            async for line in lines:
+                results.append(line)
+                job.done += 1
+        return results
+    return submit_job("analyze_batch", run, total=len(raw_items))
+
+
+def submit_search_job(bounds: Bounds, max_seconds: float, max_candidates: Optional[int],
+                      max_results: int, seed: Optional[int],
+                      poly: int = AES_IRREDUCIBLE_POLY) -> Job:
+    async def run(job: Job) -> Dict:
+        matches = []
+        result = {}
+        async with aclosing(iter_search(bounds, max_seconds, max_candidates, max_results, seed, poly)) as events:
+            async for event in events:
+                kind = event.pop("type")
+                if kind == "match":
+                    matches.append(event)
+                    continue
+                job.done = event.get("candidates", job.done)
+                if kind != "progress":
+                    result.update(event)
+        # "matches" di event done adalah jumlah; hasil job memuat daftar lengkapnya
+        result["matches"] = matches
+        return result
+    return submit_job("search_sbox", run, total=max_candidates)
+
+
+def submit_image_job(decrypt: bool, data_base64: str, key: str, sbox: List[int], mode: str,
+                     filename: Optional[str] = None, nonce: Optional[str] = None) -> Job:
+    # Di thread, bukan process pool: CTR besar sudah membagi blok ke process pool sendiri
+    async def run(job: Job) -> Dict:
+        if decrypt:
+            result = await asyncio.to_thread(decrypt_image, data_base64, key, sbox, mode, nonce)
+        else:
+            result = await asyncio.to_thread(encrypt_image, data_base64, key, sbox, mode, filename)
+        job.done = 1
+        return result
+    return submit_job("decrypt_image" if decrypt else "encrypt_image", run, total=1)
@@ -0,0 +1,70 @@
+# app/services/process_pool.py
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_DISABLED = False
+_LOCK = threading.Lock()
+
+
+def pool_workers() -> int:
+    """Jumlah worker pool: env AESSBOX_WORKERS (bila valid) atau jumlah core mesin."""
+    configured = os.environ.get("AESSBOX_WORKERS")
+    if configured:
+        try:
+            return max(1, int(configured))
+        except ValueError:
+            pass
+    return os.cpu_count() or 1
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Process pool bersama untuk pekerjaan CPU-bound (dibuat saat pertama dipakai).
+    Mengembalikan None bila platform tidak mendukung multiprocessing
+    (mis. runtime serverless tanpa /dev/shm); pemanggil harus fallback ke serial.
+    """
+    global _POOL, _POOL_DISABLED
+    if _POOL is not None or _POOL_DISABLED:
+        return _POOL
+    with _LOCK:
+        if _POOL is None and not _POOL_DISABLED:
+            try:
+                _POOL = ProcessPoolExecutor(
+                    max_workers=pool_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            except (OSError, NotImplementedError, ImportError):
+                _POOL_DISABLED = True
+    return _POOL
+
+
+def reset_process_pool() -> None:
+    """Matikan pool (mis. setelah BrokenProcessPool); pool baru dibuat saat dipakai lagi."""
+    global _POOL
+    with _LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False, cancel_futures=True)
+            _POOL = None
+
+
+async def run_cpu(fn: Callable, *args) -> Any:
+    """Jalankan fn(*args) di process pool; fallback ke thread bila pool tidak tersedia/rusak."""
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    if pool is not None:
+        try:
+            future = loop.run_in_executor(pool, fn, *args)
+        except (BrokenProcessPool, RuntimeError):
+            reset_process_pool()
+        else:
+            try:
+                return await future
+            except BrokenProcessPool:
+                reset_process_pool()
+    return await asyncio.to_thread(fn, *args)
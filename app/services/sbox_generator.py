@@ -1,37 +1,104 @@
 # app/services/sbox_generator.py
+import json
+from typing import Dict, Iterator, Optional
+import numpy as np
 from app.utils.math_gf2 import (
-    generate_random_affine_matrix, 
-    is_invertible_gf2, 
-    apply_affine_transform, 
-    INVERSE_TABLE
+    generate_invertible_packed,
+    unpack_matrix,
+    build_affine_sbox_packed,
+    inverse_table
 )
-from app.core.constants import AES_CONSTANT
+from app.utils.rng import make_rng, resolve_seed
+from app.utils.sbox_batch import generate_invertible_batch, affine_sboxes_batch
+from app.core.constants import AES_CONSTANT, AES_IRREDUCIBLE_POLY
 
-def find_valid_sbox():
+# Batas count untuk /generate-sbox bulk dan ukuran potongan saat streaming NDJSON
+MAX_BULK_SBOXES = 200000
+# format=json dibangun utuh di memori (~1.3 KB per S-box); jumlah besar pakai ndjson/raw/npy
+MAX_BULK_JSON_SBOXES = 1000
+BULK_CHUNK = 4096
+# Bulk: indeks [b * STREAM_BLOCK, (b + 1) * STREAM_BLOCK) memakai stream RNG (seed, stream, b),
+# 8 angka per matriks (generate_invertible_batch == generate_invertible_packed berturut-turut)
+STREAM_BLOCK = 1024
+
+def find_valid_sbox(irreducible_poly: int = AES_IRREDUCIBLE_POLY, seed: Optional[int] = None,
+                    stream: int = 0):
     """
     Logika eksplorasi:
-    Loop terus menerus generate matriks random sampai menemukan
-    yang Invertible (valid), lalu bentuk S-box nya.
+    Ambil matriks affine invertible secara acak (seragam, tanpa rejection
+    sehingga latensi konstan), lalu bentuk S-box nya.
+    irreducible_poly menentukan field GF(2^8) untuk invers (default AES 0x11B).
+    Memakai stream RNG (seed, stream, 0) yang sama dengan blok pertama bulk, jadi hasilnya
+    sama dengan indeks 0 generate_sbox_batch; tanpa seed dipakai entropy baru (53 bit)
+    yang ikut dikembalikan.
+    """
+    inv_table = inverse_table(irreducible_poly)
+    seed = resolve_seed(seed)
+    rng = make_rng(seed, stream, 0)
+
+    # 1. Eksplorasi Random (baris bit-packed, selalu invertible -> Bijektif & Balance)
+    candidate_rows = generate_invertible_packed(rng)
+
+    # 2. Konstruksi S-box (tabel affine 256 entri dibangun sekali per matriks)
+    sbox = build_affine_sbox_packed(candidate_rows, inv_table)
+
+    # Return hasil berupa dictionary atau tuple
+    return {
+        "affine_matrix": unpack_matrix(candidate_rows),
+        "affine_vector": [(AES_CONSTANT >> i) & 1 for i in range(8)],
+        "sbox": sbox,
+        "is_bijective": True,
+        "is_balanced": True,
+        "irreducible_poly": irreducible_poly,
+        "seed": seed,
+        "stream": stream
+    }
+
+
+def _generate_batch(offset: int, count: int, irreducible_poly: int,
+                    seed: int, stream: int) -> Dict[str, np.ndarray]:
+    # Blok selalu dibangkitkan penuh lalu dipotong, sehingga S-box indeks i tidak
+    # bergantung pada offset/count permintaan
+    first, last = offset // STREAM_BLOCK, (offset + count - 1) // STREAM_BLOCK
+    rows = np.concatenate([
+        generate_invertible_batch(STREAM_BLOCK, make_rng(seed, stream, block))
+        for block in range(first, last + 1)
+    ])
+    rows = rows[offset - first * STREAM_BLOCK:][:count]
+    return {"rows": rows, "sboxes": affine_sboxes_batch(rows, inverse_table(irreducible_poly))}
+
+
+def generate_sbox_batch(count: int, irreducible_poly: int = AES_IRREDUCIBLE_POLY,
+                        seed: Optional[int] = None, stream: int = 0,
+                        offset: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Versi bulk find_valid_sbox: S-box indeks offset .. offset + count - 1 dari stream
+    (seed, stream), dihitung sekaligus dengan NumPy. Indeks yang sama selalu memberi
+    S-box yang sama, jadi rentang indeks bisa dibagi ke beberapa proses tanpa koordinasi.
+    Mengembalikan {"rows": (count, 8) uint8 baris matriks bit-packed, "sboxes": (count, 256) uint8}.
     """
-    while True:
-        # 1. Eksplorasi Random
-        candidate_matrix = generate_random_affine_matrix()
-        
-        # 2. Filter Matriks (Syarat Utama Bijektif & Balance)
-        if is_invertible_gf2(candidate_matrix):
-            
-            # 3. Konstruksi S-box
-            sbox = []
-            for x in range(256):
-                inv = INVERSE_TABLE[x]
-                val = apply_affine_transform(inv, candidate_matrix)
-                sbox.append(val)
-            
-            # Return hasil berupa dictionary atau tuple
-            return {
-                "affine_matrix": candidate_matrix,
-                "affine_vector": [(AES_CONSTANT >> i) & 1 for i in range(8)],
-                "sbox": sbox,
-                "is_bijective": True,
-                "is_balanced": True
-            }
+    return _generate_batch(offset, count, irreducible_poly, resolve_seed(seed), stream)
+
+
+def unpack_rows_batch(rows: np.ndarray) -> list:
+    """(count, 8) baris bit-packed -> list matriks 8x8 (format affine_matrix SBoxResponse)."""
+    return np.unpackbits(rows[:, :, None], axis=2, bitorder="little").tolist()
+
+
+def sbox_batch_table(batch: Dict[str, np.ndarray]) -> np.ndarray:
+    """Array uint8 (count, 264): kolom 0-7 baris matriks bit-packed, kolom 8-263 S-box."""
+    return np.concatenate([batch["rows"], batch["sboxes"]], axis=1)
+
+
+def iter_sbox_batch_ndjson(count: int, irreducible_poly: int = AES_IRREDUCIBLE_POLY,
+                           seed: Optional[int] = None, stream: int = 0,
+                           offset: int = 0) -> Iterator[str]:
+    """NDJSON {"index", "affine_matrix", "sbox"} per S-box, dibangkitkan per BULK_CHUNK."""
+    seed = resolve_seed(seed)
+    for start in range(offset, offset + count, BULK_CHUNK):
+        batch = _generate_batch(start, min(BULK_CHUNK, offset + count - start), irreducible_poly, seed, stream)
+        lines = [
+            json.dumps({"index": start + i, "affine_matrix": matrix, "sbox": sbox})
+            for i, (matrix, sbox) in enumerate(zip(unpack_rows_batch(batch["rows"]), batch["sboxes"].tolist()))
+        ]
+        yield "\n".join(lines) + "\n"
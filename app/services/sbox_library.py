@@ -0,0 +1,292 @@
+# app/services/sbox_library.py
+import base64
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.core.constants import AES_IRREDUCIBLE_POLY
+from app.services.analysis_cache import analyze_cached, sbox_digest
+from app.utils.affine_family import verify_affine_form, vector_to_constant
+from app.utils.math_gf2 import pack_matrix
+from app.utils.screening import Bounds, SCREEN_ORDER, normalize_bounds
+
+# File SQLite library, bisa diatur lewat env AESSBOX_LIBRARY_DB
+# (string kosong: database di memori, hilang saat proses berhenti)
+DEFAULT_LIBRARY_DB = os.path.join(tempfile.gettempdir(), "aessbox_library.sqlite3")
+
+# Kolom metrik (nama sama dengan AnalysisResponse); masing-masing punya index
+METRIC_COLUMNS = SCREEN_ORDER
+INTEGER_METRICS = ("nl", "bic_nl", "du", "ad", "ci")
+
+MAX_PAGE_SIZE = 500
+
+# Filter dengan paling banyak sekian baris cocok: pakai index filter lalu sort;
+# lebih dari itu: telusuri index kolom urutan dan berhenti setelah satu halaman
+SORT_SCAN_LIMIT = 20000
+
+_COLUMNS = ", ".join(
+    f'"{name}" {"INTEGER" if name in INTEGER_METRICS else "REAL"} NOT NULL' for name in METRIC_COLUMNS
+)
+_SCHEMA = [
+    f"""
+    CREATE TABLE IF NOT EXISTS sboxes (
+        id INTEGER PRIMARY KEY,
+        hash TEXT NOT NULL UNIQUE,
+        sbox BLOB NOT NULL,
+        affine_matrix TEXT,
+        affine_vector TEXT,
+        irreducible_poly INTEGER,
+        affine_family INTEGER,
+        source TEXT,
+        {_COLUMNS},
+        created_at REAL NOT NULL
+    )
+    """,
+    # Index satu kolom per metrik: SQLite menambahkan rowid (id) ke setiap index, jadi
+    # ORDER BY metrik, id dan cursor (nilai, id) bisa dilayani langsung dari index
+    *[f'CREATE INDEX IF NOT EXISTS sboxes_{name} ON sboxes("{name}")' for name in METRIC_COLUMNS],
+]
+
+_SELECT = "id, hash, sbox, affine_matrix, affine_vector, irreducible_poly, affine_family, source, " + \
+    ", ".join(f'"{name}"' for name in METRIC_COLUMNS) + ", created_at"
+
+_INSERT = (
+    "INSERT INTO sboxes (hash, sbox, affine_matrix, affine_vector, irreducible_poly, affine_family, source, "
+    + ", ".join(f'"{name}"' for name in METRIC_COLUMNS)
+    + ", created_at) VALUES (" + ", ".join("?" * (len(METRIC_COLUMNS) + 8)) + ") "
+    # S-box yang sama: simpan matriks/vektor affine bila sebelumnya belum ada
+    "ON CONFLICT(hash) DO UPDATE SET "
+    "affine_matrix = COALESCE(sboxes.affine_matrix, excluded.affine_matrix), "
+    "affine_vector = COALESCE(sboxes.affine_vector, excluded.affine_vector)"
+)
+
+
+def encode_cursor(value: Any, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, row_id]).encode()).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return value, int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Cursor tidak valid.")
+
+
+def _range_terms(name: str, low: Optional[float], high: Optional[float]) -> Tuple[List[str], List[float]]:
+    terms, params = [], []
+    if low is not None:
+        terms.append(f'"{name}" >= ?')
+        params.append(low)
+    if high is not None:
+        terms.append(f'"{name}" <= ?')
+        params.append(high)
+    return terms, params
+
+
+def _row_to_entry(row: Tuple) -> Dict:
+    metrics = dict(zip(METRIC_COLUMNS, row[8:8 + len(METRIC_COLUMNS)]))
+    return {
+        "id": row[0],
+        "sbox_hash": row[1],
+        "sbox": list(row[2]),
+        "affine_matrix": json.loads(row[3]) if row[3] else None,
+        "affine_vector": json.loads(row[4]) if row[4] else None,
+        "irreducible_poly": row[5],
+        "affine_family": bool(row[6]) if row[6] is not None else None,
+        "source": row[7],
+        "metrics": metrics,
+        "created_at": row[-1],
+    }
+
+
+class SBoxLibrary:
+    """
+    Penyimpanan S-box permanen (SQLite): satu baris per S-box unik (hash BLAKE2b-256),
+    plus matriks/vektor affine, polinomial, asal (generate/upload/manual), dan 10 metrik
+    di kolom ber-index untuk query rentang. Listing memakai keyset pagination
+    (cursor = nilai kolom urutan + id terakhir), jadi halaman ke-n tetap O(log N + halaman).
+    """
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or ":memory:"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    @staticmethod
+    def _analyze(sbox: List[int], affine_matrix, affine_vector, poly: int) -> Dict:
+        return analyze_cached(sbox, affine_matrix, affine_vector, poly)
+
+    def _params(self, sbox: List[int], affine_matrix, affine_vector, poly: int,
+                source: str, metrics: Optional[Dict]) -> Tuple:
+        if len(sbox) != 256 or any(not 0 <= v <= 255 for v in sbox):
+            raise ValueError("S-box harus 256 elemen bernilai 0-255.")
+        if affine_matrix is not None:
+            # Hanya simpan matriks/vektor yang benar-benar membangkitkan S-box ini
+            constant = vector_to_constant(affine_vector) if affine_vector is not None else sbox[0]
+            if not verify_affine_form(sbox, pack_matrix(affine_matrix), constant, poly):
+                raise ValueError("Matriks/vektor affine tidak membangkitkan S-box ini.")
+        if metrics is None:
+            metrics = self._analyze(sbox, affine_matrix, affine_vector, poly)
+        return (
+            sbox_digest(sbox),
+            bytes(sbox),
+            json.dumps(affine_matrix) if affine_matrix is not None else None,
+            json.dumps(affine_vector) if affine_vector is not None else None,
+            poly,
+            int(metrics["affine_family"]) if metrics.get("affine_family") is not None else None,
+            source,
+            *[metrics[name] for name in METRIC_COLUMNS],
+            time.time(),
+        )
+
+    def add(self, sbox: List[int], affine_matrix: Optional[List[List[int]]] = None,
+            affine_vector: Optional[List[int]] = None, poly: int = AES_IRREDUCIBLE_POLY,
+            source: str = "manual", metrics: Optional[Dict] = None) -> Tuple[Dict, bool]:
+        """
+        Simpan S-box (metrik dihitung lewat cache analisis bila tidak diberikan).
+        Mengembalikan (entry, True bila baris baru); S-box yang sudah ada tidak diduplikasi.
+        """
+        params = self._params(sbox, affine_matrix, affine_vector, poly, source, metrics)
+        with self._lock:
+            created = not self._existing([params[0]])
+            self._conn.execute(_INSERT, params)
+            self._conn.commit()
+            row = self._conn.execute(f"SELECT {_SELECT} FROM sboxes WHERE hash = ?", (params[0],)).fetchone()
+        return _row_to_entry(row), created
+
+    def add_many(self, entries: Iterable[Dict], source: str = "generate",
+                 poly: int = AES_IRREDUCIBLE_POLY) -> int:
+        """
+        Simpan banyak S-box dalam satu transaksi. Tiap entry: {"sbox", "affine_matrix"?,
+        "affine_vector"?, "metrics"?}. Mengembalikan jumlah baris baru.
+        """
+        rows = [
+            self._params(e["sbox"], e.get("affine_matrix"), e.get("affine_vector"), poly,
+                         source, e.get("metrics"))
+            for e in entries
+        ]
+        digests = {row[0] for row in rows}
+        with self._lock:
+            created = len(digests - self._existing(list(digests)))
+            self._conn.executemany(_INSERT, rows)
+            self._conn.commit()
+        return created
+
+    def _existing(self, digests: List[str]) -> set:
+        """Hash yang sudah tersimpan (lookup index UNIQUE per 500 hash)."""
+        found = set()
+        for start in range(0, len(digests), 500):
+            chunk = digests[start:start + 500]
+            marks = ", ".join("?" * len(chunk))
+            found.update(h for (h,) in self._conn.execute(
+                f"SELECT hash FROM sboxes WHERE hash IN ({marks})", chunk))
+        return found
+
+    def get(self, digest: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_SELECT} FROM sboxes WHERE hash = ?", (digest,)).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def delete(self, digest: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM sboxes WHERE hash = ?", (digest,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def query(self, bounds: Optional[Bounds] = None, order_by: str = "id", descending: bool = False,
+              limit: int = 50, cursor: Optional[str] = None) -> Dict:
+        """
+        S-box yang memenuhi batas metrik (min/max inklusif), urut order_by lalu id.
+        Contoh: bounds={"nl": (112, None), "sac": (0.49, 0.51)}, order_by="to".
+        Mengembalikan {"items": [...], "next_cursor": str | None}.
+        """
+        bounds = normalize_bounds(bounds or {})
+        if order_by != "id" and order_by not in METRIC_COLUMNS:
+            raise ValueError(f"Kolom urutan tidak dikenal: {order_by}. Pilihan: id, {', '.join(METRIC_COLUMNS)}.")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        where, params = [], []
+        for name, (low, high) in bounds.items():
+            terms, values = _range_terms(name, low, high)
+            where += terms
+            params += values
+
+        op, direction = ("<", "DESC") if descending else (">", "ASC")
+        if cursor is not None:
+            value, row_id = decode_cursor(cursor)
+            if order_by == "id":
+                where.append(f"id {op} ?")
+                params.append(row_id)
+            else:
+                where.append(f'("{order_by}", id) {op} (?, ?)')
+                params += [value, row_id]
+        order = "id" if order_by == "id" else f'"{order_by}" {direction}, id'
+
+        with self._lock:
+            index = self._index_hint(bounds, order_by)
+            sql = f"SELECT {_SELECT} FROM sboxes {index}"
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += f" ORDER BY {order} {direction} LIMIT ?"
+            rows = self._conn.execute(sql, (*params, limit + 1)).fetchall()
+
+        items = [_row_to_entry(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            value = last["id"] if order_by == "id" else last["metrics"][order_by]
+            next_cursor = encode_cursor(value, last["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _index_hint(self, bounds: Bounds, order_by: str) -> str:
+        """
+        Tanpa statistik histogram, SQLite selalu memilih index filter lalu mengurutkan semua
+        baris yang cocok (lambat bila jutaan baris lolos). Hitung baris per filter dengan
+        batas SORT_SCAN_LIMIT: bila ada filter yang selektif biarkan planner; bila semua
+        filter longgar, paksa penelusuran index kolom urutan (berhenti setelah LIMIT).
+        """
+        filters = [name for name in bounds if name != order_by]
+        if not filters:
+            return ""
+        for name in filters:
+            terms, params = _range_terms(name, *bounds[name])
+            sql = (f"SELECT COUNT(*) FROM (SELECT 1 FROM sboxes INDEXED BY sboxes_{name} "
+                   f"WHERE {' AND '.join(terms)} LIMIT ?)")
+            if self._conn.execute(sql, (*params, SORT_SCAN_LIMIT)).fetchone()[0] < SORT_SCAN_LIMIT:
+                return ""
+        return "NOT INDEXED" if order_by == "id" else f"INDEXED BY sboxes_{order_by}"
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM sboxes").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": self.db_path, "size": self._count()}
+
+
+_LIBRARY: Optional[SBoxLibrary] = None
+_LIBRARY_LOCK = threading.Lock()
+
+
+def get_sbox_library() -> SBoxLibrary:
+    """Library bersama (dibuat saat pertama dipakai, bukan saat import)."""
+    global _LIBRARY
+    if _LIBRARY is None:
+        with _LIBRARY_LOCK:
+            if _LIBRARY is None:
+                path = os.environ.get("AESSBOX_LIBRARY_DB", DEFAULT_LIBRARY_DB)
+                try:
+                    _LIBRARY = SBoxLibrary(path)
+                except sqlite3.Error:
+                    # Filesystem read-only (mis. serverless): tetap jalan di memori
+                    _LIBRARY = SBoxLibrary(None)
+    return _LIBRARY
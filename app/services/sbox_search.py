@@ -0,0 +1,195 @@
+# app/services/sbox_search.py
+import asyncio
+import json
+from contextlib import aclosing
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional
+import numpy as np
+from app.core.constants import AES_CONSTANT, AES_IRREDUCIBLE_POLY
+from app.services.process_pool import get_process_pool, pool_workers, reset_process_pool
+from app.utils.affine_family import INVARIANT_METRICS, base_profile, family_invariants
+from app.utils.math_gf2 import (
+    build_affine_sbox_packed,
+    inverse_table,
+    unpack_matrix,
+    packed_column_masks,
+    affine_lookup_table_packed,
+)
+from app.utils.rng import make_rng, resolve_seed
+from app.utils.sbox_batch import generate_invertible_batch
+from app.utils.screening import Bounds, normalize_bounds, _violates
+from app.utils.sbox_profile import SBoxProfile, _ci_order, _X
+
+# Kandidat per task worker: cukup besar agar overhead IPC kecil, cukup kecil agar progress sering
+SEARCH_TASK_CANDIDATES = 256
+
+
+def check_invariant_bounds(bounds: Bounds, poly: int = AES_IRREDUCIBLE_POLY) -> Optional[str]:
+    """
+    Semua kandidat A * x^-1 XOR c punya NL, BIC-NL, LAP, DU/DAP, AD yang sama;
+    batas metrik ini cukup dicek sekali. Mengembalikan nama metrik yang mustahil dipenuhi.
+    """
+    invariants = family_invariants(poly)
+    for name in INVARIANT_METRICS:
+        if name in bounds and _violates(invariants[name], bounds[name]):
+            return name
+    return None
+
+
+def _screen_candidate(sbox: List[int], rows: List[int], bounds: Bounds, poly: int) -> Optional[Dict]:
+    """Cek metrik non-invarian termurah dulu (SAC, CI, BIC-SAC, TO); None bila ditolak."""
+    profile = SBoxProfile(sbox)
+    base = base_profile(poly)
+    metrics = {"sac": profile.sac()}
+    if "sac" in bounds and _violates(metrics["sac"], bounds["sac"]):
+        return None
+    metrics["ci"] = min(_ci_order(base.walsh[row]) for row in rows)
+    if "ci" in bounds and _violates(metrics["ci"], bounds["ci"]):
+        return None
+    metrics["bic_sac"] = profile.bic_sac()
+    if "bic_sac" in bounds and _violates(metrics["bic_sac"], bounds["bic_sac"]):
+        return None
+    transposed = np.asarray(affine_lookup_table_packed(packed_column_masks(rows), 0))
+    a = _X[1:]
+    metrics["to"] = int(np.abs(base.autocorrelation[a, transposed[a]]).max()) / 256.0
+    if "to" in bounds and _violates(metrics["to"], bounds["to"]):
+        return None
+    return metrics
+
+
+def search_task(entropy: int, task: int, count: int, bounds: Bounds,
+                poly: int = AES_IRREDUCIBLE_POLY) -> Dict:
+    """
+    Satu task worker: generate dan saring count kandidat dari stream RNG (entropy, task).
+    Top-level agar bisa dijalankan di process pool.
+    """
+    rng = make_rng(entropy, task)
+    inv_table = inverse_table(poly)
+    invariants = family_invariants(poly)
+    vector = [(AES_CONSTANT >> i) & 1 for i in range(8)]
+    matches = []
+    # Sampler yang sama dengan generate_invertible_packed, 8 angka per kandidat
+    for rows in generate_invertible_batch(count, rng).tolist():
+        sbox = build_affine_sbox_packed(rows, inv_table)
+        metrics = _screen_candidate(sbox, rows, bounds, poly)
+        if metrics is None:
+            continue
+        full = dict(invariants)
+        full.update(metrics)
+        matches.append({
+            "affine_matrix": unpack_matrix(rows),
+            "affine_vector": vector,
+            "sbox": sbox,
+            "metrics": full,
+            "task": task,
+        })
+    return {"task": task, "candidates": count, "matches": matches}
+
+
+def _submit(loop: asyncio.AbstractEventLoop, *args) -> asyncio.Future:
+    pool = get_process_pool()
+    if pool is not None:
+        try:
+            return loop.run_in_executor(pool, search_task, *args)
+        except (BrokenProcessPool, RuntimeError):
+            reset_process_pool()
+    return loop.run_in_executor(None, search_task, *args)
+
+
+async def iter_search(bounds: Bounds, max_seconds: float = 10.0,
+                      max_candidates: Optional[int] = None, max_results: int = 10,
+                      seed: Optional[int] = None,
+                      poly: int = AES_IRREDUCIBLE_POLY) -> AsyncIterator[Dict]:
+    """
+    Pencarian S-box yang memenuhi batas metrik, dibagi ke process pool per task
+    SEARCH_TASK_CANDIDATES kandidat. Setiap task punya stream RNG sendiri dari
+    make_rng(seed, task) (PCG64, SeedSequence dengan spawn_key=(task,)), dan hasil dikirim urut per task, jadi
+    seed + max_candidates yang sama memberi hasil yang sama.
+    Event: {"type": "start"}, {"type": "match"}, {"type": "progress"}, {"type": "done"}.
+    """
+    bounds = normalize_bounds(bounds)
+    entropy = resolve_seed(seed)
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    yield {"type": "start", "seed": entropy, "irreducible_poly": poly}
+
+    def remaining_candidates(submitted: int) -> int:
+        if max_candidates is None:
+            return SEARCH_TASK_CANDIDATES
+        return max(0, min(SEARCH_TASK_CANDIDATES, max_candidates - submitted))
+
+    window = max(2, pool_workers() * 2)
+    pending: List[tuple] = []
+    next_task = 0
+    submitted = 0
+    candidates = 0
+    found = 0
+
+    def fill() -> None:
+        nonlocal next_task, submitted
+        while len(pending) < window and time.monotonic() - started < max_seconds:
+            count = remaining_candidates(submitted)
+            if count == 0:
+                break
+            args = (entropy, next_task, count, bounds, poly)
+            pending.append((args, _submit(loop, *args)))
+            next_task += 1
+            submitted += count
+
+    try:
+        fill()
+        while pending:
+            args, future = pending.pop(0)
+            try:
+                result = await future
+            except BrokenProcessPool:
+                reset_process_pool()
+                result = await asyncio.to_thread(search_task, *args)
+            candidates += result["candidates"]
+            for match in result["matches"]:
+                if found >= max_results:
+                    break
+                found += 1
+                yield {"type": "match", **match}
+
+            elapsed = time.monotonic() - started
+            yield {
+                "type": "progress",
+                "candidates": candidates,
+                "matches": found,
+                "elapsed": round(elapsed, 3),
+                "rate": round(candidates / elapsed, 1) if elapsed > 0 else 0.0,
+            }
+            if found >= max_results or elapsed >= max_seconds:
+                break
+            fill()
+    finally:
+        for _, future in pending:
+            future.cancel()
+
+    if found >= max_results:
+        reason = "results"
+    elif max_candidates is not None and candidates >= max_candidates:
+        reason = "candidates"
+    else:
+        reason = "time"
+    elapsed = time.monotonic() - started
+    yield {
+        "type": "done",
+        "reason": reason,
+        "candidates": candidates,
+        "matches": found,
+        "elapsed": round(elapsed, 3),
+        "rate": round(candidates / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+async def stream_search(bounds: Bounds, max_seconds: float = 10.0,
+                        max_candidates: Optional[int] = None, max_results: int = 10,
+                        seed: Optional[int] = None,
+                        poly: int = AES_IRREDUCIBLE_POLY) -> AsyncIterator[str]:
+    """NDJSON dari iter_search (satu baris per event)."""
+    async with aclosing(iter_search(bounds, max_seconds, max_candidates, max_results, seed, poly)) as events:
+        async for event in events:
+            yield json.dumps(event) + "\n"
@@ -0,0 +1,85 @@
+# app/services/swap_sessions.py
+import os
+import threading
+import uuid
+from typing import Dict, List, Optional
+from app.utils.incremental import DEFAULT_MAX_HISTORY, IncrementalSBoxEvaluator
+from app.utils.lru_cache import TTLLRUCache
+
+# Sesi local search disimpan di memori proses; sesi yang lama tidak dipakai kadaluarsa
+SWAP_SESSION_LIMIT = 256
+SWAP_SESSION_TTL = 30 * 60
+
+
+def swap_history_limit() -> int:
+    """
+    Riwayat undo per sesi (env AESSBOX_SWAP_HISTORY bila valid, default DEFAULT_MAX_HISTORY), agar sesi
+    yang terus di-swap tidak tumbuh tanpa batas.
+    """
+    try:
+        return max(1, int(os.environ.get("AESSBOX_SWAP_HISTORY") or DEFAULT_MAX_HISTORY))
+    except ValueError:
+        return DEFAULT_MAX_HISTORY
+
+
+SWAP_HISTORY_LIMIT = swap_history_limit()
+_SESSIONS = TTLLRUCache(max_size=SWAP_SESSION_LIMIT, ttl=SWAP_SESSION_TTL)
+
+
+class SwapSession:
+    """Satu evaluator inkremental + lock (request paralel ke sesi yang sama diserialkan)."""
+    def __init__(self, sbox: List[int]):
+        self.id = uuid.uuid4().hex
+        self.evaluator = IncrementalSBoxEvaluator(sbox, SWAP_HISTORY_LIMIT)
+        self.lock = threading.Lock()
+
+    def snapshot(self) -> Dict:
+        return {
+            "session_id": self.id,
+            "sbox": self.evaluator.sbox,
+            "steps": len(self.evaluator.history),
+            "metrics": self.evaluator.metrics(),
+        }
+
+
+def create_session(sbox: List[int]) -> SwapSession:
+    session = SwapSession(sbox)
+    _SESSIONS.set(session.id, session)
+    return session
+
+
+def open_session(sbox: List[int]) -> Dict:
+    """create_session + snapshot (dijalankan di executor compute: membangun DDT/Walsh)."""
+    return create_session(sbox).snapshot()
+
+
+def read_session(session: SwapSession) -> Dict:
+    with session.lock:
+        return session.snapshot()
+
+
+def swap_entries(session: SwapSession, x1: int, x2: int) -> Dict:
+    with session.lock:
+        session.evaluator.swap(x1, x2)
+        return session.snapshot()
+
+
+def undo_swap(session: SwapSession) -> Dict:
+    """ValueError bila tidak ada swap untuk dibatalkan."""
+    with session.lock:
+        if not session.evaluator.history:
+            raise ValueError("Tidak ada swap untuk dibatalkan.")
+        session.evaluator.undo()
+        return session.snapshot()
+
+
+def get_session(session_id: str) -> Optional[SwapSession]:
+    # Disimpan ulang agar TTL dihitung dari akses terakhir
+    session = _SESSIONS.get(session_id)
+    if session is not None:
+        _SESSIONS.set(session_id, session)
+    return session
+
+
+def delete_session(session_id: str) -> bool:
+    return _SESSIONS.pop(session_id)
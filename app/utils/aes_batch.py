@@ -0,0 +1,109 @@
+# app/utils/aes_batch.py
+import numpy as np
+from typing import List
+from app.utils.aes_engine import AESEngine
+from app.utils import gf256
+
+# Jumlah blok yang diproses per iterasi agar array sementara tetap kecil (~1 MB)
+BATCH_CHUNK_BLOCKS = 65536
+
+# Posisi byte di dalam blok: index = row + 4*col (urutan input FIPS 197)
+SHIFT_ROWS = np.array([r + 4 * ((c + r) % 4) for c in range(4) for r in range(4)], dtype=np.intp)
+INV_SHIFT_ROWS = np.array([r + 4 * ((c - r) % 4) for c in range(4) for r in range(4)], dtype=np.intp)
+
+# Rotasi baris di dalam satu kolom (s1, s2, s3, s0) dst. untuk MixColumns
+_ROT1 = [1, 2, 3, 0]
+_ROT2 = [2, 3, 0, 1]
+_ROT3 = [3, 0, 1, 2]
+
+# Tabel perkalian GF(2^8) untuk MixColumns (dari app/utils/gf256.py)
+MUL2 = np.array(gf256.MUL2, dtype=np.uint8)
+MUL3 = np.array(gf256.MUL3, dtype=np.uint8)
+MUL9 = np.array(gf256.MUL9, dtype=np.uint8)
+MUL11 = np.array(gf256.MUL11, dtype=np.uint8)
+MUL13 = np.array(gf256.MUL13, dtype=np.uint8)
+MUL14 = np.array(gf256.MUL14, dtype=np.uint8)
+
+
+class AESBatchEngine:
+    """
+    AES-128 tervektorisasi (NumPy) untuk banyak blok sekaligus dengan Custom S-box.
+    Input berupa array uint8 berbentuk (N, 16); setiap round dijalankan ke semua N blok
+    sekaligus: SubBytes via fancy indexing ke S-box, ShiftRows via permutasi tetap,
+    MixColumns via tabel perkalian GF(2^8).
+    """
+    def __init__(self, key: bytes, sbox: List[int]):
+        # Key expansion tetap memakai implementasi referensi
+        reference = AESEngine(key, sbox)
+        self.sbox = np.asarray(sbox, dtype=np.uint8)
+        self.inv_sbox = np.asarray(reference.inv_sbox, dtype=np.uint8)
+        self.round_keys = np.array(
+            [[rk[r][c] for c in range(4) for r in range(4)] for rk in reference.round_keys],
+            dtype=np.uint8,
+        )
+
+    @staticmethod
+    def _mix_columns(state: np.ndarray) -> np.ndarray:
+        a = state.reshape(-1, 4, 4)  # (N, kolom, baris)
+        out = MUL2[a] ^ MUL3[a[:, :, _ROT1]] ^ a[:, :, _ROT2] ^ a[:, :, _ROT3]
+        return out.reshape(-1, 16)
+
+    @staticmethod
+    def _inv_mix_columns(state: np.ndarray) -> np.ndarray:
+        a = state.reshape(-1, 4, 4)
+        out = MUL14[a] ^ MUL11[a[:, :, _ROT1]] ^ MUL13[a[:, :, _ROT2]] ^ MUL9[a[:, :, _ROT3]]
+        return out.reshape(-1, 16)
+
+    def _encrypt_chunk(self, state: np.ndarray) -> np.ndarray:
+        rk = self.round_keys
+        state = state ^ rk[0]
+        for rnd in range(1, 10):
+            state = self.sbox[state][:, SHIFT_ROWS]
+            state = self._mix_columns(state)
+            state ^= rk[rnd]
+        state = self.sbox[state][:, SHIFT_ROWS]
+        state ^= rk[10]
+        return state
+
+    def _decrypt_chunk(self, state: np.ndarray) -> np.ndarray:
+        rk = self.round_keys
+        state = state ^ rk[10]
+        for rnd in range(9, 0, -1):
+            state = self.inv_sbox[state[:, INV_SHIFT_ROWS]]
+            state ^= rk[rnd]
+            state = self._inv_mix_columns(state)
+        state = self.inv_sbox[state[:, INV_SHIFT_ROWS]]
+        state ^= rk[0]
+        return state
+
+    def _run(self, blocks: np.ndarray, fn) -> np.ndarray:
+        blocks = np.asarray(blocks, dtype=np.uint8).reshape(-1, 16)
+        out = np.empty_like(blocks)
+        for start in range(0, len(blocks), BATCH_CHUNK_BLOCKS):
+            end = start + BATCH_CHUNK_BLOCKS
+            out[start:end] = fn(blocks[start:end])
+        return out
+
+    def encrypt_blocks(self, blocks: np.ndarray) -> np.ndarray:
+        """Enkripsi array (N, 16) uint8, mengembalikan array (N, 16) uint8."""
+        return self._run(blocks, self._encrypt_chunk)
+
+    def decrypt_blocks(self, blocks: np.ndarray) -> np.ndarray:
+        """Dekripsi array (N, 16) uint8, mengembalikan array (N, 16) uint8."""
+        return self._run(blocks, self._decrypt_chunk)
+
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        """Enkripsi ECB untuk data yang panjangnya kelipatan 16."""
+        blocks = np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+        return self.encrypt_blocks(blocks).tobytes()
+
+    def decrypt_bytes(self, data: bytes) -> bytes:
+        """Dekripsi ECB untuk data yang panjangnya kelipatan 16."""
+        blocks = np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+        return self.decrypt_blocks(blocks).tobytes()
+
+    def encrypt_block(self, plaintext: bytes) -> bytes:
+        return self.encrypt_bytes(plaintext)
+
+    def decrypt_block(self, ciphertext: bytes) -> bytes:
+        return self.decrypt_bytes(ciphertext)
@@ -1,5 +1,6 @@
 # app/utils/aes_engine.py
 from typing import List
+from app.utils.gf256 import AES_FIELD, MUL2, MUL3, MUL9, MUL11, MUL13, MUL14
 
 class AESEngine:
     """
@@ -46,15 +47,8 @@ class AESEngine:
         state[3][0], state[3][1], state[3][2], state[3][3] = state[3][1], state[3][2], state[3][3], state[3][0]
 
     def _gmul(self, a, b):
-        """Galois Field multiplication"""
-        p = 0
-        for _ in range(8):
-            if b & 1: p ^= a
-            hi_bit = a & 0x80
-            a <<= 1
-            if hi_bit: a ^= 0x1b
-            b >>= 1
-        return p % 256
+        """Galois Field multiplication (tabel log/antilog, lihat app/utils/gf256.py)"""
+        return AES_FIELD.mul(a, b)
 
     def _mix_columns(self, state):
         for i in range(4):
@@ -62,10 +56,10 @@ class AESEngine:
             s1 = state[1][i]
             s2 = state[2][i]
             s3 = state[3][i]
-            state[0][i] = self._gmul(s0, 2) ^ self._gmul(s1, 3) ^ s2 ^ s3
-            state[1][i] = s0 ^ self._gmul(s1, 2) ^ self._gmul(s2, 3) ^ s3
-            state[2][i] = s0 ^ s1 ^ self._gmul(s2, 2) ^ self._gmul(s3, 3)
-            state[3][i] = self._gmul(s0, 3) ^ s1 ^ s2 ^ self._gmul(s3, 2)
+            state[0][i] = MUL2[s0] ^ MUL3[s1] ^ s2 ^ s3
+            state[1][i] = s0 ^ MUL2[s1] ^ MUL3[s2] ^ s3
+            state[2][i] = s0 ^ s1 ^ MUL2[s2] ^ MUL3[s3]
+            state[3][i] = MUL3[s0] ^ s1 ^ s2 ^ MUL2[s3]
 
     def _inv_mix_columns(self, state):
         for i in range(4):
@@ -73,10 +67,10 @@ class AESEngine:
             s1 = state[1][i]
             s2 = state[2][i]
             s3 = state[3][i]
-            state[0][i] = self._gmul(s0, 0x0e) ^ self._gmul(s1, 0x0b) ^ self._gmul(s2, 0x0d) ^ self._gmul(s3, 0x09)
-            state[1][i] = self._gmul(s0, 0x09) ^ self._gmul(s1, 0x0e) ^ self._gmul(s2, 0x0b) ^ self._gmul(s3, 0x0d)
-            state[2][i] = self._gmul(s0, 0x0d) ^ self._gmul(s1, 0x09) ^ self._gmul(s2, 0x0e) ^ self._gmul(s3, 0x0b)
-            state[3][i] = self._gmul(s0, 0x0b) ^ self._gmul(s1, 0x0d) ^ self._gmul(s2, 0x09) ^ self._gmul(s3, 0x0e)
+            state[0][i] = MUL14[s0] ^ MUL11[s1] ^ MUL13[s2] ^ MUL9[s3]
+            state[1][i] = MUL9[s0] ^ MUL14[s1] ^ MUL11[s2] ^ MUL13[s3]
+            state[2][i] = MUL13[s0] ^ MUL9[s1] ^ MUL14[s2] ^ MUL11[s3]
+            state[3][i] = MUL11[s0] ^ MUL13[s1] ^ MUL9[s2] ^ MUL14[s3]
 
     def _add_round_key(self, state, round_key):
         for r in range(4):
@@ -166,4 +160,127 @@ class AESEngine:
         for c in range(4):
             for r in range(4):
                 output.append(state[r][c])
-        return bytes(output)
\ No newline at end of file
+        return bytes(output)
+
+class AESTTableEngine(AESEngine):
+    """
+    AES-128 berbasis T-table untuk Custom S-box.
+    SubBytes + ShiftRows + MixColumns digabung menjadi empat tabel 256 x 32-bit
+    (Te0..Te3), dan dekripsi memakai "Equivalent Inverse Cipher" (FIPS 197 5.3.5)
+    dengan tabel Td0..Td3 serta round key yang sudah melalui InvMixColumns.
+    Interface encrypt_block/decrypt_block sama dengan AESEngine.
+    """
+    def __init__(self, key: bytes, sbox: List[int]):
+        super().__init__(key, sbox)
+        self.te = self._build_enc_tables()
+        self.td = self._build_dec_tables()
+        self.enc_words = self._round_key_words()
+        self.dec_words = self._equivalent_inverse_words(self.enc_words)
+
+    @staticmethod
+    def _rotations(table: List[int]) -> List[List[int]]:
+        """Menghasilkan [T0, T1, T2, T3] dengan Ti = T0 dirotasi kanan 8*i bit."""
+        t1 = [((w >> 8) | (w << 24)) & 0xFFFFFFFF for w in table]
+        t2 = [((w >> 16) | (w << 16)) & 0xFFFFFFFF for w in table]
+        t3 = [((w >> 24) | (w << 8)) & 0xFFFFFFFF for w in table]
+        return [table, t1, t2, t3]
+
+    def _build_enc_tables(self) -> List[List[int]]:
+        te0 = []
+        for x in range(256):
+            s = self.sbox[x]
+            te0.append((MUL2[s] << 24) | (s << 16) | (s << 8) | MUL3[s])
+        return self._rotations(te0)
+
+    def _build_dec_tables(self) -> List[List[int]]:
+        td0 = []
+        for x in range(256):
+            s = self.inv_sbox[x]
+            td0.append((MUL14[s] << 24) | (MUL9[s] << 16) | (MUL13[s] << 8) | MUL11[s])
+        return self._rotations(td0)
+
+    def _round_key_words(self) -> List[List[int]]:
+        """Round key 4x4 (baris x kolom) diubah menjadi 4 word kolom big-endian per round."""
+        words = []
+        for rk in self.round_keys:
+            words.append([
+                (rk[0][c] << 24) | (rk[1][c] << 16) | (rk[2][c] << 8) | rk[3][c]
+                for c in range(4)
+            ])
+        return words
+
+    @staticmethod
+    def _equivalent_inverse_words(enc_words: List[List[int]]) -> List[List[int]]:
+        """
+        Round key untuk Equivalent Inverse Cipher: urutan dibalik dan round 1..9
+        dikenai InvMixColumns, dihitung langsung dengan tabel MUL9/11/13/14
+        (tidak lewat Td[S[b]] yang hanya benar untuk S-box bijektif).
+        """
+        dec_words = [enc_words[10][:]]
+        for r in range(9, 0, -1):
+            row = []
+            for w in enc_words[r]:
+                b0, b1, b2, b3 = w >> 24, (w >> 16) & 0xFF, (w >> 8) & 0xFF, w & 0xFF
+                row.append(
+                    ((MUL14[b0] ^ MUL11[b1] ^ MUL13[b2] ^ MUL9[b3]) << 24)
+                    | ((MUL9[b0] ^ MUL14[b1] ^ MUL11[b2] ^ MUL13[b3]) << 16)
+                    | ((MUL13[b0] ^ MUL9[b1] ^ MUL14[b2] ^ MUL11[b3]) << 8)
+                    | (MUL11[b0] ^ MUL13[b1] ^ MUL9[b2] ^ MUL14[b3])
+                )
+            dec_words.append(row)
+        dec_words.append(enc_words[0][:])
+        return dec_words
+
+    def encrypt_block(self, plaintext: bytes) -> bytes:
+        te0, te1, te2, te3 = self.te
+        sbox = self.sbox
+        rk = self.enc_words
+
+        k = rk[0]
+        s0 = int.from_bytes(plaintext[0:4], "big") ^ k[0]
+        s1 = int.from_bytes(plaintext[4:8], "big") ^ k[1]
+        s2 = int.from_bytes(plaintext[8:12], "big") ^ k[2]
+        s3 = int.from_bytes(plaintext[12:16], "big") ^ k[3]
+
+        for r in range(1, 10):
+            k = rk[r]
+            t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xFF] ^ te2[(s2 >> 8) & 0xFF] ^ te3[s3 & 0xFF] ^ k[0]
+            t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xFF] ^ te2[(s3 >> 8) & 0xFF] ^ te3[s0 & 0xFF] ^ k[1]
+            t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xFF] ^ te2[(s0 >> 8) & 0xFF] ^ te3[s1 & 0xFF] ^ k[2]
+            t3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xFF] ^ te2[(s1 >> 8) & 0xFF] ^ te3[s2 & 0xFF] ^ k[3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+
+        # Round terakhir: SubBytes + ShiftRows tanpa MixColumns
+        k = rk[10]
+        o0 = ((sbox[s0 >> 24] << 24) | (sbox[(s1 >> 16) & 0xFF] << 16) | (sbox[(s2 >> 8) & 0xFF] << 8) | sbox[s3 & 0xFF]) ^ k[0]
+        o1 = ((sbox[s1 >> 24] << 24) | (sbox[(s2 >> 16) & 0xFF] << 16) | (sbox[(s3 >> 8) & 0xFF] << 8) | sbox[s0 & 0xFF]) ^ k[1]
+        o2 = ((sbox[s2 >> 24] << 24) | (sbox[(s3 >> 16) & 0xFF] << 16) | (sbox[(s0 >> 8) & 0xFF] << 8) | sbox[s1 & 0xFF]) ^ k[2]
+        o3 = ((sbox[s3 >> 24] << 24) | (sbox[(s0 >> 16) & 0xFF] << 16) | (sbox[(s1 >> 8) & 0xFF] << 8) | sbox[s2 & 0xFF]) ^ k[3]
+        return ((o0 << 96) | (o1 << 64) | (o2 << 32) | o3).to_bytes(16, "big")
+
+    def decrypt_block(self, ciphertext: bytes) -> bytes:
+        td0, td1, td2, td3 = self.td
+        inv_sbox = self.inv_sbox
+        dk = self.dec_words
+
+        k = dk[0]
+        s0 = int.from_bytes(ciphertext[0:4], "big") ^ k[0]
+        s1 = int.from_bytes(ciphertext[4:8], "big") ^ k[1]
+        s2 = int.from_bytes(ciphertext[8:12], "big") ^ k[2]
+        s3 = int.from_bytes(ciphertext[12:16], "big") ^ k[3]
+
+        for r in range(1, 10):
+            k = dk[r]
+            t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^ td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ k[0]
+            t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^ td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ k[1]
+            t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^ td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ k[2]
+            t3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^ td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ k[3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+
+        # Round terakhir: InvShiftRows + InvSubBytes tanpa InvMixColumns
+        k = dk[10]
+        o0 = ((inv_sbox[s0 >> 24] << 24) | (inv_sbox[(s3 >> 16) & 0xFF] << 16) | (inv_sbox[(s2 >> 8) & 0xFF] << 8) | inv_sbox[s1 & 0xFF]) ^ k[0]
+        o1 = ((inv_sbox[s1 >> 24] << 24) | (inv_sbox[(s0 >> 16) & 0xFF] << 16) | (inv_sbox[(s3 >> 8) & 0xFF] << 8) | inv_sbox[s2 & 0xFF]) ^ k[1]
+        o2 = ((inv_sbox[s2 >> 24] << 24) | (inv_sbox[(s1 >> 16) & 0xFF] << 16) | (inv_sbox[(s0 >> 8) & 0xFF] << 8) | inv_sbox[s3 & 0xFF]) ^ k[2]
+        o3 = ((inv_sbox[s3 >> 24] << 24) | (inv_sbox[(s2 >> 16) & 0xFF] << 16) | (inv_sbox[(s1 >> 8) & 0xFF] << 8) | inv_sbox[s0 & 0xFF]) ^ k[3]
+        return ((o0 << 96) | (o1 << 64) | (o2 << 32) | o3).to_bytes(16, "big")
@@ -0,0 +1,134 @@
+# app/utils/affine_family.py
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.core.constants import AES_IRREDUCIBLE_POLY
+from app.utils.math_gf2 import (
+    inverse_table,
+    pack_matrix,
+    packed_column_masks,
+    affine_lookup_table_packed,
+    build_affine_sbox_packed,
+    is_invertible_packed,
+)
+from app.utils.sbox_profile import SBoxProfile, _ci_order
+
+# S-box keluaran find_valid_sbox berbentuk S(x) = A * x^-1 XOR c (A invertible),
+# jadi ekuivalen affine dengan fungsi invers x^-1. Setiap komponen v.S = (A^T v).x^-1
+# (XOR konstanta) adalah komponen tak-nol dari fungsi invers, sehingga metrik di bawah
+# sama untuk seluruh keluarga dan cukup dihitung sekali dari fungsi invers.
+INVARIANT_METRICS = ("nl", "bic_nl", "lap", "du", "dap", "ad")
+
+
+def vector_to_constant(vector: List[int]) -> int:
+    """affine_vector (bit ke-i = LSB dulu, seperti SBoxResponse) -> konstanta 8-bit."""
+    return sum((bit & 1) << i for i, bit in enumerate(vector))
+
+
+def detect_affine_form(sbox: List[int], poly: int = AES_IRREDUCIBLE_POLY) -> Optional[Tuple[List[int], int]]:
+    """
+    Cek apakah sbox = A * x^-1 XOR c di GF(2^8) dengan polinomial poly.
+    c = S(0) (karena 0^-1 = 0) dan kolom j dari A = S(inv(e_j)) XOR c; kandidat
+    (A, c) lalu diverifikasi terhadap seluruh 256 entri. Mengembalikan
+    (baris A bit-packed, c) atau None bila S-box bukan anggota keluarga ini.
+    """
+    if len(sbox) != 256:
+        return None
+    inv = inverse_table(poly)
+    constant = sbox[0]
+    columns = [sbox[inv[1 << j]] ^ constant for j in range(8)]
+    rows = packed_column_masks(columns)
+    if not verify_affine_form(sbox, rows, constant, poly):
+        return None
+    return rows, constant
+
+
+def verify_affine_form(sbox: List[int], rows: List[int], constant: int,
+                       poly: int = AES_IRREDUCIBLE_POLY) -> bool:
+    """Verifikasi penuh: A invertible dan A * x^-1 XOR c sama dengan sbox di semua entri."""
+    if len(rows) != 8 or not is_invertible_packed(rows):
+        return False
+    return build_affine_sbox_packed(rows, inverse_table(poly), constant) == list(sbox)
+
+
+@lru_cache(maxsize=32)
+def base_profile(poly: int = AES_IRREDUCIBLE_POLY) -> SBoxProfile:
+    """Profil fungsi invers x^-1 (dengan tabel Walsh & autokorelasi) per polinomial."""
+    return SBoxProfile(inverse_table(poly))
+
+
+@lru_cache(maxsize=32)
+def family_invariants(poly: int = AES_IRREDUCIBLE_POLY) -> Dict:
+    """Metrik invarian affine (NL, BIC-NL, LAP, DU/DAP, AD) dari fungsi invers."""
+    base = base_profile(poly)
+    du = base.du()
+    return {
+        "nl": base.nl(),
+        "bic_nl": base.bic_nl(),
+        "lap": base.lap(),
+        "du": du,
+        "dap": du / 256.0,
+        "ad": base.ad(),
+    }
+
+
+def analyze_affine_sbox(sbox: List[int], rows: List[int],
+                        poly: int = AES_IRREDUCIBLE_POLY) -> Dict:
+    """
+    Analisis S-box yang sudah terverifikasi berbentuk A * x^-1 XOR c.
+    Metrik invarian dibaca dari fungsi invers; SAC/BIC-SAC dihitung dari S-box,
+    sedangkan CI dan TO diturunkan dari tabel fungsi invers lewat A:
+      W_S[e_j][u] = +-W_inv[baris j dari A][u]
+      act_S[a][a] = act_inv[a][A^T a]
+    """
+    base = base_profile(poly)
+    profile = SBoxProfile(sbox)
+
+    # A^T a untuk semua a: tabel linear dengan baris A sebagai mask
+    transposed = np.asarray(affine_lookup_table_packed(packed_column_masks(rows), 0))
+    a = np.arange(1, 256)
+    to_val = int(np.abs(base.autocorrelation[a, transposed[a]]).max()) / 256.0
+    ci_val = min(_ci_order(spectrum) for spectrum in base.walsh[rows])
+
+    result = dict(family_invariants(poly))
+    result.update({
+        "sac": profile.sac(),
+        "bic_sac": profile.bic_sac(),
+        "to": to_val,
+        "ci": ci_val,
+    })
+    return result
+
+
+def find_affine_form(sbox: List[int], affine_matrix: Optional[List[List[int]]] = None,
+                     affine_vector: Optional[List[int]] = None,
+                     poly: int = AES_IRREDUCIBLE_POLY) -> Optional[Tuple[List[int], int]]:
+    """
+    (baris A, c) bila sbox = A * x^-1 XOR c untuk polinomial poly, atau None.
+    affine_matrix/affine_vector dari klien hanya dipakai bila lolos verifikasi penuh;
+    bila tidak ada atau tidak cocok, keanggotaan dideteksi langsung dari S-box.
+    """
+    if affine_matrix is not None:
+        rows = pack_matrix(affine_matrix)
+        constant = vector_to_constant(affine_vector) if affine_vector is not None else sbox[0]
+        if verify_affine_form(sbox, rows, constant, poly):
+            return rows, constant
+    return detect_affine_form(sbox, poly)
+
+
+def analyze_sbox(sbox: List[int], affine_matrix: Optional[List[List[int]]] = None,
+                 affine_vector: Optional[List[int]] = None,
+                 poly: int = AES_IRREDUCIBLE_POLY) -> Dict:
+    """
+    Analisis lengkap S-box dengan jalur cepat untuk keluarga affine A * x^-1 XOR c.
+    S-box di luar keluarga dianalisis penuh lewat SBoxProfile.
+    Metrik hanya bergantung pada S-box; affine_family bergantung juga pada poly.
+    """
+    form = find_affine_form(sbox, affine_matrix, affine_vector, poly)
+    if form is None:
+        result = SBoxProfile(sbox).analysis()
+        result["affine_family"] = False
+        return result
+    result = analyze_affine_sbox(sbox, form[0], poly)
+    result["affine_family"] = True
+    return result
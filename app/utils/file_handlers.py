@@ -4,7 +4,7 @@ import io
 import re
 from typing import List, Optional, TypedDict
 from fastapi import UploadFile, HTTPException
-from openpyxl import load_workbook
+import numpy as np
 
 def _parse_sbox_token(token) -> int:
     if isinstance(token, int):
@@ -58,8 +58,11 @@ async def parse_uploaded_sbox(file: UploadFile) -> ParsedSBox:
     Membaca file upload (JSON/CSV/TXT/XLSX) dan mengonversinya menjadi List[int].
     Mendukung format Desimal dan Hex (mis. "5B" atau "0x5B").
     """
-    filename = file.filename.lower()
-    content = await file.read()
+    return parse_sbox_file(file.filename, await file.read())
+
+def parse_sbox_file(filename: str, content: bytes) -> ParsedSBox:
+    """Versi sinkron parse_uploaded_sbox (bisa dijalankan di thread executor)."""
+    filename = filename.lower()
 
     sbox_data = []
     affine_matrix = None
@@ -68,6 +71,9 @@ async def parse_uploaded_sbox(file: UploadFile) -> ParsedSBox:
     try:
         # --- KASUS 1: File Excel (.xlsx) ---
         if filename.endswith(".xlsx"):
+            # Import lokal: openpyxl berat dan hanya dibutuhkan untuk file Excel
+            from openpyxl import load_workbook
+
             wb = load_workbook(filename=io.BytesIO(content), data_only=True)
             ws = wb.active
             for row in ws.iter_rows(values_only=True):
@@ -154,6 +160,116 @@ async def parse_uploaded_sbox(file: UploadFile) -> ParsedSBox:
         "affine_vector": affine_vector
     }
 
+def _parse_sbox_text(text: str) -> List[int]:
+    """512 digit hex tanpa pemisah, atau token dipisah koma/spasi (desimal/hex). ValueError bila gagal."""
+    text = (text or "").strip()
+    try:
+        if re.fullmatch(r"[0-9a-fA-F]{512}", text):
+            return list(bytes.fromhex(text))
+        return [_parse_sbox_token(t) for t in re.split(r"[\s,;]+", text) if t]
+    except ValueError:
+        raise ValueError("Format S-box tidak valid.")
+
+def _check_sbox_values(sbox_data: List[int]) -> List[int]:
+    if len(sbox_data) != 256:
+        raise ValueError(f"Jumlah data tidak valid. Ditemukan {len(sbox_data)} angka, seharusnya tepat 256.")
+    if any(x < 0 or x > 255 for x in sbox_data):
+        raise ValueError("Nilai S-box harus berada dalam rentang 0-255.")
+    return sbox_data
+
+def parse_sbox_param(text: str) -> List[int]:
+    """
+    Parsing S-box dari query parameter / header.
+    Format: 512 digit hex tanpa pemisah, atau 256 token dipisah koma/spasi (desimal/hex).
+    """
+    try:
+        return _check_sbox_values(_parse_sbox_text(text))
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+# --- Batch / pack file ---
+# Item batch tidak divalidasi saat file dibaca: item yang rusak dilaporkan per item
+# oleh pemanggil (parse_batch_item) tanpa menggagalkan seluruh batch.
+
+class _InvalidItem:
+    """Penanda item pack yang sudah gagal dibaca (mis. baris NDJSON rusak)."""
+    def __init__(self, message: str):
+        self.message = message
+
+def parse_batch_item(raw) -> ParsedSBox:
+    """
+    Satu item batch: list 256 token, string (hex 512 digit / token), bytes 256,
+    atau object {"sbox": ..., "affine_matrix": ..., "affine_vector": ...}.
+    Melempar ValueError dengan pesan yang bisa ditampilkan per item.
+    """
+    affine_matrix = None
+    affine_vector = None
+    if isinstance(raw, dict):
+        if "sbox" not in raw:
+            raise ValueError("Object item harus punya key 'sbox'.")
+        affine_matrix = _parse_affine_matrix(raw.get("affine_matrix", raw.get("matrix")))
+        affine_vector = _parse_affine_vector(raw.get("affine_vector", raw.get("vector")))
+        raw = raw["sbox"]
+    if isinstance(raw, (bytes, bytearray)):
+        sbox_data = list(raw)
+    elif isinstance(raw, str):
+        sbox_data = _parse_sbox_text(raw)
+    elif isinstance(raw, list):
+        sbox_data = [_parse_sbox_token(item) for item in raw]
+    elif isinstance(raw, _InvalidItem):
+        raise ValueError(raw.message)
+    else:
+        raise ValueError("Item harus berupa array, string, atau object dengan key 'sbox'.")
+    return {
+        "sbox": _check_sbox_values(sbox_data),
+        "affine_matrix": affine_matrix,
+        "affine_vector": affine_vector,
+    }
+
+def parse_sbox_pack(filename: str, content: bytes) -> list:
+    """
+    Membaca pack file berisi banyak S-box, mengembalikan list item mentah:
+    .bin   : S-box 256 byte berurutan
+    .json  : array item, atau object {"sboxes": [...]}
+    .ndjson/.jsonl : satu item JSON per baris
+    .txt   : satu S-box per baris (hex 512 digit atau token dipisah koma/spasi)
+    """
+    filename = (filename or "").lower()
+    if filename.endswith(".bin"):
+        if len(content) % 256 != 0:
+            raise HTTPException(400, "Ukuran file .bin harus kelipatan 256 byte.")
+        return [content[i:i + 256] for i in range(0, len(content), 256)]
+
+    try:
+        text_content = content.decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(400, "File harus berupa text (UTF-8) atau .bin.")
+
+    if filename.endswith(".json"):
+        try:
+            data = json.loads(text_content)
+        except json.JSONDecodeError:
+            raise HTTPException(400, "File JSON rusak/tidak valid.")
+        if isinstance(data, dict) and isinstance(data.get("sboxes"), list):
+            return data["sboxes"]
+        if isinstance(data, list):
+            return data
+        raise HTTPException(400, "JSON harus berisi array atau object dengan key 'sboxes'.")
+
+    lines = [line.strip() for line in text_content.splitlines() if line.strip()]
+    if filename.endswith((".ndjson", ".jsonl")):
+        items = []
+        for line in lines:
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Baris rusak tetap jadi item agar error-nya dilaporkan di posisinya
+                items.append(_InvalidItem("Baris JSON tidak valid."))
+        return items
+    if filename.endswith(".txt"):
+        return lines
+    raise HTTPException(400, "Format pack tidak didukung. Gunakan .bin, .json, .ndjson/.jsonl, atau .txt")
+
 def format_sbox_as_csv(sbox: List[int]) -> io.StringIO:
     """
     Mengubah S-box menjadi format CSV Grid 16x16 dalam bentuk HEX (2 digit).
@@ -203,3 +319,21 @@ def format_sbox_as_xlsx(sbox: List[int]) -> io.BytesIO:
     wb.save(output)
     output.seek(0)
     return output
+
+def table_as_int16(table: np.ndarray) -> np.ndarray:
+    """
+    Tabel integer ke int16 little-endian. Semua tabel 256x256 butuh int16: entri trivial
+    (DDT/BCT/ACT baris 0 = 256, LAT[0][0] = 128) tidak muat di int8.
+    """
+    return table.astype("<i2")
+
+def format_table_as_raw(table: np.ndarray) -> bytes:
+    """Isi tabel row-major little-endian tanpa header (shape/dtype dikirim lewat header HTTP)."""
+    return np.ascontiguousarray(table).tobytes()
+
+def format_table_as_npy(table: np.ndarray) -> io.BytesIO:
+    """Tabel dalam format .npy (bisa langsung dibaca np.load)."""
+    output = io.BytesIO()
+    np.save(output, table, allow_pickle=False)
+    output.seek(0)
+    return output
@@ -0,0 +1,97 @@
+# app/utils/gf256.py
+from functools import lru_cache
+from typing import Dict, List
+from app.core.constants import AES_IRREDUCIBLE_POLY
+
+
+def _slow_mul(a: int, b: int, poly: int) -> int:
+    """Perkalian bit per bit, hanya dipakai saat membangun tabel log/antilog."""
+    p = 0
+    while b:
+        if b & 1: p ^= a
+        a <<= 1
+        if a & 0x100: a ^= poly
+        b >>= 1
+    return p
+
+
+class GF256:
+    """
+    Aritmetika GF(2^8) berbasis tabel untuk polinomial irreducible derajat 8.
+    Tabel log/antilog dibangun sekali dari generator grup multiplikatif;
+    perkalian, invers, dan tabel perkalian-dengan-konstanta dibaca dari tabel.
+    """
+    def __init__(self, poly: int = AES_IRREDUCIBLE_POLY):
+        if poly >> 8 != 1:
+            raise ValueError("Polinomial harus berderajat 8 (0x100 - 0x1FF).")
+        self.poly = poly
+        self.generator = self._find_generator()
+
+        # exp diperpanjang 2x agar exp[log a + log b] tidak perlu modulo 255
+        self.exp = [0] * 510
+        self.log = [0] * 256
+        x = 1
+        for i in range(255):
+            self.exp[i] = x
+            self.log[x] = i
+            x = _slow_mul(x, self.generator, poly)
+        for i in range(255, 510):
+            self.exp[i] = self.exp[i - 255]
+
+        self.inverse = [0] + [self.exp[255 - self.log[x]] for x in range(1, 256)]
+        self._mul_tables: Dict[int, List[int]] = {}
+
+    def _find_generator(self) -> int:
+        # Polinomial reducible tidak punya elemen berorde 255 (bukan field)
+        for g in range(2, 256):
+            x, order = g, 1
+            while x != 1 and order < 255:
+                x = _slow_mul(x, g, self.poly)
+                order += 1
+                if x == 0:
+                    break
+            if x == 1 and order == 255:
+                return g
+        raise ValueError(f"Polinomial 0x{self.poly:X} tidak irreducible.")
+
+    def mul(self, a: int, b: int) -> int:
+        if a == 0 or b == 0:
+            return 0
+        return self.exp[self.log[a] + self.log[b]]
+
+    def inv(self, a: int) -> int:
+        """Invers multiplikatif; invers 0 didefinisikan 0 (seperti AES)."""
+        return self.inverse[a]
+
+    def mul_table(self, c: int) -> List[int]:
+        """Tabel 256 entri x -> x * c (disimpan setelah dibuat)."""
+        table = self._mul_tables.get(c)
+        if table is None:
+            table = [self.mul(x, c) for x in range(256)]
+            self._mul_tables[c] = table
+        return table
+
+
+@lru_cache(maxsize=32)
+def get_field(poly: int = AES_IRREDUCIBLE_POLY) -> GF256:
+    """Instance GF256 per polinomial (di-cache, jadi memilih polinomial lain tetap murah)."""
+    return GF256(poly)
+
+
+def is_irreducible(poly: int) -> bool:
+    try:
+        get_field(poly)
+    except ValueError:
+        return False
+    return True
+
+
+AES_FIELD = get_field(AES_IRREDUCIBLE_POLY)
+
+# Tabel perkalian konstanta MixColumns / InvMixColumns
+MUL2 = AES_FIELD.mul_table(0x02)
+MUL3 = AES_FIELD.mul_table(0x03)
+MUL9 = AES_FIELD.mul_table(0x09)
+MUL11 = AES_FIELD.mul_table(0x0b)
+MUL13 = AES_FIELD.mul_table(0x0d)
+MUL14 = AES_FIELD.mul_table(0x0e)
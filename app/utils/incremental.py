@@ -0,0 +1,155 @@
+# app/utils/incremental.py
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.sbox_profile import PARITY, fwht_rows, _nl_from_rows, _X, _UNIT
+
+# Komponen yang spektrum Walsh-nya dijaga: 8 fungsi output (NL) + 28 pasangan f_j XOR f_k (BIC-NL)
+_PAIR_BITS = [(j, k) for j in range(8) for k in range(j + 1, 8)]
+_MASKS = np.concatenate([_UNIT, [(1 << j) | (1 << k) for j, k in _PAIR_BITS]])
+_PAIR_J = np.array([j for j, _ in _PAIR_BITS])
+_PAIR_K = np.array([k for _, k in _PAIR_BITS])
+
+# Sign (-1)^(u.x) untuk semua u dan x
+_CHARACTER = 1 - 2 * PARITY[_X[:, None] & _X[None, :]].astype(np.int64)
+
+# Jumlah swap terakhir yang bisa di-undo (riwayat lebih lama dibuang)
+DEFAULT_MAX_HISTORY = 1024
+
+
+def _affected(x1: int, x2: int, shifts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Untuk setiap shift d: posisi x yang pasangan (x, x XOR d)-nya berubah saat S(x1) dan
+    S(x2) ditukar, yaitu {x1, x1^d, x2, x2^d} tanpa duplikat (duplikat saat d = 0 atau
+    d = x1^x2). Mengembalikan (index baris, x, bobot 0/1) berbentuk (len(shifts), 4).
+    """
+    d = shifts[:, None]
+    xs = np.concatenate([np.full_like(d, x1), d ^ x1, np.full_like(d, x2), d ^ x2], axis=1)
+    weight = np.ones_like(xs)
+    weight[:, 1] = shifts != 0
+    weight[:, 2] = shifts != (x1 ^ x2)
+    weight[:, 3] = (shifts != 0) & (shifts != (x1 ^ x2))
+    rows = np.broadcast_to(np.arange(len(shifts))[:, None], xs.shape)
+    return rows, xs, weight
+
+
+class IncrementalSBoxEvaluator:
+    """
+    Evaluator metrik untuk local search berbasis penukaran dua entri S-box.
+    Menyimpan DDT (plus histogram nilainya untuk DU), spektrum Walsh 8 fungsi output
+    dan 28 pasangannya (NL, BIC-NL), serta counter SAC/BIC-SAC. Setiap swap hanya
+    memperbarui entri yang bergantung pada S(x1)/S(x2): O(2^n) per tabel, bukan O(2^2n).
+    undo() membatalkan swap terakhir (swap adalah involusi); hanya max_history swap
+    terakhir yang disimpan (None = tanpa batas).
+    """
+    def __init__(self, sbox: List[int], max_history: Optional[int] = DEFAULT_MAX_HISTORY):
+        if len(sbox) != 256:
+            raise ValueError("S-box harus 256 elemen.")
+        s = np.asarray(sbox, dtype=np.int64) & 0xFF
+        self.s = s
+        self.history: Deque[Tuple[int, int]] = deque(maxlen=max_history)
+
+        # DDT penuh dan histogram nilai untuk baris dx != 0 (DU = nilai terbesar yang terisi)
+        dy = s[None, :] ^ s[_X[:, None] ^ _X[None, :]]
+        self.ddt = np.bincount(((_X[:, None] << 8) | dy).ravel(), minlength=256 * 256).reshape(256, 256)
+        self.ddt_hist = np.bincount(self.ddt[1:].ravel(), minlength=257)
+
+        # Spektrum Walsh komponen _MASKS
+        signs = 1 - 2 * PARITY[_MASKS[:, None] & s[None, :]].astype(np.int32)
+        self.walsh = fwht_rows(signs).astype(np.int64)
+
+        # Counter avalanche: per bit output (SAC) dan per pasangan bit output (BIC-SAC)
+        diffs = s[None, :] ^ s[_X[None, :] ^ _UNIT[:, None]]
+        bits = (diffs[..., None] >> np.arange(8)) & 1
+        self.sac_bits = bits.sum(axis=(0, 1))
+        self.bic_pairs = (bits[..., _PAIR_J] ^ bits[..., _PAIR_K]).sum(axis=(0, 1))
+
+    @property
+    def sbox(self) -> List[int]:
+        return [int(v) for v in self.s]
+
+    def swap(self, x1: int, x2: int) -> Dict:
+        """Tukar S(x1) dan S(x2), perbarui semua tabel, kembalikan metrik terbaru."""
+        self._swap(x1, x2)
+        self.history.append((x1, x2))
+        return self.metrics()
+
+    def undo(self) -> Dict:
+        """Batalkan swap terakhir (IndexError bila tidak ada)."""
+        x1, x2 = self.history.pop()
+        self._swap(x1, x2)
+        return self.metrics()
+
+    def _swap(self, x1: int, x2: int) -> None:
+        if not (0 <= x1 < 256 and 0 <= x2 < 256):
+            raise ValueError("Posisi swap harus 0-255.")
+        if x1 == x2:
+            return
+        old = self.s
+        y1, y2 = int(old[x1]), int(old[x2])
+        new = old.copy()
+        new[x1], new[x2] = y2, y1
+
+        # DDT: kontribusi lama pasangan yang terdampak dikurangi, kontribusi baru ditambah
+        rows, xs, weight = _affected(x1, x2, _X[1:])
+        dx = rows + 1
+        old_cells = ((dx << 8) | (old[xs] ^ old[xs ^ dx])).ravel()
+        new_cells = ((dx << 8) | (new[xs] ^ new[xs ^ dx])).ravel()
+        weight = weight.ravel()
+        flat = self.ddt.reshape(-1)
+        cells = np.unique(np.concatenate([old_cells, new_cells]))
+        before = flat[cells].copy()
+        np.subtract.at(flat, old_cells, weight)
+        np.add.at(flat, new_cells, weight)
+        self.ddt_hist -= np.bincount(before, minlength=257)
+        self.ddt_hist += np.bincount(flat[cells], minlength=257)
+
+        # SAC / BIC-SAC: hanya D[i][x] untuk x di sekitar x1 dan x2
+        _, xs, weight = _affected(x1, x2, _UNIT)
+        for table, sign in ((old, -1), (new, 1)):
+            diffs = (table[xs] ^ table[xs ^ _UNIT[:, None]])[..., None]
+            w = sign * weight[..., None]
+            self.sac_bits += (((diffs >> np.arange(8)) & 1) * w).sum(axis=(0, 1))
+            self.bic_pairs += ((((diffs >> _PAIR_J) ^ (diffs >> _PAIR_K)) & 1) * w).sum(axis=(0, 1))
+
+        # Walsh: v.S(x) berubah di x1 dan x2 hanya untuk komponen dengan v.(y1 XOR y2) = 1
+        flip = PARITY[_MASKS & (y1 ^ y2)].astype(bool)
+        if flip.any():
+            sign1 = 1 - 2 * PARITY[_MASKS[flip] & y1].astype(np.int64)
+            sign2 = 1 - 2 * PARITY[_MASKS[flip] & y2].astype(np.int64)
+            self.walsh[flip] -= 2 * (sign1[:, None] * _CHARACTER[x1] + sign2[:, None] * _CHARACTER[x2])
+
+        self.s = new
+
+    # --- Metrik (dibaca dari state) ---
+    def du(self) -> int:
+        return int(np.nonzero(self.ddt_hist)[0].max())
+
+    def dap(self) -> float:
+        return self.du() / 256.0
+
+    def nl(self) -> int:
+        return _nl_from_rows(self.walsh[:8])
+
+    def bic_nl(self) -> int:
+        return _nl_from_rows(self.walsh[8:])
+
+    def sac(self) -> float:
+        return int(self.sac_bits.sum()) / (8 * 256 * 8)
+
+    def bic_sac(self) -> float:
+        # Urutan penjumlahan sama dengan SBoxProfile.bic_sac agar hasil float identik
+        total = 0
+        for count in self.bic_pairs:
+            total += int(count) / (256 * 8)
+        return total / len(_PAIR_BITS)
+
+    def metrics(self) -> Dict:
+        return {
+            "nl": self.nl(),
+            "bic_nl": self.bic_nl(),
+            "du": self.du(),
+            "dap": self.dap(),
+            "sac": self.sac(),
+            "bic_sac": self.bic_sac(),
+        }
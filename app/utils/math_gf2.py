@@ -1,55 +1,184 @@
 # app/utils/math_gf2.py
 import random
-from typing import List
+from typing import List, Optional
 from app.core.constants import AES_IRREDUCIBLE_POLY, AES_CONSTANT
+from app.utils.gf256 import get_field
 
-def gmul_inverse(val: int) -> int:
-    """Menghitung Invers Multiplikatif di GF(2^8)."""
-    if val == 0: return 0
-    for i in range(1, 256):
-        a, b, p = val, i, 0
-        for _ in range(8):
-            if b & 1: p ^= a
-            hi_bit = a & 0x80
-            a <<= 1
-            if hi_bit: a ^= AES_IRREDUCIBLE_POLY
-            b >>= 1
-        if (p % 256) == 1: return i
-    return 0
-
-# Pre-compute tabel invers saat modul di-load
-INVERSE_TABLE = [gmul_inverse(x) for x in range(256)]
-
-def generate_random_affine_matrix() -> List[List[int]]:
-    """Generate matriks 8x8 random (0/1)."""
-    return [[random.randint(0, 1) for _ in range(8)] for _ in range(8)]
+def gmul_inverse(val: int, poly: int = AES_IRREDUCIBLE_POLY) -> int:
+    """Menghitung Invers Multiplikatif di GF(2^8) (lookup tabel log/antilog)."""
+    return get_field(poly).inv(val)
 
-def is_invertible_gf2(matrix: List[List[int]]) -> bool:
-    """Cek apakah matriks invertible (Determinan != 0) di GF(2)."""
-    n = 8
-    m = [row[:] for row in matrix] # Copy matrix
+def inverse_table(poly: int = AES_IRREDUCIBLE_POLY) -> List[int]:
+    """Tabel invers 256 entri untuk polinomial irreducible tertentu."""
+    return get_field(poly).inverse
+
+# Tabel invers untuk polinomial AES
+INVERSE_TABLE = inverse_table(AES_IRREDUCIBLE_POLY)
+
+def _seeded_rng(seed: Optional[int], stream: int, rng):
+    # numpy diimpor saat dipakai saja agar import math_gf2 tetap ringan
+    if rng is None and seed is not None:
+        from app.utils.rng import make_rng
+        rng = make_rng(seed, stream)
+    return rng
+
+def generate_random_affine_matrix(seed: Optional[int] = None, stream: int = 0, rng=None) -> List[List[int]]:
+    """Generate matriks 8x8 random (0/1); (seed, stream) membuat hasil bisa direproduksi."""
+    rng = _seeded_rng(seed, stream, rng)
+    if rng is None:
+        return [[random.randint(0, 1) for _ in range(8)] for _ in range(8)]
+    if hasattr(rng, "integers"):
+        return rng.integers(0, 2, size=(8, 8)).tolist()
+    return [[rng.randint(0, 1) for _ in range(8)] for _ in range(8)]
+
+# --- Representasi bit-packed ---
+# Baris matriks disimpan sebagai integer 8-bit: bit ke-col = matrix[row][col].
+
+def pack_matrix(matrix: List[List[int]]) -> List[int]:
+    """Matriks 8x8 list-of-lists -> 8 integer baris."""
+    return [sum((bit & 1) << col for col, bit in enumerate(row)) for row in matrix]
+
+def unpack_matrix(rows: List[int]) -> List[List[int]]:
+    """8 integer baris -> matriks 8x8 list-of-lists."""
+    return [[(row >> col) & 1 for col in range(8)] for row in rows]
+
+def is_invertible_packed(rows: List[int]) -> bool:
+    """Eliminasi Gauss di GF(2) dengan XOR satu baris penuh sekaligus."""
+    rows = list(rows)
+    n = len(rows)
     for col in range(n):
+        bit = 1 << col
         pivot = -1
-        for row in range(col, n):
-            if m[row][col] == 1:
-                pivot = row
+        for r in range(col, n):
+            if rows[r] & bit:
+                pivot = r
                 break
         if pivot == -1: return False
-        m[col], m[pivot] = m[pivot], m[col]
-        for row in range(n):
-            if row != col and m[row][col] == 1:
-                for k in range(n):
-                    m[row][k] ^= m[col][k]
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        pivot_row = rows[col]
+        for r in range(col + 1, n):
+            if rows[r] & bit:
+                rows[r] ^= pivot_row
     return True
 
+def invert_packed(rows: List[int]) -> Optional[List[int]]:
+    """Invers matriks bit-packed (Gauss-Jordan dengan matriks identitas); None bila singular."""
+    n = len(rows)
+    rows = list(rows)
+    inverse = [1 << r for r in range(n)]
+    for col in range(n):
+        bit = 1 << col
+        pivot = next((r for r in range(col, n) if rows[r] & bit), -1)
+        if pivot == -1: return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        inverse[col], inverse[pivot] = inverse[pivot], inverse[col]
+        for r in range(n):
+            if r != col and rows[r] & bit:
+                rows[r] ^= rows[col]
+                inverse[r] ^= inverse[col]
+    return inverse
+
+def is_invertible_gf2(matrix: List[List[int]]) -> bool:
+    """Cek apakah matriks invertible (Determinan != 0) di GF(2)."""
+    return is_invertible_packed(pack_matrix(matrix))
+
+def packed_column_masks(rows: List[int]) -> List[int]:
+    """
+    Mask per kolom: bit ke-row = matrix[row][col] (kontribusi bit input col ke output).
+    Transpose matriks bit 8x8 dalam satu integer 64-bit (delta swap, Hacker's Delight 7-3).
+    """
+    x = int.from_bytes(bytes(rows), "little")
+    t = (x ^ (x >> 7)) & 0x00AA00AA00AA00AA
+    x = x ^ t ^ (t << 7)
+    t = (x ^ (x >> 14)) & 0x0000CCCC0000CCCC
+    x = x ^ t ^ (t << 14)
+    t = (x ^ (x >> 28)) & 0x00000000F0F0F0F0
+    x = x ^ t ^ (t << 28)
+    return list(x.to_bytes(8, "little"))
+
+# Banyak kemungkinan kolom ke-k (k = 0..7) pada sampling matriks invertible
+_DRAW_RANGES = [256 - (1 << k) for k in range(8)]
+
+def generate_invertible_packed(rng=None) -> List[int]:
+    """
+    Sampling seragam matriks invertible 8x8 di GF(2) tanpa rejection (bit-packed baris).
+    Kolom dibangun satu per satu di luar span kolom sebelumnya. Setiap vektor di luar
+    span V (dimensi k) punya representasi unik s XOR c dengan s di V dan c kombinasi
+    tak-nol dari vektor satuan posisi "bebas" (komplemen V), sehingga satu randrange
+    atas 2^k * (2^(8-k) - 1) = 256 - 2^k kemungkinan langsung memberi kolom yang seragam.
+    rng: numpy.random.Generator (8 angka diambil sekaligus), objek dengan randrange
+    (random.Random), atau None untuk modul random global.
+    """
+    if rng is None:
+        rng = random
+    if hasattr(rng, "integers"):
+        draws = rng.integers(0, _DRAW_RANGES).tolist()
+    else:
+        draws = [rng.randrange(n) for n in _DRAW_RANGES]
+    span = [0]
+    free = list(range(8))
+    columns = []
+    for k in range(8):
+        size = len(span)
+        r = draws[k]
+        s = span[r % size]
+        c_bits = r // size + 1
+        c = 0
+        for i, pos in enumerate(free):
+            if (c_bits >> i) & 1:
+                c |= 1 << pos
+        v = s ^ c
+        # Posisi bebas dari bit tertinggi c menjadi pivot; sisanya tetap komplemen span baru
+        del free[c_bits.bit_length() - 1]
+        span += [x ^ v for x in span]
+        columns.append(v)
+    # columns[col] bit row = matrix[row][col]; transpose memberi baris bit-packed
+    return packed_column_masks(columns)
+
+def generate_invertible_matrix(seed: Optional[int] = None, stream: int = 0, rng=None) -> List[List[int]]:
+    """
+    Matriks affine invertible acak (seragam); (seed, stream) membuat hasil bisa direproduksi
+    (PCG64 per stream, lihat app.utils.rng.make_rng).
+    """
+    return unpack_matrix(generate_invertible_packed(_seeded_rng(seed, stream, rng)))
+
+def _affine_table_from_masks(masks: List[int], constant: int) -> List[int]:
+    """
+    Tabel 256 entri x -> K * x + C dari mask kolom.
+    Memakai linearitas: entri dengan bit col menyala = entri tanpa bit itu XOR mask[col],
+    jadi tabel bisa digandakan 8 kali tanpa loop per bit.
+    """
+    table = [constant]
+    for mask in masks:
+        table += [v ^ mask for v in table]
+    return table
+
+def affine_lookup_table(matrix: List[List[int]], constant: int = AES_CONSTANT) -> List[int]:
+    """Tabel 256 entri x -> K * x + C, dibangun sekali per matriks."""
+    return _affine_table_from_masks(packed_column_masks(pack_matrix(matrix)), constant)
+
+def affine_lookup_table_packed(rows: List[int], constant: int = AES_CONSTANT) -> List[int]:
+    """Versi affine_lookup_table untuk matriks bit-packed."""
+    return _affine_table_from_masks(packed_column_masks(rows), constant)
+
+def build_affine_sbox_packed(rows: List[int], inv_table: List[int] = None,
+                             constant: int = AES_CONSTANT) -> List[int]:
+    """S-box S(x) = K * x^-1 + C lewat satu tabel lookup per matriks (bit-packed)."""
+    table = affine_lookup_table_packed(rows, constant)
+    inv_table = INVERSE_TABLE if inv_table is None else inv_table
+    return [table[inv] for inv in inv_table]
+
+def build_affine_sbox(matrix: List[List[int]], inv_table: List[int] = None,
+                      constant: int = AES_CONSTANT) -> List[int]:
+    """S-box S(x) = K * x^-1 + C lewat satu tabel lookup per matriks."""
+    return build_affine_sbox_packed(pack_matrix(matrix), inv_table, constant)
+
 def apply_affine_transform(byte_val: int, matrix: List[List[int]]) -> int:
     """Rumus: B(x) = (K * X^-1 + C) mod 2"""
-    result = 0
-    bits = [(byte_val >> i) & 1 for i in range(8)]
-    for row in range(8):
-        val = 0
-        for col in range(8):
-            val ^= matrix[row][col] & bits[col]
-        val ^= (AES_CONSTANT >> row) & 1
-        if val: result |= (1 << row)
-    return result
\ No newline at end of file
+    masks = packed_column_masks(pack_matrix(matrix))
+    result = AES_CONSTANT
+    while byte_val:
+        low = byte_val & -byte_val
+        result ^= masks[low.bit_length() - 1]
+        byte_val ^= low
+    return result
@@ -0,0 +1,24 @@
+# app/utils/rng.py
+from typing import Optional
+import numpy as np
+
+# Seed baru dibatasi 53 bit agar tetap eksak sebagai number JSON di JavaScript (Number.MAX_SAFE_INTEGER)
+SEED_BITS = 53
+
+
+def resolve_seed(seed: Optional[int] = None) -> int:
+    """Seed yang dipakai: seed dari user, atau entropy baru dari OS (dikembalikan agar bisa direproduksi)."""
+    if seed is None:
+        return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> np.uint64(64 - SEED_BITS))
+    if seed < 0:
+        raise ValueError("seed harus bilangan bulat non-negatif.")
+    return seed
+
+
+def make_rng(seed: Optional[int], *stream: int) -> np.random.Generator:
+    """
+    Generator PCG64 baru untuk stream (seed, *stream). Sama dengan anak ke-i dari
+    SeedSequence(seed).spawn(): stream berbeda independen secara statistik, jadi
+    worker/proses bisa generate paralel tanpa koordinasi dan tanpa berbagi state.
+    """
+    return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=stream)))
@@ -0,0 +1,85 @@
+# app/utils/sbox_batch.py
+from typing import List
+import numpy as np
+from app.core.constants import AES_CONSTANT
+from app.utils.math_gf2 import _DRAW_RANGES
+
+# Panjang bit 0..255 (int.bit_length versi tabel)
+_BIT_LENGTH = np.array([x.bit_length() for x in range(256)], dtype=np.intp)
+
+
+def invertible_mask(rows: np.ndarray) -> np.ndarray:
+    """
+    Cek invertibilitas banyak matriks sekaligus: rows (M, 8) uint8 bit-packed
+    (bit ke-col = matrix[row][col]). Eliminasi Gauss di GF(2) per kolom, semua
+    matriks diproses paralel; mengembalikan mask bool (M,).
+    """
+    rows = np.array(rows, dtype=np.uint8)
+    index = np.arange(len(rows))
+    ok = np.ones(len(rows), dtype=bool)
+    for col in range(8):
+        bit = np.uint8(1 << col)
+        has_bit = (rows[:, col:] & bit) != 0
+        ok &= has_bit.any(axis=1)
+        # Tukar baris pivot ke posisi col (matriks tanpa pivot sudah ditandai singular)
+        pivot = col + has_bit.argmax(axis=1)
+        pivot_row = rows[index, pivot]
+        rows[index, pivot] = rows[:, col]
+        rows[:, col] = pivot_row
+        below = (rows[:, col + 1:] & bit) != 0
+        rows[:, col + 1:] ^= np.where(below, pivot_row[:, None], np.uint8(0))
+    return ok
+
+
+def invertible_from_draws(draws: np.ndarray) -> np.ndarray:
+    """
+    Versi batch generate_invertible_packed: draws (M, 8) dengan draws[:, k] < 256 - 2^k
+    -> (M, 8) uint8 baris bit-packed. Baris draws yang sama memberi matriks yang sama
+    dengan versi skalar. Span kolom sebelumnya tidak disimpan; s = XOR kolom ke-i
+    untuk bit i dari r mod 2^k (urutan span skalar), posisi bebas disimpan per matriks.
+    """
+    draws = np.asarray(draws, dtype=np.int64)
+    m = len(draws)
+    columns = np.zeros((m, 8), dtype=np.uint8)
+    free = np.tile(np.arange(8, dtype=np.uint8), (m, 1))
+    for k in range(8):
+        low, c_bits = draws[:, k] % (1 << k), draws[:, k] // (1 << k) + 1
+        v = np.zeros(m, dtype=np.uint8)
+        for i in range(k):
+            v ^= np.where(((low >> i) & 1) != 0, columns[:, i], np.uint8(0))
+        for i in range(8 - k):
+            v ^= (((c_bits >> i) & 1) << free[:, i]).astype(np.uint8)
+        columns[:, k] = v
+        # Hapus posisi bebas pivot (bit tertinggi c_bits) dari tiap matriks
+        keep = np.arange(8 - k) != (_BIT_LENGTH[c_bits] - 1)[:, None]
+        free = free[keep].reshape(m, 7 - k)
+    return column_masks_batch(columns)
+
+
+def generate_invertible_batch(count: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    count matriks invertible acak (seragam) sebagai array (count, 8) uint8 bit-packed,
+    tanpa rejection: tepat 8 angka per matriks, sama dengan count panggilan
+    generate_invertible_packed(rng) berturut-turut.
+    """
+    return invertible_from_draws(rng.integers(0, _DRAW_RANGES, size=(count, 8)))
+
+
+def column_masks_batch(rows: np.ndarray) -> np.ndarray:
+    """Transpose bit banyak matriks: (M, 8) baris bit-packed -> (M, 8) mask kolom."""
+    bits = np.unpackbits(rows[:, :, None], axis=2, bitorder="little")
+    return np.packbits(bits.transpose(0, 2, 1), axis=2, bitorder="little")[:, :, 0]
+
+
+def affine_sboxes_batch(rows: np.ndarray, inv_table: List[int],
+                        constant: int = AES_CONSTANT) -> np.ndarray:
+    """
+    S-box S(x) = A * x^-1 XOR c untuk M matriks sekaligus, hasil (M, 256) uint8.
+    Versi batch dari _affine_table_from_masks: tabel x -> A * x XOR c digandakan
+    8 kali dengan XOR mask kolom (semua matriks paralel), lalu diindeks dengan x^-1.
+    """
+    masks = column_masks_batch(np.asarray(rows, dtype=np.uint8))
+    table = np.full((len(masks), 1), constant, dtype=np.uint8)
+    for col in range(8):
+        table = np.concatenate([table, table ^ masks[:, col:col + 1]], axis=1)
+    return table[:, np.asarray(inv_table, dtype=np.intp)]
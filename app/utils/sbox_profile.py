@@ -0,0 +1,214 @@
+# app/utils/sbox_profile.py
+from functools import cached_property
+from typing import Dict, List
+import numpy as np
+
+# Tabel bantu 8-bit: paritas dan Hamming weight
+PARITY = np.array([bin(i).count('1') & 1 for i in range(256)], dtype=np.uint8)
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int32)
+_X = np.arange(256)
+_UNIT = 1 << np.arange(8)
+
+
+def fwht_rows(a: np.ndarray) -> np.ndarray:
+    """
+    FWHT tervektorisasi: butterfly diterapkan sepanjang axis terakhir untuk
+    semua baris sekaligus (array 2D: satu fungsi boolean per baris).
+    """
+    a = np.array(a, dtype=np.int32)
+    rows, n = a.shape
+    h = 1
+    while h < n:
+        view = a.reshape(rows, n // (2 * h), 2, h)
+        x = view[:, :, 0, :].copy()
+        y = view[:, :, 1, :]
+        view[:, :, 0, :] += y
+        view[:, :, 1, :] = x - y
+        h *= 2
+    return a
+
+
+def anf_coefficients(truth_tables: np.ndarray) -> np.ndarray:
+    """Transformasi Mobius (ANF) untuk setiap baris tabel kebenaran 0/1."""
+    coeffs = np.array(truth_tables, dtype=np.uint8)
+    rows, n = coeffs.shape
+    h = 1
+    while h < n:
+        view = coeffs.reshape(rows, n // (2 * h), 2, h)
+        view[:, :, 1, :] ^= view[:, :, 0, :]
+        h *= 2
+    return coeffs
+
+
+def _nl_from_rows(spectra: np.ndarray) -> int:
+    # Rumus NL: 2^(n-1) - max_spectrum/2, diambil minimum dari semua baris
+    max_abs = np.abs(spectra).max(axis=1)
+    return int((128 - max_abs // 2).min())
+
+
+def _ci_order(spectrum: np.ndarray) -> int:
+    # Orde CI = (bobot minimum mask u != 0 dengan spektrum tak-nol) - 1, maksimum 8
+    nonzero = np.nonzero(spectrum[1:])[0] + 1
+    if len(nonzero) == 0:
+        return 8
+    return min(int(POPCOUNT[nonzero].min()) - 1, 8)
+
+
+class SBoxProfile:
+    """
+    Profil kriptografi satu S-box 8-bit.
+    Tabel-tabel dasar (truth table komponen, ANF, DDT, Walsh/LAT, BCT, autokorelasi,
+    selisih flip bit) dihitung lazy sekali lalu di-memo, sehingga semua metrik
+    (NL, SAC, BIC, LAP, DU/DAP, AD, TO, CI) hanya membaca dari tabel yang sama.
+    """
+    def __init__(self, sbox: List[int]):
+        self.sbox = list(sbox)
+        self.array = np.asarray(self.sbox, dtype=np.int64) & 0xFF
+
+    # --- Tabel dasar ---
+    @cached_property
+    def component_truth_tables(self) -> np.ndarray:
+        """(8, 256) uint8: baris bit = fungsi output boolean f_bit(x)."""
+        return ((self.array[None, :] >> np.arange(8)[:, None]) & 1).astype(np.uint8)
+
+    @cached_property
+    def anf(self) -> np.ndarray:
+        """(8, 256) koefisien ANF fungsi-fungsi output."""
+        return anf_coefficients(self.component_truth_tables)
+
+    @cached_property
+    def ddt(self) -> np.ndarray:
+        """DDT 256x256: ddt[dx][dy] = #{x : S(x) XOR S(x XOR dx) = dy}."""
+        s = self.array
+        dy = s[None, :] ^ s[_X[:, None] ^ _X[None, :]]
+        index = (_X[:, None] << 8) | dy
+        return np.bincount(index.ravel(), minlength=256 * 256).reshape(256, 256)
+
+    @cached_property
+    def walsh(self) -> np.ndarray:
+        """
+        Spektrum Walsh semua komponen: W[v][u] = sum_x (-1)^(v.S(x) XOR u.x).
+        Baris v = 1 << bit adalah spektrum fungsi output ke-bit.
+        """
+        signs = 1 - 2 * PARITY[_X[:, None] & self.array[None, :]].astype(np.int32)
+        return fwht_rows(signs)
+
+    @cached_property
+    def lat(self) -> np.ndarray:
+        """LAT 256x256: lat[v][u] = #{x : u.x = v.S(x)} - 128 = W[v][u] / 2."""
+        return self.walsh // 2
+
+    @cached_property
+    def autocorrelation(self) -> np.ndarray:
+        """
+        Tabel autokorelasi: act[a][v] = sum_x (-1)^(v.(S(x) XOR S(x XOR a))).
+        Dihitung dari Walsh (Wiener-Khinchin): act[a][v] = sum_u W[v][u]^2 (-1)^(u.a) / 256.
+        """
+        return (fwht_rows(self.walsh.astype(np.int64) ** 2) // 256).T
+
+    @cached_property
+    def inverse_array(self) -> np.ndarray:
+        """S^-1 sebagai array; hanya untuk S-box bijektif (ValueError bila bukan)."""
+        if len(np.unique(self.array)) != 256:
+            raise ValueError("S-box tidak bijektif, invers (dan BCT) tidak terdefinisi.")
+        inverse = np.empty(256, dtype=np.int64)
+        inverse[self.array] = _X
+        return inverse
+
+    @cached_property
+    def bct(self) -> np.ndarray:
+        """
+        Boomerang Connectivity Table 256x256:
+        bct[a][b] = #{x : S^-1(S(x) XOR b) XOR S^-1(S(x XOR a) XOR b) = a}.
+        Dihitung per 16 baris a sekaligus (array sementara 16x256x256).
+        """
+        s = self.array
+        inverse = self.inverse_array
+        # upper[b][x] = S^-1(S(x) XOR b), sama untuk semua a
+        upper = inverse[s[None, :] ^ _X[:, None]]
+        table = np.empty((256, 256), dtype=np.int64)
+        for start in range(0, 256, 16):
+            a = _X[start:start + 16]
+            shifted = s[_X[None, :] ^ a[:, None]]
+            lower = inverse[shifted[:, None, :] ^ _X[None, :, None]]
+            table[start:start + 16] = ((upper[None] ^ lower) == a[:, None, None]).sum(axis=2)
+        return table
+
+    @cached_property
+    def flip_differences(self) -> np.ndarray:
+        """D[i][x] = S(x) XOR S(x XOR e_i) untuk 8 posisi bit input i."""
+        s = self.array
+        return s[None, :] ^ s[_X[None, :] ^ _UNIT[:, None]]
+
+    # --- Metrik ---
+    def nl(self) -> int:
+        """Nonlinearity: minimum NL dari 8 fungsi output (baris v = 1 << bit)."""
+        return _nl_from_rows(self.walsh[_UNIT])
+
+    def sac(self) -> float:
+        """Rata-rata probabilitas bit output berubah saat 1 bit input di-flip."""
+        total_sac = int(POPCOUNT[self.flip_differences].sum())
+        return total_sac / (8 * 256 * 8)
+
+    def bic_nl(self) -> int:
+        """BIC-NL: minimum NL dari f_j XOR f_k (komponen v = e_j | e_k), j < k."""
+        pairs = [(1 << j) | (1 << k) for j in range(8) for k in range(j + 1, 8)]
+        return _nl_from_rows(self.walsh[pairs])
+
+    def bic_sac(self) -> float:
+        """BIC-SAC: rata-rata avalanche f_j XOR f_k atas semua pasangan bit output."""
+        diffs = self.flip_differences
+        sum_bic_sac = 0
+        pair_count = 0
+        for j in range(8):
+            for k in range(j + 1, 8):
+                sac_sum_pair = int((((diffs >> j) ^ (diffs >> k)) & 1).sum())
+                sum_bic_sac += sac_sum_pair / (256 * 8)
+                pair_count += 1
+        return sum_bic_sac / pair_count if pair_count > 0 else 0
+
+    def bic(self) -> Dict:
+        """BIC-NL dan BIC-SAC atas semua pasangan bit output (j, k), j < k."""
+        return {"bic_nl": self.bic_nl(), "bic_sac": self.bic_sac()}
+
+    def lap(self) -> float:
+        """Bias Walsh maksimum (v != 0, u != 0) dibagi 256."""
+        return int(np.abs(self.walsh[1:, 1:]).max()) / 256.0
+
+    def du(self) -> int:
+        """Nilai maksimum DDT untuk dx != 0."""
+        return int(self.ddt[1:].max())
+
+    def dap(self) -> float:
+        return self.du() / 256.0
+
+    def ad(self) -> int:
+        """Derajat aljabar maksimum dari semua fungsi output."""
+        masks = np.nonzero(self.anf.any(axis=0))[0]
+        return int(POPCOUNT[masks].max()) if len(masks) else 0
+
+    def to(self) -> float:
+        """max_{a != 0} |act[a][a]| / 2^n (definisi TO yang dipakai di repo ini)."""
+        diag = np.abs(np.diagonal(self.autocorrelation)[1:])
+        return int(diag.max()) / 256.0
+
+    def ci(self) -> int:
+        """Orde correlation immunity minimum dari 8 fungsi output."""
+        return min(_ci_order(spectrum) for spectrum in self.walsh[_UNIT])
+
+    def analysis(self) -> Dict:
+        """Semua metrik dalam format AnalysisResponse."""
+        bic = self.bic()
+        du = self.du()
+        return {
+            "nl": self.nl(),
+            "sac": self.sac(),
+            "bic_nl": bic["bic_nl"],
+            "bic_sac": bic["bic_sac"],
+            "lap": self.lap(),
+            "dap": du / 256.0,
+            "du": du,
+            "ad": self.ad(),
+            "to": self.to(),
+            "ci": self.ci(),
+        }
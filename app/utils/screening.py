@@ -0,0 +1,160 @@
+# app/utils/screening.py
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from app.utils.sbox_profile import (
+    SBoxProfile, PARITY, fwht_rows, _nl_from_rows, _ci_order, _X, _UNIT,
+)
+
+# Batas metrik: nama -> (min, max); None berarti sisi itu tidak dibatasi
+Bounds = Dict[str, Tuple[Optional[float], Optional[float]]]
+
+# Urutan evaluasi: metrik termurah dulu (diukur per S-box penuh, NumPy):
+# sac/ad/nl/ci < 0.1 ms, bic_nl/bic_sac ~0.2 ms, du/dap/to ~0.3 ms, lap ~1.3 ms
+SCREEN_ORDER = ("sac", "ad", "nl", "ci", "bic_nl", "bic_sac", "du", "dap", "to", "lap")
+
+# Jumlah baris tabel (dx / mask a / mask v) yang dihitung per langkah sebelum cek batas
+SCREEN_CHUNK_ROWS = 32
+
+_ROWS = np.arange(1, 256)
+_PAIRS = [(1 << j) | (1 << k) for j in range(8) for k in range(j + 1, 8)]
+
+
+def _chunks() -> Iterator[np.ndarray]:
+    for start in range(0, len(_ROWS), SCREEN_CHUNK_ROWS):
+        yield _ROWS[start:start + SCREEN_CHUNK_ROWS]
+
+
+def _walsh_rows(s: np.ndarray, masks) -> np.ndarray:
+    """Spektrum Walsh hanya untuk mask output v tertentu (tanpa matriks 256x256 penuh)."""
+    masks = np.asarray(masks)
+    signs = 1 - 2 * PARITY[masks[:, None] & s[None, :]].astype(np.int32)
+    return fwht_rows(signs)
+
+
+def _ddt_row_max(s: np.ndarray, dx: np.ndarray) -> int:
+    dy = s[None, :] ^ s[_X[None, :] ^ dx[:, None]]
+    index = (np.arange(len(dx))[:, None] << 8) | dy
+    return int(np.bincount(index.ravel(), minlength=len(dx) * 256).max())
+
+
+def _lap_row_max(s: np.ndarray, v: np.ndarray) -> int:
+    return int(np.abs(_walsh_rows(s, v)[:, 1:]).max())
+
+
+def _to_row_max(s: np.ndarray, a: np.ndarray) -> int:
+    diff = s[None, :] ^ s[_X[None, :] ^ a[:, None]]
+    ones = PARITY[diff & a[:, None]].sum(axis=1, dtype=np.int32)
+    return int(np.abs(256 - 2 * ones).max())
+
+
+# Metrik "maksimum atas baris tabel": fungsi per chunk dan skala ke nilai metrik
+_CHUNKED_MAX = {
+    "du": (_ddt_row_max, 1),
+    "dap": (_ddt_row_max, 256),
+    "lap": (_lap_row_max, 256),
+    "to": (_to_row_max, 256),
+}
+
+
+def _violates(value: float, bound: Tuple[Optional[float], Optional[float]]) -> bool:
+    low, high = bound
+    return (low is not None and value < low) or (high is not None and value > high)
+
+
+class _Screen:
+    """State evaluasi satu S-box: tabel kecil yang dipakai bersama beberapa metrik."""
+    def __init__(self, sbox: List[int]):
+        self.profile = SBoxProfile(sbox)
+        self.s = self.profile.array
+        self._unit_walsh = None
+        self._running_max: Dict[str, int] = {}
+
+    @property
+    def unit_walsh(self) -> np.ndarray:
+        if self._unit_walsh is None:
+            self._unit_walsh = _walsh_rows(self.s, _UNIT)
+        return self._unit_walsh
+
+    def full(self, name: str) -> float:
+        if name == "sac":
+            return self.profile.sac()
+        if name == "bic_sac":
+            return self.profile.bic_sac()
+        if name == "ad":
+            return self.profile.ad()
+        if name == "nl":
+            return _nl_from_rows(self.unit_walsh)
+        if name == "ci":
+            return min(_ci_order(spectrum) for spectrum in self.unit_walsh)
+        if name == "bic_nl":
+            return _nl_from_rows(_walsh_rows(self.s, _PAIRS))
+        raise KeyError(name)
+
+    def chunked_max(self, name: str, high: Optional[float]) -> Tuple[float, bool]:
+        """
+        Maksimum baris demi baris; berhenti begitu nilai sementara melewati batas atas.
+        Mengembalikan (nilai, selesai); bila selesai=False nilai hanya batas bawah maksimum.
+        """
+        row_max, scale = _CHUNKED_MAX[name]
+        # du dan dap berbagi DDT yang sama
+        key = "du" if name in ("du", "dap") else name
+        if key in self._running_max:
+            return _scaled(self._running_max[key], scale), True
+        best = 0
+        for rows in _chunks():
+            best = max(best, row_max(self.s, rows))
+            if high is not None and best / scale > high:
+                return _scaled(best, scale), False
+        self._running_max[key] = best
+        return _scaled(best, scale), True
+
+
+def _scaled(count: int, scale: int) -> float:
+    # DU tetap integer (count), metrik lain berupa probabilitas/bias
+    return count if scale == 1 else count / scale
+
+
+def normalize_bounds(bounds: Bounds) -> Bounds:
+    """Validasi nama metrik dan urutan batas (ValueError bila tidak valid)."""
+    normalized = {}
+    for name, (low, high) in bounds.items():
+        if name not in SCREEN_ORDER:
+            raise ValueError(f"Metrik tidak dikenal: {name}. Pilihan: {', '.join(SCREEN_ORDER)}.")
+        if low is not None and high is not None and low > high:
+            raise ValueError(f"Batas {name}: min lebih besar dari max.")
+        if low is not None or high is not None:
+            normalized[name] = (low, high)
+    return normalized
+
+
+def screen_sbox(sbox: List[int], bounds: Bounds) -> Dict:
+    """
+    Saring S-box terhadap batas metrik, metrik termurah dulu.
+    Berhenti pada batas pertama yang gagal (DU/DAP, LAP, TO berhenti di tengah tabel
+    begitu nilai maksimum sementara melewati batas atas).
+    Hasil: passed, rejected_by (nama metrik / None), value (nilai saat ditolak; untuk
+    metrik yang berhenti di tengah ini batas bawah nilai sebenarnya), bound, dan
+    metrics (nilai lengkap metrik yang sudah dievaluasi).
+    """
+    bounds = normalize_bounds(bounds)
+    screen = _Screen(sbox)
+    metrics: Dict[str, float] = {}
+    for name in SCREEN_ORDER:
+        if name not in bounds:
+            continue
+        low, high = bounds[name]
+        if name in _CHUNKED_MAX:
+            value, complete = screen.chunked_max(name, high)
+        else:
+            value, complete = screen.full(name), True
+        if complete:
+            metrics[name] = value
+        if _violates(value, bounds[name]):
+            return {
+                "passed": False,
+                "rejected_by": name,
+                "value": value,
+                "bound": {"min": low, "max": high},
+                "metrics": metrics,
+            }
+    return {"passed": True, "rejected_by": None, "value": None, "bound": None, "metrics": metrics}
@@ -0,0 +1,39 @@
+import os
+from app.api.routes import AES_STANDARD_SBOX
+from app.services import aes_wrapper
+from app.services.aes_wrapper import _ctr_xor, _ctr_xor_segment
+from app.services.process_pool import pool_workers
+from app.utils.aes_engine import AESEngine
+
+KEY = bytes(range(16))
+NONCE = bytes.fromhex("0102030405060708")
+
+
+def _reference_ctr(data, start_block=0):
+    engine = AESEngine(KEY, AES_STANDARD_SBOX)
+    out = bytearray()
+    for i in range(0, len(data), 16):
+        counter = NONCE + (start_block + i // 16).to_bytes(8, "big")
+        keystream = engine.encrypt_block(counter)
+        out += bytes(a ^ b for a, b in zip(data[i:i + 16], keystream))
+    return bytes(out)
+
+
+def test_ctr_matches_reference():
+    data = os.urandom(16 * 70 + 5)
+    assert _ctr_xor(data, KEY, AES_STANDARD_SBOX, NONCE) == _reference_ctr(data)
+    assert _ctr_xor_segment(data[:37], KEY, AES_STANDARD_SBOX, NONCE, 9) == _reference_ctr(data[:37], 9)
+
+
+def test_ctr_parallel_segments_match_serial(monkeypatch):
+    monkeypatch.setattr(aes_wrapper, "CTR_PARALLEL_MIN_BYTES", 1024)
+    monkeypatch.setenv("AESSBOX_WORKERS", "2")
+    data = os.urandom(16 * 300 + 3)
+    assert _ctr_xor(data, KEY, AES_STANDARD_SBOX, NONCE) == _reference_ctr(data)
+
+
+def test_pool_workers_ignores_malformed_env(monkeypatch):
+    monkeypatch.setenv("AESSBOX_WORKERS", "banyak")
+    assert pool_workers() == (os.cpu_count() or 1)
+    monkeypatch.setenv("AESSBOX_WORKERS", "3")
+    assert pool_workers() == 3
@@ -0,0 +1,44 @@
+import asyncio
+import pytest
+from app.services import analysis_cache
+from app.services.analysis_cache import AnalysisCache, analyze_cached
+from app.services.batch_analysis import iter_batch_analysis
+from app.services.sbox_generator import find_valid_sbox
+from app.utils.affine_family import analyze_sbox
+from app.utils.sbox_profile import SBoxProfile
+
+
+@pytest.fixture
+def fresh_cache(tmp_path, monkeypatch):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(analysis_cache, "_CACHE", cache)
+    return cache
+
+
+@pytest.mark.parametrize("poly", [0x11B, 0x11D])
+def test_fast_path_matches_full_analysis(poly):
+    generated = find_valid_sbox(poly, seed=3)
+    result = analyze_sbox(generated["sbox"], generated["affine_matrix"], generated["affine_vector"], poly)
+    assert result.pop("affine_family") is True
+    assert result == SBoxProfile(generated["sbox"]).analysis()
+
+
+def test_affine_family_is_per_polynomial(fresh_cache):
+    sbox = find_valid_sbox(0x11B, seed=4)["sbox"]
+    assert analyze_cached(sbox, poly=0x11B)["affine_family"] is True
+    # Cache hit untuk S-box yang sama, tapi polinomial lain
+    assert analyze_cached(sbox, poly=0x11D)["affine_family"] is False
+    assert fresh_cache.computed == 1
+    assert analyze_cached(sbox, poly=0x11B)["affine_family"] is True
+
+
+def test_batch_cached_items_use_request_polynomial(fresh_cache):
+    sbox = find_valid_sbox(0x11B, seed=5)["sbox"]
+    analyze_cached(sbox, poly=0x11B)
+
+    async def run():
+        return [line async for line in iter_batch_analysis([{"sbox": sbox}], 0x11D)]
+
+    (line,) = asyncio.run(run())
+    assert line["cached"] is True
+    assert line["result"]["affine_family"] is False
@@ -0,0 +1,36 @@
+import random
+import sqlite3
+from app.services import analysis_cache
+from app.services.analysis_cache import AnalysisCache, sbox_digest
+from app.utils.sbox_profile import SBoxProfile
+
+
+def _sbox(seed=0):
+    sbox = list(range(256))
+    random.Random(seed).shuffle(sbox)
+    return sbox
+
+
+def test_cached_result_matches_profile_and_persists(tmp_path):
+    db = str(tmp_path / "cache.sqlite3")
+    sbox = _sbox()
+    cache = AnalysisCache(db)
+    result = cache.get_or_compute(sbox)
+    assert result == SBoxProfile(sbox).analysis()
+    assert cache.get_or_compute(sbox) == result and cache.computed == 1
+
+    reopened = AnalysisCache(db)
+    assert reopened.get(sbox_digest(sbox)) == result
+    assert reopened.disk_hits == 1
+
+
+def test_schema_version_change_invalidates_disk_tier(tmp_path, monkeypatch):
+    db = str(tmp_path / "cache.sqlite3")
+    sbox = _sbox(1)
+    AnalysisCache(db).get_or_compute(sbox)
+
+    monkeypatch.setattr(analysis_cache, "ANALYSIS_SCHEMA_VERSION", analysis_cache.ANALYSIS_SCHEMA_VERSION + 1)
+    reopened = AnalysisCache(db)
+    assert reopened.get(sbox_digest(sbox)) is None
+    version = sqlite3.connect(db).execute("PRAGMA user_version").fetchone()[0]
+    assert version == analysis_cache.ANALYSIS_SCHEMA_VERSION
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from app.services import analysis_cache
+from app.services.analysis_cache import AnalysisCache, sbox_digest
+from app.services.batch_analysis import BATCH_TASK_ITEMS, iter_batch_analysis
+from app.services.sbox_generator import find_valid_sbox
+from app.utils.affine_family import analyze_sbox
+
+
+@pytest.fixture
+def fresh_cache(tmp_path, monkeypatch):
+    cache = AnalysisCache(str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(analysis_cache, "_CACHE", cache)
+    return cache
+
+
+def _run(items):
+    async def run():
+        return [line async for line in iter_batch_analysis(items)]
+    return asyncio.run(run())
+
+
+def test_batch_rows_are_ordered_and_cached_off_loop(fresh_cache, monkeypatch):
+    sboxes = [find_valid_sbox(seed=seed)["sbox"] for seed in range(2 * BATCH_TASK_ITEMS + 3)]
+    items = [{"sbox": sbox} for sbox in sboxes]
+    items.insert(5, {"sbox": [1, 2, 3]})
+
+    writes = []
+    put_many = fresh_cache.put_many
+
+    def recording_put_many(entries):
+        with pytest.raises(RuntimeError):
+            asyncio.get_running_loop()
+        writes.append(len(entries))
+        put_many(entries)
+
+    monkeypatch.setattr(fresh_cache, "put_many", recording_put_many)
+    lines = _run(items)
+    assert [line["index"] for line in lines] == list(range(len(items)))
+    assert "error" in lines[5]
+    results = [line for line in lines if "error" not in line]
+    for sbox, line in zip(sboxes, results):
+        assert line["sbox_hash"] == sbox_digest(sbox) and line["cached"] is False
+        assert line["result"] == analyze_sbox(sbox)
+    # Satu transaksi per potongan BATCH_TASK_ITEMS item
+    assert sum(writes) == len(sboxes) and len(writes) == -(-len(items) // BATCH_TASK_ITEMS)
+
+    reopened = AnalysisCache(fresh_cache.db_path)
+    monkeypatch.setattr(analysis_cache, "_CACHE", reopened)
+    again = _run(items)
+    assert all(line["cached"] for line in again if "error" not in line)
+    assert [line.get("result") for line in again] == [line.get("result") for line in lines]
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import compute
+from app.services.compute import ComputeBusy, ComputeLimiter, dispatch_iter
+from app.services.sbox_generator import MAX_BULK_JSON_SBOXES, find_valid_sbox, generate_sbox_batch, unpack_rows_batch
+from app.utils.rng import SEED_BITS
+from app.utils.math_gf2 import build_affine_sbox_packed, inverse_table, is_invertible_packed
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("poly", [0x11B, 0x11D])
+def test_batch_matches_scalar_builder(poly):
+    batch = generate_sbox_batch(300, poly, seed=1)
+    inv = inverse_table(poly)
+    for rows, sbox in zip(batch["rows"].tolist(), batch["sboxes"].tolist()):
+        assert is_invertible_packed(rows)
+        assert build_affine_sbox_packed(rows, inv) == sbox
+
+
+def test_formats_agree():
+    query = "/generate-sbox?count=50&seed=9&format="
+    as_json = client.get(query + "json").json()
+    raw = client.get(query + "raw")
+    table = np.frombuffer(raw.content, dtype=raw.headers["x-table-dtype"]).reshape(50, 264)
+    lines = [json.loads(line) for line in client.get(query + "ndjson").text.splitlines()]
+    assert (table[:, 8:] == np.array(as_json["sboxes"])).all()
+    assert [line["sbox"] for line in lines] == as_json["sboxes"]
+    assert [line["affine_matrix"] for line in lines] == as_json["affine_matrices"]
+
+
+def test_json_count_is_capped():
+    r = client.get(f"/generate-sbox?count={MAX_BULK_JSON_SBOXES + 1}&format=json")
+    assert r.status_code == 400
+    assert client.get(f"/generate-sbox?count={MAX_BULK_JSON_SBOXES + 1}&format=raw").status_code == 200
+
+
+def test_ndjson_stream_uses_generate_limiter(monkeypatch):
+    compute.get_limiter("generate")
+    limiter = ComputeLimiter("generate", 1, 0)
+    monkeypatch.setitem(compute._LIMITERS, "generate", limiter)
+
+    async def run():
+        first = dispatch_iter("generate", iter(["a", "b"]))
+        consumed = [await first.__anext__()]
+        # Slot dipegang stream pertama dan antrian 0: stream kedua ditolak sebelum mulai
+        with pytest.raises(ComputeBusy):
+            dispatch_iter("generate", iter(["c"]))
+        consumed += [item async for item in first]
+        return consumed
+
+    assert asyncio.run(run()) == ["a", "b"]
+    assert limiter.completed == 1 and limiter.rejected == 1
+
+
+def test_single_equals_bulk_index_zero():
+    single = find_valid_sbox(0x11D, seed=42, stream=3)
+    batch = generate_sbox_batch(1, 0x11D, seed=42, stream=3)
+    assert single["sbox"] == batch["sboxes"][0].tolist()
+    assert single["affine_matrix"] == unpack_rows_batch(batch["rows"])[0]
+    via_api = client.get("/generate-sbox?seed=42&stream=3").json()
+    assert via_api["sbox"] == generate_sbox_batch(1, seed=42, stream=3)["sboxes"][0].tolist()
+
+
+def test_offset_does_not_change_index():
+    full = generate_sbox_batch(2100, seed=7)["sboxes"]
+    part = generate_sbox_batch(100, seed=7, offset=2000)["sboxes"]
+    assert (full[2000:] == part).all()
+
+
+def test_fresh_seed_is_js_safe():
+    for _ in range(20):
+        seed = find_valid_sbox()["seed"]
+        assert isinstance(seed, int) and 0 <= seed < 2 ** SEED_BITS
+    seed = client.get("/generate-sbox").json()["seed"]
+    assert client.get(f"/generate-sbox?seed={seed}").json()["seed"] == seed
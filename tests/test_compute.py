@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.api.routes import AES_STANDARD_SBOX
+from app.main import app
+from app.services import compute
+from app.services.compute import ComputeBusy, ComputeLimiter, dispatch_iter
+
+client = TestClient(app)
+
+
+class _HeldSemaphore:
+    def locked(self):
+        return True
+
+
+def _saturate(monkeypatch, name):
+    # Semua slot terpakai dan antrian 0: setiap admission ditolak
+    compute.get_limiter(name)
+    limiter = ComputeLimiter(name, 1, 0)
+    monkeypatch.setattr(limiter, "_get_semaphore", _HeldSemaphore)
+    monkeypatch.setitem(compute._LIMITERS, name, limiter)
+    return limiter
+
+
+def test_async_stream_holds_slot_and_closes_source(monkeypatch):
+    compute.get_limiter("batch")
+    limiter = ComputeLimiter("batch", 1, 0)
+    monkeypatch.setitem(compute._LIMITERS, "batch", limiter)
+    closed = []
+
+    async def source():
+        try:
+            for i in range(3):
+                yield i
+        finally:
+            closed.append(True)
+
+    async def run():
+        stream = dispatch_iter("batch", source())
+        first = await stream.__anext__()
+        assert limiter.running == 1
+        with pytest.raises(ComputeBusy):
+            dispatch_iter("batch", source())
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(run()) == 0
+    assert closed == [True] and limiter.running == 0 and limiter.rejected == 1
+
+
+@pytest.mark.parametrize("name, method, path, body", [
+    ("batch", "post", "/analyze-sbox/batch", {"sboxes": [AES_STANDARD_SBOX]}),
+    ("search", "post", "/search-sbox", {"bounds": {"sac": {"max": 0.6}}, "max_candidates": 10}),
+    ("generate", "get", "/generate-sbox", None),
+    ("swap", "post", "/swap-sessions", {"sbox": AES_STANDARD_SBOX}),
+])
+def test_endpoints_go_through_limiter(monkeypatch, name, method, path, body):
+    assert getattr(client, method)(path, **({"json": body} if body else {})).status_code == 200
+    _saturate(monkeypatch, name)
+    r = getattr(client, method)(path, **({"json": body} if body else {}))
+    assert r.status_code == 429
+    assert int(r.headers["retry-after"]) >= 1
@@ -0,0 +1,31 @@
+"""
+Budget waktu import cold-start: setiap cold start Vercel (vercel.json mengarahkan
+semua request ke app/main.py) membayar waktu import app.main, jadi tabel konstanta
+tidak boleh dihitung secara brute force saat import.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Budget (ms) import app.main, bisa di-override lewat env AESSBOX_IMPORT_BUDGET_MS
+APP_IMPORT_BUDGET_MS = float(os.environ.get("AESSBOX_IMPORT_BUDGET_MS", "500"))
+
+
+def _run(snippet: str) -> str:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    out = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True,
+                         check=True, cwd=ROOT, env=env)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def test_app_main_import_within_budget():
+    # Minimum dari beberapa interpreter baru agar tidak terpengaruh noise mesin CI
+    snippet = "import time; t = time.perf_counter(); import app.main; print((time.perf_counter() - t) * 1000)"
+    elapsed = min(float(_run(snippet)) for _ in range(3))
+    assert elapsed <= APP_IMPORT_BUDGET_MS, f"import app.main {elapsed:.1f} ms > {APP_IMPORT_BUDGET_MS:.0f} ms"
+
+
+def test_math_gf2_import_stays_light():
+    # Pengganti budget waktu: math_gf2 tidak boleh menarik numpy saat import
+    assert _run("import sys, app.utils.math_gf2; print('numpy' in sys.modules)") == "False"
@@ -0,0 +1,58 @@
+import random
+import pytest
+from app.utils.incremental import IncrementalSBoxEvaluator
+from app.utils.sbox_profile import SBoxProfile
+
+METRICS = ("nl", "bic_nl", "du", "dap", "sac", "bic_sac")
+
+
+def _expected(sbox):
+    full = SBoxProfile(sbox).analysis()
+    return {name: full[name] for name in METRICS}
+
+
+def _assert_close(actual, expected):
+    for name in METRICS:
+        assert actual[name] == pytest.approx(expected[name], abs=1e-12), name
+
+
+def test_swaps_match_full_recomputation():
+    rng = random.Random(3)
+    sbox = list(range(256))
+    rng.shuffle(sbox)
+    evaluator = IncrementalSBoxEvaluator(sbox)
+    for _ in range(25):
+        x1, x2 = rng.randrange(256), rng.randrange(256)
+        metrics = evaluator.swap(x1, x2)
+        sbox[x1], sbox[x2] = sbox[x2], sbox[x1]
+        assert evaluator.sbox == sbox
+        _assert_close(metrics, _expected(sbox))
+
+
+def test_undo_restores_previous_state():
+    sbox = list(range(256))
+    random.Random(4).shuffle(sbox)
+    evaluator = IncrementalSBoxEvaluator(sbox)
+    before = evaluator.metrics()
+    evaluator.swap(1, 200)
+    evaluator.swap(7, 9)
+    evaluator.undo()
+    _assert_close(evaluator.undo(), before)
+    assert evaluator.sbox == sbox
+
+
+def test_undo_history_is_bounded():
+    sbox = list(range(256))
+    evaluator = IncrementalSBoxEvaluator(sbox, max_history=3)
+    for x in range(10):
+        evaluator.swap(x, 255 - x)
+    assert list(evaluator.history) == [(7, 248), (8, 247), (9, 246)]
+    for _ in range(3):
+        evaluator.undo()
+    with pytest.raises(IndexError):
+        evaluator.undo()
+    expected = list(range(256))
+    for x in range(7):
+        expected[x], expected[255 - x] = expected[255 - x], expected[x]
+    assert evaluator.sbox == expected
+    _assert_close(evaluator.metrics(), _expected(expected))
@@ -0,0 +1,40 @@
+import base64
+import io
+import time
+from PIL import Image
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.affine_explorer import explore_affine
+
+client = TestClient(app)
+
+
+def _png_base64():
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def test_image_jobs_reject_invalid_input_up_front():
+    sbox = list(range(256))
+    bad = [
+        ("/jobs/encrypt-image", {"image_base64": "bukan base64!", "key": "k", "sbox": sbox}),
+        ("/jobs/encrypt-image", {"image_base64": base64.b64encode(b"teks").decode(), "key": "k", "sbox": sbox}),
+        ("/jobs/decrypt-image", {"ciphertext_base64": _png_base64(), "key": "k", "sbox": sbox, "mode": "ctr"}),
+    ]
+    for path, body in bad:
+        assert client.post(path, json=body).status_code == 400
+    assert client.post("/jobs/encrypt-image", json={"image_base64": "", "key": "k", "sbox": [0] * 10}).status_code == 422
+
+
+def test_explore_job_matches_direct_call():
+    with TestClient(app) as c:
+        r = c.post("/jobs/explore-affine", json={"seed": 1, "max_steps": 2})
+        assert r.status_code == 202
+        job_id = r.json()["job_id"]
+        deadline = time.monotonic() + 120
+        while c.get(f"/jobs/{job_id}").json()["status"] in ("queued", "running"):
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        result = c.get(f"/jobs/{job_id}/result").json()
+    assert result == explore_affine("sac", 2, None, None, 0x11B, 1)
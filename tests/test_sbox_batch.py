@@ -0,0 +1,26 @@
+import numpy as np
+from app.utils.math_gf2 import generate_invertible_packed, is_invertible_packed
+from app.utils.rng import make_rng
+from app.utils.sbox_batch import column_masks_batch, generate_invertible_batch, invertible_mask
+
+
+def test_batch_sampler_matches_scalar_sampler():
+    batch = generate_invertible_batch(2000, make_rng(11, 2))
+    rng = make_rng(11, 2)
+    assert batch.tolist() == [generate_invertible_packed(rng) for _ in range(2000)]
+
+
+def test_batch_sampler_is_invertible_and_uniform():
+    rows = generate_invertible_batch(60000, make_rng(5))
+    assert invertible_mask(rows).all()
+    assert all(is_invertible_packed(r) for r in rows[:500].tolist())
+    # |GL(8, 2)| ~ 5.3e18: duplikat praktis mustahil untuk sampler seragam
+    assert len(np.unique(rows, axis=0)) == len(rows)
+    # Setiap baris dan kolom matriks invertible seragam tersebar rata atas 255 vektor tak-nol
+    expected = len(rows) / 255
+    for values in (rows, column_masks_batch(rows)):
+        for j in range(8):
+            counts = np.bincount(values[:, j], minlength=256)
+            assert counts[0] == 0
+            chi2 = ((counts[1:] - expected) ** 2 / expected).sum()
+            assert chi2 < 400, (j, chi2)
@@ -0,0 +1,49 @@
+import pytest
+from app.services import analysis_cache
+from app.services.analysis_cache import AnalysisCache, sbox_digest
+from app.services.sbox_generator import find_valid_sbox
+from app.services.sbox_library import SBoxLibrary
+from app.utils.affine_family import analyze_sbox
+
+
+@pytest.fixture
+def library(monkeypatch):
+    monkeypatch.setattr(analysis_cache, "_CACHE", AnalysisCache(None))
+    lib = SBoxLibrary()
+    for seed in range(40):
+        generated = find_valid_sbox(seed=seed)
+        lib.add(generated["sbox"], generated["affine_matrix"], generated["affine_vector"], source="generate")
+    return lib
+
+
+def _all_pages(lib, **kwargs):
+    items, cursor = [], None
+    while True:
+        page = lib.query(limit=7, cursor=cursor, **kwargs)
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+def test_insert_stores_reference_metrics(library):
+    generated = find_valid_sbox(seed=3)
+    entry = library.get(sbox_digest(generated["sbox"]))
+    expected = analyze_sbox(generated["sbox"])
+    assert entry["affine_family"] is True
+    assert entry["metrics"] == pytest.approx({name: expected[name] for name in entry["metrics"]})
+    # Insert ulang tidak membuat baris baru
+    assert library.add(generated["sbox"])[1] is False
+
+
+def test_paginated_query_matches_brute_force(library):
+    everything = _all_pages(library)
+    assert len(everything) == 40
+    sacs = sorted(e["metrics"]["sac"] for e in everything)
+    low, high = sacs[5], sacs[30]
+    expected = sorted(
+        (e for e in everything if low <= e["metrics"]["sac"] <= high),
+        key=lambda e: (e["metrics"]["to"], e["id"]), reverse=True,
+    )
+    got = _all_pages(library, bounds={"sac": (low, high)}, order_by="to", descending=True)
+    assert [e["id"] for e in got] == [e["id"] for e in expected]
@@ -0,0 +1,55 @@
+import random
+import numpy as np
+from app.api.routes import AES_STANDARD_SBOX
+from app.utils.sbox_profile import SBoxProfile
+
+X = np.arange(256)
+PARITY = np.array([bin(i).count("1") & 1 for i in range(256)])
+SIGN = 1 - 2 * PARITY[X[:, None] & X[None, :]]   # (-1)^(a.x), baris a
+
+
+def _random_sbox(seed):
+    sbox = list(range(256))
+    random.Random(seed).shuffle(sbox)
+    return sbox
+
+
+def _walsh_reference(sbox):
+    s = np.asarray(sbox)
+    # baris v: W(v, a) = sum_x (-1)^(v.S(x) XOR a.x)
+    components = 1 - 2 * PARITY[X[:, None] & s[None, :]]
+    return components @ SIGN.T
+
+
+def _reference_metrics(sbox):
+    walsh = _walsh_reference(sbox)
+    nl = min(128 - int(np.abs(walsh[1 << i]).max()) // 2 for i in range(8))
+    ddt = np.zeros((256, 256), dtype=int)
+    for dx in range(256):
+        for x in range(256):
+            ddt[dx, sbox[x] ^ sbox[x ^ dx]] += 1
+    flips = sum(bin(sbox[x] ^ sbox[x ^ (1 << i)]).count("1") for x in range(256) for i in range(8))
+    return {
+        "nl": nl,
+        "du": int(ddt[1:].max()),
+        "sac": flips / (8 * 256 * 8),
+        "lap": int(np.abs(walsh[1:, 1:]).max()) / 256.0,
+    }
+
+
+def test_profile_matches_brute_force():
+    for sbox in (AES_STANDARD_SBOX, _random_sbox(1)):
+        profile = SBoxProfile(sbox)
+        ref = _reference_metrics(sbox)
+        assert profile.nl() == ref["nl"]
+        assert profile.du() == ref["du"]
+        assert abs(profile.sac() - ref["sac"]) < 1e-12
+        assert abs(profile.lap() - ref["lap"]) < 1e-12
+
+
+def test_aes_known_values():
+    profile = SBoxProfile(AES_STANDARD_SBOX)
+    assert profile.nl() == 112
+    assert profile.bic_nl() == 112
+    assert profile.du() == 4
+    assert profile.ad() == 7
@@ -0,0 +1,40 @@
+import random
+import numpy as np
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+PARITY = np.array([bin(i).count("1") & 1 for i in range(256)])
+
+
+def _sbox():
+    sbox = list(range(256))
+    random.Random(11).shuffle(sbox)
+    return sbox
+
+
+def _fetch(sbox, kind):
+    r = client.post("/sbox-table", json={"sbox": sbox, "table": kind, "format": "raw"})
+    assert r.status_code == 200
+    assert r.headers["x-table-dtype"] == "<i2"
+    return np.frombuffer(r.content, dtype="<i2").reshape(256, 256)
+
+
+def test_tables_match_definitions():
+    sbox = _sbox()
+    s = np.asarray(sbox)
+    inv = np.argsort(s)
+    x = np.arange(256)
+    ddt = np.zeros((256, 256), dtype=int)
+    bct = np.zeros((256, 256), dtype=int)
+    for a in range(256):
+        np.add.at(ddt[a], s ^ s[x ^ a], 1)
+        for b in range(256):
+            bct[a, b] = int(((inv[s ^ b] ^ inv[s[x ^ a] ^ b]) == a).sum())
+    # lat[v][u] = #{x : u.x = v.S(x)} - 128 (baris = mask output)
+    lat = np.array([[int((PARITY[x & u] == PARITY[s & v]).sum()) - 128 for u in range(256)] for v in range(256)])
+
+    assert (_fetch(sbox, "ddt") == ddt).all()
+    assert (_fetch(sbox, "bct") == bct).all()
+    assert (_fetch(sbox, "lat") == lat).all()
+    assert _fetch(sbox, "act")[0, 0] == 256
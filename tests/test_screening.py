@@ -0,0 +1,34 @@
+import random
+from app.utils.screening import SCREEN_ORDER, screen_sbox
+from app.utils.sbox_profile import SBoxProfile
+
+
+def _sboxes():
+    rng = random.Random(7)
+    for _ in range(4):
+        sbox = list(range(256))
+        rng.shuffle(sbox)
+        yield sbox
+
+
+def test_screen_matches_full_analysis():
+    for sbox in _sboxes():
+        full = SBoxProfile(sbox).analysis()
+        # Batas tepat di nilai sebenarnya: harus lolos dan nilai metrik sama persis
+        bounds = {name: (full[name], full[name]) for name in SCREEN_ORDER}
+        result = screen_sbox(sbox, bounds)
+        assert result["passed"] is True
+        assert result["metrics"] == {name: full[name] for name in SCREEN_ORDER}
+
+
+def test_screen_rejects_on_first_violated_bound():
+    for sbox in _sboxes():
+        full = SBoxProfile(sbox).analysis()
+        for name in ("nl", "du", "lap", "to"):
+            bounds = {"sac": (0.0, 1.0), name: (None, full[name] - 1e-9)}
+            if name == "nl":
+                bounds[name] = (full[name] + 1, None)
+            result = screen_sbox(sbox, bounds)
+            assert result["passed"] is False and result["rejected_by"] == name
+            # Metrik yang berhenti di tengah tabel hanya memberi batas bawah nilai sebenarnya
+            assert result["value"] <= full[name] or name == "nl"
@@ -0,0 +1,81 @@
+import os
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.api.routes import AES_STANDARD_SBOX
+from app.main import app
+from app.services.aes_wrapper import (
+    ECB_MISALIGNED_ERROR, AESStreamCipher, aes_decrypt_bytes, aes_decrypt_custom, aes_encrypt_bytes,
+)
+
+KEY = "kunci rahasia 16"
+SBOX_HEX = bytes(AES_STANDARD_SBOX).hex()
+client = TestClient(app)
+
+
+def _post(path, data, mode="ecb"):
+    return client.post(f"{path}?sbox={SBOX_HEX}&mode={mode}", content=data,
+                       headers={"X-AES-Key": KEY, "Content-Type": "application/octet-stream"})
+
+
+def test_ecb_stream_matches_bytes_api():
+    data = os.urandom(5000)
+    r = _post("/encrypt-stream", data)
+    assert r.status_code == 200
+    assert r.content == aes_encrypt_bytes(data, KEY, AES_STANDARD_SBOX)
+    assert _post("/decrypt-stream", r.content).content == data
+
+
+def test_ctr_stream_roundtrip():
+    data = os.urandom(3001)
+    r = _post("/encrypt-stream", data, "ctr")
+    assert aes_decrypt_bytes(r.content, KEY, AES_STANDARD_SBOX, "ctr") == data
+    assert _post("/decrypt-stream", r.content, "ctr").content == data
+
+
+def test_short_ctr_ciphertext_is_400():
+    r = _post("/decrypt-stream", b"abc", "ctr")
+    assert r.status_code == 400
+
+
+def test_key_not_accepted_in_query():
+    r = client.post(f"/encrypt-stream?sbox={SBOX_HEX}&key={KEY}", content=b"x" * 32)
+    assert r.status_code == 422
+
+
+def test_stream_chunks_run_off_event_loop(monkeypatch):
+    from app.api import routes
+    on_loop = []
+
+    def record():
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+
+    class RecordingCipher(routes.AESStreamCipher):
+        def update(self, chunk):
+            record()
+            return super().update(chunk)
+
+        def finalize(self):
+            record()
+            return super().finalize()
+
+    monkeypatch.setattr(routes, "AESStreamCipher", RecordingCipher)
+    data = os.urandom(1000)
+    assert _post("/encrypt-stream", data).content == aes_encrypt_bytes(data, KEY, AES_STANDARD_SBOX)
+    assert on_loop and not any(on_loop)
+
+
+def test_misaligned_ecb_ciphertext_is_rejected():
+    ciphertext = aes_encrypt_bytes(os.urandom(100), KEY, AES_STANDARD_SBOX)[:-5]
+    with pytest.raises(ValueError, match=ECB_MISALIGNED_ERROR):
+        aes_decrypt_bytes(ciphertext, KEY, AES_STANDARD_SBOX)
+    assert aes_decrypt_custom(ciphertext.hex(), KEY, AES_STANDARD_SBOX) == f"Error: {ECB_MISALIGNED_ERROR}"
+    cipher = AESStreamCipher(KEY, AES_STANDARD_SBOX, decrypt=True)
+    cipher.update(ciphertext)
+    with pytest.raises(ValueError, match=ECB_MISALIGNED_ERROR):
+        cipher.finalize()
+    assert _post("/decrypt-stream", ciphertext[:10]).status_code == 400